@@ -0,0 +1,150 @@
+"""
+Persistent usage counters shared by every gunicorn worker
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from caches import _closing_connection
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsStore:
+    """Named counters with per-day rollups, stored in SQLite (WAL).
+
+    ``incr`` only touches an in-memory buffer; a background thread per
+    process folds the buffer into the database every ``flush_interval``
+    seconds, or sooner once ``flush_threshold`` increments are pending.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 5.0, flush_threshold: int = 100):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._pending_count = 0
+        self._wake = threading.Event()
+        self._pid = None
+        self._buffer_pid = os.getpid()
+        self.flushes = 0
+        self.flush_errors = 0
+        self.last_flush_at = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _closing_connection(path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS counters ('
+                'day TEXT NOT NULL, name TEXT NOT NULL, value INTEGER NOT NULL, '
+                'PRIMARY KEY (day, name))'
+            )
+
+    def incr(self, name: str, amount: int = 1):
+        day = time.strftime('%Y-%m-%d', time.gmtime())
+        with self._lock:
+            self._pending[(day, name)] += amount
+            self._pending_count += 1
+            due = self._pending_count >= self.flush_threshold
+        if due:
+            self._wake.set()
+
+    def start(self):
+        """Start the flusher thread once per process (safe to call on every request)."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            if self._buffer_pid != pid:
+                # A forked worker inherits its parent's buffer; the parent flushes it
+                self._buffer_pid = pid
+                self._pending.clear()
+                self._pending_count = 0
+        threading.Thread(target=self._loop, name='analytics-flusher', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write buffered increments to the database in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, defaultdict(int)
+            self._pending_count = 0
+        try:
+            with _closing_connection(self.path) as conn:
+                conn.executemany(
+                    'INSERT INTO counters (day, name, value) VALUES (?, ?, ?) '
+                    'ON CONFLICT(day, name) DO UPDATE SET value = value + excluded.value',
+                    [(day, name, value) for (day, name), value in batch.items()]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Analytics flush failed ({self.path}): {e}")
+            with self._lock:
+                # Put the batch back so the next flush retries it
+                for key, value in batch.items():
+                    self._pending[key] += value
+                self.flush_errors += 1
+            return
+        with self._lock:
+            self.flushes += 1
+            self.last_flush_at = time.time()
+
+    def totals(self) -> Dict[str, int]:
+        """All-time totals, including this process's unflushed increments."""
+        result = defaultdict(int)
+        for name, value in self._query('SELECT name, SUM(value) FROM counters GROUP BY name'):
+            result[name] += value
+        with self._lock:
+            for (_, name), value in self._pending.items():
+                result[name] += value
+        return dict(result)
+
+    def daily(self, days: int = 30, today: Optional[str] = None) -> List[dict]:
+        """Per-day counters for the last ``days`` days, newest first."""
+        today = today or time.strftime('%Y-%m-%d', time.gmtime())
+        start = (date.fromisoformat(today) - timedelta(days=days - 1)).isoformat()
+        by_day = defaultdict(lambda: defaultdict(int))
+        rows = self._query('SELECT day, name, value FROM counters WHERE day BETWEEN ? AND ?', (start, today))
+        for day, name, value in rows:
+            by_day[day][name] += value
+        with self._lock:
+            for (day, name), value in self._pending.items():
+                if start <= day <= today:
+                    by_day[day][name] += value
+        return [dict(by_day[day], date=day) for day in sorted(by_day, reverse=True)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'pending_increments': self._pending_count,
+                'flushes': self.flushes,
+                'flush_errors': self.flush_errors,
+                'last_flush_at': self.last_flush_at,
+                'flush_interval_seconds': self.flush_interval,
+            }
+
+    def _query(self, sql: str, params: tuple = ()):
+        try:
+            with _closing_connection(self.path) as conn:
+                return conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Analytics read failed ({self.path}): {e}")
+            return []
@@ -2,28 +2,49 @@
 Clean Flask Resume Generator App with Ad Monetization
 """
 
-from flask import Flask, request, render_template, jsonify, send_file
+from flask import Flask, request, render_template, jsonify, send_file, redirect, Response, stream_with_context
 from flask_cors import CORS
 import os
 import logging
 import uuid
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import shutil
-import google.generativeai as genai
-import pdfplumber
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
+import hashlib
+import hmac
+import json
+import mimetypes
+import threading
+import time
+import zipfile
 import re
-import requests
-from bs4 import BeautifulSoup
-from docx import Document
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.shared import Pt
+from typing import BinaryIO, Callable, Optional, Union
 from dotenv import load_dotenv
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from job_queue import JobQueue, QueueFull
+from limits import ConcurrencyLimiter, Overloaded, TokenBucketLimiter
+from metrics import PROMPT_TOKENS, RESUMES_GENERATED, observe_stage, record_fallback, render_metrics, track_in_flight
+from model_backends import load_model, warm_up_model
+from pdf_extract import PdfExtractor
+from prompt_budget import CompressedText, compress_job_description, compress_resume
+from retention import RetentionPolicy, RetentionSweeper
+from storage import build_storage
+from upload_buffer import UploadBuffer, spooled_request_class
+from analytics_store import AnalyticsStore
+from caches import ContentCache, SQLiteCache
+# Text helpers are re-exported here for existing callers of app.*
+from resume_format import (
+    CANONICAL_SECTION_ORDER,
+    ResumeDocument,
+    _normalize_ai_text,
+    build_resume_document,
+    clean_for_pdf,
+    document_source,
+    final_format_resume,
+    parse_sections,
+    parse_structured_lines,
+    sanitize_enhanced_content,
+)
 
 # Load environment variables
 load_dotenv()
@@ -37,32 +58,200 @@ CORS(app)
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-UPLOAD_FOLDER = 'uploads'
+# Uploads up to this size are parsed and processed without touching disk;
+# larger ones spill to a temp file. Queued jobs hold their upload until they
+# run, so this bounds their memory (typical resumes are well under 1MB)
+UPLOAD_SPOOL_MAX_MB = float(os.getenv('UPLOAD_SPOOL_MAX_MB', '2'))
+app.request_class = spooled_request_class(int(UPLOAD_SPOOL_MAX_MB * 1024 * 1024))
 PREVIEWS_FOLDER = 'previews'
+JOBS_FOLDER = os.getenv('JOBS_FOLDER', 'jobs')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '16'))
+JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', '3600'))
+# Unfinished jobs left by a dead worker are failed after this long; matches
+# the gunicorn timeout by default
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', os.getenv('GUNICORN_TIMEOUT', '120')))
+STAGE_WORKERS = int(os.getenv('STAGE_WORKERS', '4'))
+CACHE_FOLDER = os.getenv('CACHE_FOLDER', 'cache')
+PDF_TEXT_CACHE_ENTRIES = int(os.getenv('PDF_TEXT_CACHE_ENTRIES', '256'))
+PDF_TEXT_CACHE_DISK_MB = int(os.getenv('PDF_TEXT_CACHE_DISK_MB', '64'))
+# auto = pypdfium2 first, pdfplumber when it fails or finds no text
+PDF_EXTRACT_BACKEND = os.getenv('PDF_EXTRACT_BACKEND', 'auto')
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '30'))
+PDF_PAGE_TIMEOUT = float(os.getenv('PDF_PAGE_TIMEOUT', '5'))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '4'))
+PDF_EXTRACT_WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))
+AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', str(7 * 24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', '2000'))
+JOB_FETCH_FRESH_SECONDS = int(os.getenv('JOB_FETCH_FRESH_SECONDS', '3600'))
+JOB_FETCH_MAX_AGE = int(os.getenv('JOB_FETCH_MAX_AGE', str(7 * 24 * 3600)))
+JOB_FETCH_CACHE_ENTRIES = int(os.getenv('JOB_FETCH_CACHE_ENTRIES', '5000'))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+PREVIEW_TTL_SECONDS = int(os.getenv('PREVIEW_TTL_SECONDS', str(24 * 3600)))
+PREVIEW_MAX_MB = int(os.getenv('PREVIEW_MAX_MB', '1024'))
+RETENTION_SWEEP_INTERVAL = int(os.getenv('RETENTION_SWEEP_INTERVAL', '300'))
+# Outputs never change once written, so browsers may keep them until they expire
+ARTIFACT_MAX_AGE = int(os.getenv('ARTIFACT_MAX_AGE', str(PREVIEW_TTL_SECONDS)))
+# Hand file bytes to the front proxy: '' (serve here), 'x-accel' (nginx) or 'x-sendfile'
+ARTIFACT_SENDFILE = os.getenv('ARTIFACT_SENDFILE', '').lower()
+# nginx internal location that aliases PREVIEWS_FOLDER (x-accel mode)
+ARTIFACT_ACCEL_PREFIX = os.getenv('ARTIFACT_ACCEL_PREFIX', '/_artifacts/')
+# 'local' keeps outputs in PREVIEWS_FOLDER; 's3' shares them between instances
+ARTIFACT_STORAGE = os.getenv('ARTIFACT_STORAGE', 'local')
+ARTIFACT_S3_BUCKET = os.getenv('ARTIFACT_S3_BUCKET', '')
+ARTIFACT_S3_PREFIX = os.getenv('ARTIFACT_S3_PREFIX', 'previews')
+ARTIFACT_S3_ENDPOINT = os.getenv('ARTIFACT_S3_ENDPOINT')  # e.g. a MinIO URL
+ARTIFACT_S3_REGION = os.getenv('ARTIFACT_S3_REGION')
+ARTIFACT_URL_EXPIRY = int(os.getenv('ARTIFACT_URL_EXPIRY', '3600'))
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '4'))
+GEMINI_MAX_WAITING = int(os.getenv('GEMINI_MAX_WAITING', '8'))
+GEMINI_WAIT_TIMEOUT = float(os.getenv('GEMINI_WAIT_TIMEOUT', '10'))
+RATE_LIMIT_PER_MINUTE = float(os.getenv('RATE_LIMIT_PER_MINUTE', '6'))
+RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', '3'))
+RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'sqlite').lower()
+# Number of reverse proxies in front of the app (Render adds one) whose
+# X-Forwarded-For entries are trusted
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', '1'))
+BATCH_MAX_JOBS = int(os.getenv('BATCH_MAX_JOBS', '20'))
+BATCH_FETCH_WORKERS = int(os.getenv('BATCH_FETCH_WORKERS', '8'))
+# One batch may use at most half the Gemini slots, so single requests
+# arriving meanwhile are not all turned away with 503s
+BATCH_AI_CONCURRENCY = int(os.getenv('BATCH_AI_CONCURRENCY', str(max(1, GEMINI_MAX_CONCURRENCY // 2))))
+# Approximate token budgets for the text inserted into each prompt
+ENHANCE_RESUME_TOKENS = int(os.getenv('ENHANCE_RESUME_TOKENS', '1250'))
+ENHANCE_JOB_TOKENS = int(os.getenv('ENHANCE_JOB_TOKENS', '750'))
+EXPLAIN_RESUME_TOKENS = int(os.getenv('EXPLAIN_RESUME_TOKENS', '875'))
+EXPLAIN_JOB_TOKENS = int(os.getenv('EXPLAIN_JOB_TOKENS', '600'))
+# One JSON round-trip for rewrite + explanation instead of two calls
+AI_SINGLE_CALL = os.getenv('AI_SINGLE_CALL', 'false').lower() in ('1', 'true', 'yes')
+ANALYTICS_FLUSH_SECONDS = float(os.getenv('ANALYTICS_FLUSH_SECONDS', '5'))
+ANALYTICS_ROLLUP_DAYS = int(os.getenv('ANALYTICS_ROLLUP_DAYS', '30'))
 
 # Create necessary directories
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PREVIEWS_FOLDER, exist_ok=True)
 
-# Configure Gemini AI
+# Rendering always happens in PREVIEWS_FOLDER; with S3 that is only a local cache
+artifact_storage = build_storage(
+    ARTIFACT_STORAGE,
+    PREVIEWS_FOLDER,
+    bucket=ARTIFACT_S3_BUCKET,
+    prefix=ARTIFACT_S3_PREFIX,
+    endpoint_url=ARTIFACT_S3_ENDPOINT,
+    region=ARTIFACT_S3_REGION,
+    url_expiry=ARTIFACT_URL_EXPIRY,
+    cache_control=f'private, max-age={ARTIFACT_MAX_AGE}, immutable'
+)
+
+# Background job queue so long generations don't pin a gunicorn worker
+job_queue = JobQueue(JOBS_FOLDER, max_workers=JOB_WORKERS, max_pending=JOB_QUEUE_SIZE,
+                     result_ttl=JOB_RESULT_TTL, stale_after=JOB_STALE_SECONDS)
+
+# Shared pool for independent post-enhancement stages (rendering runs while
+# the explanation call is in flight)
+stage_executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix='resume-stage')
+
+pdf_extractor = PdfExtractor(
+    backend=PDF_EXTRACT_BACKEND,
+    max_pages=PDF_MAX_PAGES,
+    page_timeout=PDF_PAGE_TIMEOUT,
+    parallel_min_pages=PDF_PARALLEL_MIN_PAGES,
+    workers=PDF_EXTRACT_WORKERS
+)
+
+# Extracted resume text keyed by the SHA-256 of the uploaded bytes
+pdf_text_cache = ContentCache(
+    os.path.join(CACHE_FOLDER, 'pdf_text'),
+    max_entries=PDF_TEXT_CACHE_ENTRIES,
+    max_disk_bytes=PDF_TEXT_CACHE_DISK_MB * 1024 * 1024
+)
+
+# Gemini responses shared by all workers; identical prompts cost a lookup
+ai_response_cache = SQLiteCache(
+    os.path.join(CACHE_FOLDER, 'ai_responses.db'),
+    ttl=AI_CACHE_TTL,
+    max_entries=AI_CACHE_MAX_ENTRIES
+)
+
+# Extracted job-posting text keyed by URL; stale entries are revalidated
+# with ETag/Last-Modified instead of being refetched and reparsed
+job_content_cache = SQLiteCache(
+    os.path.join(CACHE_FOLDER, 'job_pages.db'),
+    ttl=JOB_FETCH_MAX_AGE,
+    max_entries=JOB_FETCH_CACHE_ENTRIES
+)
+
+# Generated outputs expire by age and per-directory quota; one worker at a
+# time sweeps, coordinated through a lock file
+retention_sweeper = RetentionSweeper(
+    [
+        RetentionPolicy(PREVIEWS_FOLDER, PREVIEW_TTL_SECONDS, PREVIEW_MAX_MB * 1024 * 1024),
+    ],
+    interval=RETENTION_SWEEP_INTERVAL,
+    lock_path=os.path.join(CACHE_FOLDER, 'retention.lock')
+)
+
+# Caps concurrent Gemini calls in this worker; callers beyond the wait queue
+# get a fast 503 instead of queueing into upstream rate limits
+gemini_limiter = ConcurrencyLimiter(
+    max_concurrent=GEMINI_MAX_CONCURRENCY,
+    max_waiting=GEMINI_MAX_WAITING,
+    wait_timeout=GEMINI_WAIT_TIMEOUT
+)
+
+# Per-client token buckets for the generation endpoints, shared by all
+# workers through SQLite unless RATE_LIMIT_STORE=memory
+rate_limiter = TokenBucketLimiter(
+    rate=RATE_LIMIT_PER_MINUTE / 60.0,
+    burst=RATE_LIMIT_BURST,
+    path=os.path.join(CACHE_FOLDER, 'rate_limits.db') if RATE_LIMIT_STORE == 'sqlite' else None
+)
+RATE_LIMITED_ENDPOINTS = {'generate_resume', 'generate_resume_async', 'generate_resume_stream', 'generate_resume_batch'}
+
+# Shared HTTP session so job-board fetches reuse pooled connections; built
+# on first use because importing requests is slow and most requests never fetch
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                session = requests.Session()
+                session.headers['User-Agent'] = 'Mozilla/5.0 (JobContentFetcher/1.0)'
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_SIZE,
+                    pool_maxsize=HTTP_POOL_SIZE,
+                    max_retries=Retry(total=1, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=('GET',))
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _http_session = session
+    return _http_session
+
+# Configure Gemini AI (MODEL_BACKEND=fake swaps in a local stand-in for load tests)
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-if GOOGLE_API_KEY:
-    genai.configure(api_key=GOOGLE_API_KEY)
-    model = genai.GenerativeModel('gemini-1.5-flash')
-else:
-    model = None
-    logger.warning("GOOGLE_API_KEY not found. AI features will be disabled.")
-
-# Simple analytics tracking
-analytics_data = {
-    'daily_users': 0,
-    'total_resumes_generated': 0
-}
+GEMINI_MODEL_NAME = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+MODEL_BACKEND = os.getenv('MODEL_BACKEND', 'gemini').lower()
+model = load_model(MODEL_BACKEND, GEMINI_MODEL_NAME, GOOGLE_API_KEY)
+# Cached responses must never cross backends
+MODEL_CACHE_NAME = GEMINI_MODEL_NAME if MODEL_BACKEND == 'gemini' else f"{MODEL_BACKEND}:{GEMINI_MODEL_NAME}"
+
+# Usage counters shared by all workers; increments are buffered and
+# flushed to SQLite in batches off the request path
+analytics = AnalyticsStore(
+    os.path.join(CACHE_FOLDER, 'analytics.db'),
+    flush_interval=ANALYTICS_FLUSH_SECONDS
+)
 
 @app.route('/')
 def index():
     """Serve the main page with ad integration"""
-    analytics_data['daily_users'] += 1
+    analytics.incr('page_views')
     session_id = str(uuid.uuid4())
     return render_template('index.html', session_id=session_id)
 
@@ -94,170 +283,611 @@ def ads_txt():
 def test():
     return render_template('test_simple.html')
 
+def _validate_resume_request():
+    """Validate the upload form. Returns (error_response, file, job_description_raw, output_format)."""
+    job_description_raw = request.form.get('job_description', '').strip()
+    output_format = request.form.get('format', 'pdf')
+
+    # Validate input
+    if not job_description_raw:
+        return (jsonify({'error': 'Job description is required'}), 400), None, None, None
+
+    error, file = _validate_resume_file()
+    if error:
+        return error, None, None, None
+
+    return None, file, job_description_raw, output_format
+
+def _validate_resume_file():
+    """Check the uploaded resume. Returns (error_response, file)."""
+    # Check if resume file was uploaded
+    if 'resume_file' not in request.files:
+        return (jsonify({'error': 'No resume file provided'}), 400), None
+
+    file = request.files['resume_file']
+    if file.filename == '':
+        return (jsonify({'error': 'No file selected'}), 400), None
+
+    if not file.filename.lower().endswith('.pdf'):
+        return (jsonify({'error': 'Only PDF files are supported'}), 400), None
+
+    return None, file
+
+# A resume to process: an in-memory upload, or a PDF path (scripts, tests)
+ResumeSource = Union[str, UploadBuffer]
+
+def _buffer_upload(file) -> UploadBuffer:
+    """Copy the uploaded PDF into a memory buffer that outlives the request."""
+    with observe_stage('upload_buffer'):
+        return UploadBuffer(file.stream, int(UPLOAD_SPOOL_MAX_MB * 1024 * 1024))
+
+def _overloaded_response(exc: Overloaded):
+    resp = jsonify({'error': 'The AI service is busy, please try again shortly.', 'retry_after': exc.retry_after})
+    return resp, 503, {'Retry-After': str(exc.retry_after)}
+
+def _discard_upload(upload: ResumeSource):
+    """Release an upload buffer once the pipeline is done with it; paths belong to the caller."""
+    if isinstance(upload, UploadBuffer):
+        upload.close()
+
+def resolve_job_description(job_description_raw: str) -> tuple[str, Optional[str]]:
+    """Expand a job URL into the posting text. Returns (job_description, source_url)."""
+    if is_probable_url(job_description_raw):
+        with observe_stage('fetch_job'):
+            scraped = fetch_job_content(job_description_raw)
+        return (scraped if scraped else job_description_raw), job_description_raw
+    return job_description_raw, None
+
+def build_resume_response(enhanced_resume_path: str, explanation: str, extra_files: dict, job_source_url: Optional[str]) -> dict:
+    """JSON body shared by the sync, async and streaming endpoints."""
+    return {
+        'success': True,
+        'preview_url': f'/preview/{os.path.basename(enhanced_resume_path)}',
+        'download_url': f'/download/{os.path.basename(enhanced_resume_path)}',
+        'explanation': explanation,
+        'job_url': job_source_url,
+        'additional_downloads': {k: f'/download/{os.path.basename(v)}' for k, v in extra_files.items()} if extra_files else {}
+    }
+
+def run_resume_pipeline(upload: ResumeSource, job_description_raw: str, output_format: str, mode: str = 'sync') -> dict:
+    """Run the full generation pipeline and return the JSON-ready response body."""
+    try:
+        with track_in_flight(mode):
+            job_description, job_source_url = resolve_job_description(job_description_raw)
+            enhanced_resume_path, explanation, extra_files = process_resume_with_ai(upload, job_description, output_format)
+    finally:
+        _discard_upload(upload)
+
+    # Update analytics
+    analytics.incr('resumes_generated')
+    RESUMES_GENERATED.labels(mode=mode).inc()
+
+    return build_resume_response(enhanced_resume_path, explanation, extra_files, job_source_url)
+
 @app.route('/generate_resume', methods=['POST'])
 def generate_resume():
     """Generate resume with AI enhancement"""
     try:
-        # Get form data
-        job_description_raw = request.form.get('job_description', '').strip()
-        output_format = request.form.get('format', 'pdf')
+        error, file, job_description_raw, output_format = _validate_resume_request()
+        if error:
+            return error
 
-        # Validate input
-        if not job_description_raw:
-            return jsonify({'error': 'Job description is required'}), 400
-        
-        # Check if resume file was uploaded
-        if 'resume_file' not in request.files:
-            return jsonify({'error': 'No resume file provided'}), 400
-        
-        file = request.files['resume_file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not file.filename.lower().endswith('.pdf'):
-            return jsonify({'error': 'Only PDF files are supported'}), 400
-        
-        # Save uploaded file
-        filename = f"{uuid.uuid4()}_resume.pdf"
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        
-        # Process the resume
-        # Expand job description if it's a URL
-        if is_probable_url(job_description_raw):
-            scraped = fetch_job_content(job_description_raw)
-            job_description = scraped if scraped else job_description_raw
-            job_source_url = job_description_raw
-        else:
-            job_description = job_description_raw
-            job_source_url = None
+        # Turn requests away before the upload is even saved when Gemini is saturated
+        if model:
+            gemini_limiter.check()
+
+        upload = _buffer_upload(file)
 
-        enhanced_resume_path, explanation, extra_files = process_resume_with_ai(filepath, job_description, output_format)
-        
-        # Update analytics
-        analytics_data['total_resumes_generated'] += 1
-        
         # Return success with explanation
-        resp = {
-            'success': True,
-            'preview_url': f'/preview/{os.path.basename(enhanced_resume_path)}',
-            'download_url': f'/download/{os.path.basename(enhanced_resume_path)}',
-            'explanation': explanation,
-            'job_url': job_source_url,
-            'additional_downloads': {k: f'/download/{os.path.basename(v)}' for k, v in extra_files.items()} if extra_files else {}
-        }
-        return jsonify(resp)
-        
+        return jsonify(run_resume_pipeline(upload, job_description_raw, output_format))
+
+    except Overloaded as ov:
+        return _overloaded_response(ov)
     except Exception as e:
         logger.error(f"Error generating resume: {str(e)}")
         return jsonify({'error': f'Error processing resume: {str(e)}'}), 500
 
-def process_resume_with_ai(resume_path: str, job_description: str, output_format: str) -> tuple[str, str, dict]:
-    """Process resume with AI enhancement and return main file path, explanation, and any extra files."""
+@app.route('/generate_resume/async', methods=['POST'])
+def generate_resume_async():
+    """Queue a resume generation job and return its id immediately"""
     try:
-        # Extract text from uploaded resume
-        resume_text = extract_text_from_pdf(resume_path)
-        
+        error, file, job_description_raw, output_format = _validate_resume_request()
+        if error:
+            return error
+
+        upload = _buffer_upload(file)
+        try:
+            job_id = job_queue.submit(run_resume_pipeline, upload, job_description_raw, output_format, mode='async')
+        except QueueFull as qf:
+            upload.close()
+            resp = jsonify({'error': 'Server is busy, please try again shortly.', 'retry_after': qf.retry_after})
+            return resp, 503, {'Retry-After': str(qf.retry_after)}
+
+        stats = job_queue.stats()
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'queue_depth': stats['queue_depth'],
+            'estimated_wait_seconds': stats['estimated_wait_seconds']
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Error queueing resume job: {str(e)}")
+        return jsonify({'error': f'Error processing resume: {str(e)}'}), 500
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _stream_resume_events(upload: ResumeSource, job_description_raw: str, output_format: str):
+    """Yield SSE events: enhanced text as it streams from the model, then the final result."""
+    yield _sse('status', {'stage': 'extracting'})
+    job_description, job_source_url = resolve_job_description(job_description_raw)
+    try:
+        resume_text = extract_resume_text(upload)
         if not resume_text.strip():
             raise ValueError("Could not extract text from PDF")
-        
-        # Generate enhanced resume with AI
+
+        explanation = None
         if model:
-            enhanced_content, explanation = enhance_resume_with_ai(resume_text, job_description)
+            yield _sse('status', {'stage': 'enhancing'})
+            try:
+                prompt, key = build_enhance_prompt(resume_text, job_description)
+                parts = []
+                with observe_stage('ai_enhance'):
+                    for chunk in generate_text_stream(prompt, key):
+                        parts.append(chunk)
+                        yield _sse('delta', {'text': chunk})
+                enhanced_content = finish_enhanced_text(''.join(parts))
+            except Overloaded:
+                raise
+            except Exception as e:
+                logger.error(f"Error in AI enhancement: {e}")
+                record_fallback('ai_error')
+                enhanced_content = resume_text
+                explanation = f"AI enhancement temporarily unavailable (fallback). Error: {e}"
         else:
-            # Fallback: basic processing without AI
             enhanced_content = resume_text
             explanation = "AI enhancement unavailable. Original resume returned."
             logger.warning("AI processing disabled, returning original content")
+            record_fallback('ai_disabled')
+
+        document = build_resume_document(enhanced_content)
+        yield _sse('formatted', {'text': document.text})
+        yield _sse('status', {'stage': 'rendering'})
+        output_path, explanation, extra_files = render_resume_outputs(
+            resume_text, document, job_description, output_format, explanation
+        )
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error in AI processing: {str(e)}")
+        output_path, explanation, extra_files = copy_original_resume(upload, output_format)
+
+    analytics.incr('resumes_generated')
+    RESUMES_GENERATED.labels(mode='stream').inc()
+    yield _sse('result', build_resume_response(output_path, explanation, extra_files, job_source_url))
+
+@app.route('/generate_resume/stream', methods=['POST'])
+def generate_resume_stream():
+    """Generate a resume, streaming the AI output as Server-Sent Events"""
+    try:
+        error, file, job_description_raw, output_format = _validate_resume_request()
+        if error:
+            return error
+        if model:
+            gemini_limiter.check()
+        upload = _buffer_upload(file)
+    except Overloaded as ov:
+        return _overloaded_response(ov)
+    except Exception as e:
+        logger.error(f"Error starting resume stream: {str(e)}")
+        return jsonify({'error': f'Error processing resume: {str(e)}'}), 500
+
+    def events():
+        try:
+            with track_in_flight('stream'):
+                yield from _stream_resume_events(upload, job_description_raw, output_format)
+        except Overloaded as ov:
+            yield _sse('error', {'error': 'The AI service is busy, please try again shortly.', 'retry_after': ov.retry_after})
+        except Exception as e:
+            logger.error(f"Error streaming resume: {str(e)}")
+            yield _sse('error', {'error': f'Error processing resume: {str(e)}'})
+        finally:
+            _discard_upload(upload)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+#############################
+# Batch tailoring
+#############################
+
+def _parse_batch_jobs():
+    """Job descriptions/URLs from repeated ``job_descriptions`` fields or one JSON array."""
+    values = [v.strip() for v in request.form.getlist('job_descriptions') if v.strip()]
+    if len(values) == 1 and values[0].startswith('['):
+        try:
+            parsed = json.loads(values[0])
+        except ValueError:
+            return None
+        if not isinstance(parsed, list) or not all(isinstance(v, str) for v in parsed):
+            return None
+        values = [v.strip() for v in parsed if v.strip()]
+    return values
+
+def _batch_entry_name(index: int, job_description_raw: str, ext: str) -> str:
+    label = re.sub(r'^https?://(www\.)?', '', job_description_raw.lower())
+    slug = re.sub(r'[^a-z0-9]+', '-', label)[:40].strip('-') or 'job'
+    return f"{index + 1:02d}_{slug}.{ext}"
+
+def run_batch_pipeline(upload: ResumeSource, job_descriptions_raw: list, output_format: str) -> dict:
+    """Tailor one resume to many jobs: extract once, fan out fetches, AI calls and renders."""
+    try:
+        with track_in_flight('batch'):
+            resume_text = extract_resume_text(upload)
+            if not resume_text.strip():
+                raise ValueError("Could not extract text from PDF")
+
+            with ThreadPoolExecutor(max_workers=BATCH_FETCH_WORKERS, thread_name_prefix='batch-fetch') as pool:
+                resolved = list(pool.map(resolve_job_description, job_descriptions_raw))
+
+            def tailor(item):
+                index, (job_description, job_source_url) = item
+                try:
+                    path, explanation, extra = tailor_resume_text(resume_text, job_description, output_format)
+                except Overloaded:
+                    return index, {'success': False, 'job_url': job_source_url,
+                                   'error': 'The AI service is busy, please retry this job.'}
+                except Exception as e:
+                    logger.error(f"Batch item {index} failed: {e}")
+                    return index, {'success': False, 'job_url': job_source_url, 'error': str(e)}
+                analytics.incr('resumes_generated')
+                RESUMES_GENERATED.labels(mode='batch').inc()
+                return index, dict(build_resume_response(path, explanation, extra, job_source_url), files=(path, extra))
+
+            # Each item runs its enhancement call, then renders on the shared
+            # stage pool; Gemini calls still pass through gemini_limiter
+            with ThreadPoolExecutor(max_workers=BATCH_AI_CONCURRENCY, thread_name_prefix='batch-ai') as pool:
+                results = dict(pool.map(tailor, enumerate(resolved)))
+    finally:
+        _discard_upload(upload)
+
+    batch_id = uuid.uuid4().hex
+    zip_name = f"{batch_id}_batch.zip"
+    zip_path = os.path.join(PREVIEWS_FOLDER, zip_name)
+    tmp = f"{zip_path}.{os.getpid()}.tmp"
+    items = []
+    # Renders are already compressed, so store rather than deflate
+    with zipfile.ZipFile(tmp, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for index, job_raw in enumerate(job_descriptions_raw):
+            item = results[index]
+            files = item.pop('files', None)
+            if files:
+                path, extra = files
+                entry = _batch_entry_name(index, job_raw, 'pdf')
+                zf.write(path, entry)
+                item['zip_entry'] = entry
+                # Deferred DOCX (format=pdf) stays a separate on-demand download
+                if 'docx' in extra and os.path.exists(extra['docx']):
+                    zf.write(extra['docx'], _batch_entry_name(index, job_raw, 'docx'))
+            items.append(dict(item, index=index))
+    os.replace(tmp, zip_path)
+    _publish_artifact(zip_path)
+
+    return {
+        'success': any(item['success'] for item in items),
+        'batch_id': batch_id,
+        'count': len(items),
+        'succeeded': sum(1 for item in items if item['success']),
+        'zip_url': f'/download/{zip_name}',
+        'items': items
+    }
+
+@app.route('/generate_resume/batch', methods=['POST'])
+def generate_resume_batch():
+    """Queue one resume tailored to a list of job descriptions/URLs"""
+    try:
+        error, file = _validate_resume_file()
+        if error:
+            return error
+        job_descriptions_raw = _parse_batch_jobs()
+        if not job_descriptions_raw:
+            return jsonify({'error': 'Provide job_descriptions as repeated fields or a JSON array of strings'}), 400
+        if len(job_descriptions_raw) > BATCH_MAX_JOBS:
+            return jsonify({'error': f'At most {BATCH_MAX_JOBS} job descriptions per batch'}), 400
+        output_format = request.form.get('format', 'pdf')
+
+        upload = _buffer_upload(file)
+        try:
+            job_id = job_queue.submit(run_batch_pipeline, upload, job_descriptions_raw, output_format)
+        except QueueFull as qf:
+            upload.close()
+            resp = jsonify({'error': 'Server is busy, please try again shortly.', 'retry_after': qf.retry_after})
+            return resp, 503, {'Retry-After': str(qf.retry_after)}
+        if RATE_LIMIT_PER_MINUTE > 0:
+            # The rate limit hook took one token; a batch costs one per job
+            rate_limiter.charge(_client_ip(), len(job_descriptions_raw) - 1)
+
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f'/jobs/{job_id}',
+            'count': len(job_descriptions_raw)
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Error queueing batch: {str(e)}")
+        return jsonify({'error': f'Error processing batch: {str(e)}'}), 500
+
+@app.route('/jobs/stats')
+def job_stats():
+    """Queue depth and wait times for the serving worker"""
+    return jsonify(job_queue.stats())
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Poll the status and, once finished, the result of a queued job"""
+    record = job_queue.get(job_id)
+    if record is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(record)
+
+def process_resume_with_ai(resume: ResumeSource, job_description: str, output_format: str) -> tuple[str, str, dict]:
+    """Process resume with AI enhancement and return main file path, explanation, and any extra files."""
+    try:
+        # Extract text from uploaded resume
+        resume_text = extract_resume_text(resume)
         
-        # Generate output file
-        output_filename = f"{uuid.uuid4()}_enhanced_resume.pdf"
-        output_pdf_path = os.path.join(PREVIEWS_FOLDER, output_filename)
-        create_pdf_resume(enhanced_content, output_pdf_path)
-
-        extra = {}
-        if output_format.lower() == 'docx':
-            docx_filename = f"{uuid.uuid4()}_enhanced_resume.docx"
-            docx_path = os.path.join(PREVIEWS_FOLDER, docx_filename)
-            create_docx_resume(enhanced_content, docx_path)
-            extra['docx'] = docx_path
-        elif output_format.lower() == 'pdf':
-            # Optionally also create docx for user convenience
-            try:
-                docx_filename = f"{uuid.uuid4()}_enhanced_resume.docx"
-                docx_path = os.path.join(PREVIEWS_FOLDER, docx_filename)
-                create_docx_resume(enhanced_content, docx_path)
-                extra['docx'] = docx_path
-            except Exception as ce:
-                logger.warning(f"DOCX generation failed (non-fatal): {ce}")
-
-        return output_pdf_path, explanation, extra
+        if not resume_text.strip():
+            raise ValueError("Could not extract text from PDF")
         
+        return tailor_resume_text(resume_text, job_description, output_format)
+
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error in AI processing: {str(e)}")
-        # Fallback: just copy the original file
-        output_filename = f"{uuid.uuid4()}_resume.{output_format}"
-        output_path = os.path.join(PREVIEWS_FOLDER, output_filename)
-        shutil.copy2(resume_path, output_path)
+        return copy_original_resume(resume, output_format)
+
+def tailor_resume_text(resume_text: str, job_description: str, output_format: str) -> tuple[str, str, dict]:
+    """Enhance already-extracted resume text for one job and render the outputs."""
+    # Generate enhanced resume with AI
+    explanation = None
+    if model:
+        try:
+            if AI_SINGLE_CALL:
+                enhanced_content, explanation = enhance_and_explain(resume_text, job_description)
+                if explanation is None:
+                    record_fallback('explanation_deterministic')
+                    explanation = build_deterministic_explanation(resume_text, enhanced_content, job_description)
+            else:
+                enhanced_content = enhance_resume_text(resume_text, job_description)
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error in AI enhancement: {e}")
+            record_fallback('ai_error')
+            enhanced_content = resume_text
+            explanation = f"AI enhancement temporarily unavailable (fallback). Error: {e}"
+    else:
+        # Fallback: basic processing without AI
+        enhanced_content = resume_text
+        explanation = "AI enhancement unavailable. Original resume returned."
+        logger.warning("AI processing disabled, returning original content")
+        record_fallback('ai_disabled')
+
+    return render_resume_outputs(resume_text, enhanced_content, job_description, output_format, explanation)
+
+def render_resume_outputs(resume_text: str, enhanced_content: Union[str, ResumeDocument], job_description: str,
+                          output_format: str, explanation: Optional[str] = None) -> tuple[str, str, dict]:
+    """Render PDF (and DOCX) output; generates the explanation too when none is given."""
+    # Format once; renderers and the explanation share the parsed document
+    document = build_resume_document(enhanced_content)
+
+    # Render outputs concurrently with the explanation call; none of these
+    # stages depend on each other once the formatted text exists
+    output_filename = f"{uuid.uuid4()}_enhanced_resume.pdf"
+    output_pdf_path = os.path.join(PREVIEWS_FOLDER, output_filename)
+    pdf_future = stage_executor.submit(_render_artifact, create_pdf_resume, document, output_pdf_path)
+
+    docx_future = None
+    docx_path = os.path.join(PREVIEWS_FOLDER, f"{uuid.uuid4()}_enhanced_resume.docx")
+    if output_format.lower() == 'docx':
+        docx_future = stage_executor.submit(_render_artifact, create_docx_resume, document, docx_path)
+
+    if explanation is None:
+        explanation = _generate_explanation(resume_text, document, job_description)
+
+    pdf_future.result()
+
+    extra = {}
+    if docx_future is not None:
+        docx_future.result()
+        extra['docx'] = docx_path
+    elif output_format.lower() == 'pdf':
+        # PDF requests also get a DOCX for user convenience, rendered on first download
+        try:
+            _write_docx_source(document, docx_path)
+            extra['docx'] = docx_path
+        except Exception as ce:
+            logger.warning(f"Could not store DOCX source (non-fatal): {ce}")
+
+    return output_pdf_path, explanation, extra
+
+def _publish_artifact(path: str):
+    """Hand a finished file to artifact storage so any instance can serve it."""
+    with observe_stage('publish'):
+        artifact_storage.publish(path)
+
+def _render_artifact(render: Callable, document: ResumeDocument, path: str):
+    render(document, path)
+    _publish_artifact(path)
+
+def _docx_source_path(docx_path: str) -> str:
+    return os.path.splitext(docx_path)[0] + '.txt'
+
+def _write_docx_source(document: ResumeDocument, docx_path: str):
+    """Store the formatted content next to where the DOCX will be rendered."""
+    source_path = _docx_source_path(docx_path)
+    tmp = f"{source_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(document.source)
+    os.replace(tmp, source_path)
+    _publish_artifact(source_path)
+
+def _read_docx_source(source_path: str) -> Optional[str]:
+    # Another instance may have written it, so fall back to shared storage
+    try:
+        with open(source_path, encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    try:
+        with artifact_storage.open(os.path.basename(source_path)) as body:
+            return body.read().decode('utf-8')
+    except FileNotFoundError:
+        return None
+
+_docx_render_lock = threading.Lock()
+
+def ensure_docx_rendered(docx_path: str) -> bool:
+    """Render a deferred DOCX from its stored content if needed. False if there is nothing to render."""
+    if os.path.exists(docx_path) or artifact_storage.exists(os.path.basename(docx_path)):
+        return True
+    source = _read_docx_source(_docx_source_path(docx_path))
+    if source is None:
+        return False
+    with _docx_render_lock:
+        if os.path.exists(docx_path):
+            return True
+        # Render beside the target and swap in, so a concurrent download in
+        # another worker never sees a half-written file
+        tmp = f"{docx_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            create_docx_resume(source, tmp)
+            os.replace(tmp, docx_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        _publish_artifact(docx_path)
+    return True
+
+def copy_original_resume(resume: ResumeSource, output_format: str) -> tuple[str, str, dict]:
+    """Fallback: just copy the original file"""
+    record_fallback('copy_original')
+    output_filename = f"{uuid.uuid4()}_resume.{output_format}"
+    output_path = os.path.join(PREVIEWS_FOLDER, output_filename)
+    # The only point where an in-memory upload is written to disk
+    if isinstance(resume, UploadBuffer):
+        resume.save(output_path)
+    else:
+        shutil.copy2(resume, output_path)
+    _publish_artifact(output_path)
     return output_path, "Error occurred during AI enhancement. Original resume returned.", {}
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from PDF file"""
+def extract_text_from_pdf(source: Union[str, BinaryIO]) -> str:
+    """Extract text from a PDF path or file-like object"""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() + "\n"
-        return text
+        return pdf_extractor.extract(source)
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         return ""
 
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def extract_resume_text(resume: ResumeSource) -> str:
+    """Extract PDF text, reusing the cached result for byte-identical uploads."""
+    digest = resume.digest if isinstance(resume, UploadBuffer) else file_digest(resume)
+    # Text depends on the extraction backends too, not just the bytes
+    digest = hashlib.sha256(f"{pdf_extractor.cache_tag}:{digest}".encode()).hexdigest()
+    cached = pdf_text_cache.get(digest)
+    if cached is not None:
+        return cached
+    with observe_stage('extract_text'):
+        text = extract_text_from_pdf(resume.open() if isinstance(resume, UploadBuffer) else resume)
+    if text.strip():
+        pdf_text_cache.set(digest, text)
+    return text
+
 #############################################
 # AI Enhancer with Robust Formatting & Explain
 #############################################
 
-def _normalize_ai_text(text: str) -> str:
-    """Normalize AI output to consistent plain text resume format."""
-    if not text:
-        return ""
-    lines = []
-    for raw in text.splitlines():
-        line = raw.strip('\r ').rstrip()
-        if not line:
-            lines.append("")
-            continue
-        # Normalize bullets
-        if re.match(r"^[•*\-]\s+", line):
-            body = re.sub(r"^[•*\-]\s+", "", line).strip()
-            lines.append(f"- {body}")
-            continue
-        # Uppercase section headers heuristically
-        if (len(line) < 40 and 1 <= len(line.split()) <= 5 and
-            any(tok.lower() in {"summary","experience","education","skills","projects","certifications","profile","objective"} for tok in line.lower().split())):
-            lines.append("")
-            lines.append(line.upper())
-            lines.append("")
-            continue
-        lines.append(line)
-    # Collapse multiple blank lines
-    cleaned = []
-    blank = False
-    for l in lines:
-        if l == "":
-            if not blank:
-                cleaned.append("")
-            blank = True
+# Bump when the wording of a prompt changes so cached responses are not reused
+ENHANCE_PROMPT_VERSION = 'enhance-v2'
+EXPLAIN_PROMPT_VERSION = 'explain-v2'
+COMBINED_PROMPT_VERSION = 'combined-v1'
+
+def report_prompt_budget(prompt: str, *parts: CompressedText):
+    """Log and count how many tokens compression kept out of a prompt."""
+    original = sum(p.original_tokens for p in parts)
+    sent = sum(p.tokens for p in parts)
+    PROMPT_TOKENS.labels(prompt=prompt, kind='original').inc(original)
+    PROMPT_TOKENS.labels(prompt=prompt, kind='sent').inc(sent)
+    logger.info(f"{prompt} prompt inputs: ~{sent} tokens sent of ~{original} ({original - sent} saved)")
+
+def ai_cache_key(prompt_version: str, *parts: str) -> str:
+    """Hash prompt version, model name and prompt inputs into a cache key."""
+    h = hashlib.sha256()
+    for part in (prompt_version, MODEL_CACHE_NAME) + parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+def generate_text_cached(prompt: str, cache_key: str, generation_config: Optional[dict] = None,
+                         cache_if: Optional[Callable[[str], bool]] = None) -> str:
+    """Call the model, reusing a stored response for an identical request."""
+    cached = ai_response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    with gemini_limiter.slot():
+        if generation_config:
+            resp = model.generate_content(prompt, generation_config=generation_config)
         else:
-            cleaned.append(l)
-            blank = False
-    return "\n".join(cleaned).strip()
+            resp = model.generate_content(prompt)
+    text = (resp.text or '').strip() if resp else ''
+    if text and (cache_if is None or cache_if(text)):
+        ai_response_cache.set(cache_key, text)
+    return text
 
+TOKEN_RE = re.compile(r"[A-Za-z]{3,}")
+
+def _tokens(s: str) -> set:
+    return set(TOKEN_RE.findall(s.lower()))
+
+def generate_text_stream(prompt: str, cache_key: str):
+    """Yield model output chunks as they arrive; a cached response is yielded whole."""
+    cached = ai_response_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    parts = []
+    with gemini_limiter.slot():
+        for chunk in model.generate_content(prompt, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata) raise on .text
+                continue
+            if text:
+                parts.append(text)
+                yield text
+    full = ''.join(parts).strip()
+    if full:
+        ai_response_cache.set(cache_key, full)
 
 def _heuristic_explanation(original: str, enhanced: str, job: str) -> str:
     """Fallback explanation if model fails or returns unusable text."""
-    def tokens(s):
-        return set(re.findall(r"[A-Za-z]{3,}", s.lower()))
+    tokens = _tokens
     o, e, j = tokens(original), tokens(enhanced), tokens(job)
     new_job_terms = (e - o) & j
     improved_overlap = len((e & j)) - len((o & j))
@@ -271,12 +901,17 @@ def _heuristic_explanation(original: str, enhanced: str, job: str) -> str:
     return "\n".join(bullets)
 
 
-def _generate_explanation(original: str, enhanced: str, job: str) -> str:
+def _generate_explanation(original: str, enhanced: Union[str, ResumeDocument], job: str) -> str:
     """Generate structured explanation referencing sections & job content."""
+    enhanced_text = document_source(enhanced)
     # First attempt AI detailed explanation
     ai_text = None
     if model:
         try:
+            job_part = compress_job_description(job, EXPLAIN_JOB_TOKENS)
+            original_part = compress_resume(original, EXPLAIN_RESUME_TOKENS)
+            enhanced_part = compress_resume(enhanced_text, EXPLAIN_RESUME_TOKENS)
+            report_prompt_budget('explain', job_part, original_part, enhanced_part)
             prompt = f"""
 You are an expert resume coach. Compare ORIGINAL vs ENHANCED for JOB CONTENT.
 OUTPUT STRICTLY:
@@ -285,26 +920,31 @@ OUTPUT STRICTLY:
 • Use SECTION names (SUMMARY, EXPERIENCE, EDUCATION, SKILLS, PROJECTS, CERTIFICATIONS) when applicable; if cross-sectional use **OVERALL IMPACT**.
 No generic advice, no asking for info.
 
-JOB CONTENT (truncated):\n{job[:3000]}\n---
-ORIGINAL (truncated):\n{original[:3500]}\n---
-ENHANCED (truncated):\n{enhanced[:3500]}\n---
+JOB CONTENT (condensed):\n{job_part.text}\n---
+ORIGINAL (condensed):\n{original_part.text}\n---
+ENHANCED (condensed):\n{enhanced_part.text}\n---
 """
-            resp = model.generate_content(prompt)
-            ai_text = (resp.text or '').strip() if resp else ''
+            key = ai_cache_key(EXPLAIN_PROMPT_VERSION, job_part.text, original_part.text, enhanced_part.text)
+            with observe_stage('ai_explain'):
+                ai_text = generate_text_cached(prompt, key)
         except Exception as e:
             logger.warning(f"AI structured explanation failed: {e}")
             ai_text = None
     if ai_text and len(ai_text.split()) > 12:
         return ai_text
     # Fallback structured deterministic explanation
+    if model:
+        record_fallback('explanation_deterministic')
     return build_deterministic_explanation(original, enhanced, job)
 
-def build_deterministic_explanation(original: str, enhanced: str, job: str) -> str:
-    def tokens(s):
-        return set(re.findall(r"[A-Za-z]{3,}", s.lower()))
+def build_deterministic_explanation(original: str, enhanced: Union[str, ResumeDocument], job: str) -> str:
+    tokens = _tokens
     job_toks = tokens(job)
     orig_sections = parse_sections(original)
-    enh_sections = parse_sections(enhanced)
+    if isinstance(enhanced, ResumeDocument):
+        enh_sections = enhanced.loose_sections
+    else:
+        enh_sections = parse_sections(enhanced)
     bullets = []
     for section, eh_lines in enh_sections.items():
         otext = '\n'.join(orig_sections.get(section, []))
@@ -323,30 +963,15 @@ def build_deterministic_explanation(original: str, enhanced: str, job: str) -> s
         if len(bullets) >= 6:
             break
     if not bullets:
-        return _heuristic_explanation(original, enhanced, job)
+        return _heuristic_explanation(original, document_source(enhanced), job)
     return '\n'.join(bullets)
 
-def parse_sections(text: str) -> dict:
-    current = 'GENERAL'
-    sections = {current: []}
-    for line in text.splitlines():
-        l = line.strip()
-        if not l:
-            continue
-        if l.isupper() and 2 <= len(l.split()) <= 5:
-            current = l
-            sections.setdefault(current, [])
-            continue
-        sections[current].append(l)
-    return sections
-
-
-def enhance_resume_with_ai(resume_text: str, job_description: str) -> tuple[str, str]:
-    """Enhance resume using AI with formatting + explanation fallback."""
-    if not model:
-        return resume_text, "AI disabled: original resume returned."
-    try:
-        enhance_prompt = f"""
+def build_enhance_prompt(resume_text: str, job_description: str) -> tuple[str, str]:
+    """Return the rewrite prompt and its response-cache key."""
+    job_part = compress_job_description(job_description, ENHANCE_JOB_TOKENS)
+    resume_part = compress_resume(resume_text, ENHANCE_RESUME_TOKENS)
+    report_prompt_budget('enhance', job_part, resume_part)
+    enhance_prompt = f"""
 You are an elite technical resume writer. Rewrite the resume for the job below.
 RULES:
 - Preserve factual data (companies, titles, dates, degrees).
@@ -356,16 +981,101 @@ RULES:
 - Dense, concise, ATS friendly. First line: candidate name + primary contact placeholders if missing.
 - Output ONLY the enhanced resume text. No commentary.
 
-JOB DESCRIPTION (trimmed):\n{job_description[:3000]}\n---
-ORIGINAL RESUME (trimmed):\n{resume_text[:5000]}\n---
+JOB DESCRIPTION (condensed):\n{job_part.text}\n---
+ORIGINAL RESUME (condensed):\n{resume_part.text}\n---
 """
-        raw = model.generate_content(enhance_prompt)
-        enhanced_raw = (raw.text or '').strip() if raw else ''
-        if not enhanced_raw:
-            raise ValueError("Empty AI response")
-        normalized = _normalize_ai_text(enhanced_raw)
-        sanitized = sanitize_enhanced_content(normalized)
-        formatted = final_format_resume(sanitized)
+    key = ai_cache_key(ENHANCE_PROMPT_VERSION, resume_part.text, job_part.text)
+    return enhance_prompt, key
+
+def finish_enhanced_text(enhanced_raw: str) -> str:
+    """Normalize, sanitize and format raw model output. Raises on an empty response."""
+    enhanced_raw = (enhanced_raw or '').strip()
+    if not enhanced_raw:
+        raise ValueError("Empty AI response")
+    normalized = _normalize_ai_text(enhanced_raw)
+    sanitized = sanitize_enhanced_content(normalized)
+    return final_format_resume(sanitized)
+
+def enhance_resume_text(resume_text: str, job_description: str) -> str:
+    """Rewrite the resume with AI and return the normalized, formatted text. Raises on failure."""
+    prompt, key = build_enhance_prompt(resume_text, job_description)
+    with observe_stage('ai_enhance'):
+        raw = generate_text_cached(prompt, key)
+    return finish_enhanced_text(raw)
+
+def build_combined_prompt(resume_text: str, job_description: str) -> tuple[str, str]:
+    """Return a prompt asking for the rewrite and its explanation as one JSON object."""
+    job_part = compress_job_description(job_description, ENHANCE_JOB_TOKENS)
+    resume_part = compress_resume(resume_text, ENHANCE_RESUME_TOKENS)
+    report_prompt_budget('combined', job_part, resume_part)
+    prompt = f"""
+You are an elite technical resume writer and coach. Rewrite the resume for the job below, then explain the changes.
+RESUME RULES:
+- Preserve factual data (companies, titles, dates, degrees).
+- Strengthen impact; add conservative metrics ONLY if logically implied.
+- Use standard US resume section headers in ALL CAPS: SUMMARY, EXPERIENCE, EDUCATION, SKILLS, (PROJECTS if present), CERTIFICATIONS.
+- Bullets start with a strong action verb; no first-person; no pronouns.
+- Dense, concise, ATS friendly. First line: candidate name + primary contact placeholders if missing.
+EXPLANATION RULES:
+- 5-7 bullets, each "**SECTION / FOCUS:** concise change" with 1 short quoted phrase ("...") from the rewrite that aligns with the job, ending with why it improves fit.
+- Use SECTION names (SUMMARY, EXPERIENCE, EDUCATION, SKILLS, PROJECTS, CERTIFICATIONS) when applicable; if cross-sectional use **OVERALL IMPACT**.
+Respond with a JSON object only: {{"resume": "<full rewritten resume text>", "explanation": ["<bullet>", ...]}}
+
+JOB DESCRIPTION (condensed):\n{job_part.text}\n---
+ORIGINAL RESUME (condensed):\n{resume_part.text}\n---
+"""
+    key = ai_cache_key(COMBINED_PROMPT_VERSION, resume_part.text, job_part.text)
+    return prompt, key
+
+JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+BULLET_PREFIX_RE = re.compile(r'^(?:[•\-]|\*(?!\*))\s*')
+
+def parse_combined_response(raw: str) -> tuple[str, Optional[str]]:
+    """Split a combined JSON response into (resume text, explanation or None).
+
+    Raises ValueError when the resume part is unusable; a malformed
+    explanation only yields None so the caller can fall back.
+    """
+    try:
+        data = json.loads(JSON_FENCE_RE.sub('', (raw or '').strip()))
+    except ValueError:
+        raise ValueError("AI response was not valid JSON")
+    resume = data.get('resume') if isinstance(data, dict) else None
+    if not isinstance(resume, str) or not resume.strip():
+        raise ValueError("AI response had no resume text")
+
+    bullets = data.get('explanation')
+    if isinstance(bullets, str):
+        bullets = bullets.splitlines()
+    if not isinstance(bullets, list) or not all(isinstance(b, str) for b in bullets):
+        return resume, None
+    bullets = [BULLET_PREFIX_RE.sub('', b.strip()) for b in bullets if b.strip()]
+    if not 3 <= len(bullets) <= 10 or sum(len(b.split()) for b in bullets) <= 12:
+        return resume, None
+    return resume, "\n".join(f"• {b}" for b in bullets)
+
+def _valid_combined_response(raw: str) -> bool:
+    try:
+        parse_combined_response(raw)
+    except ValueError:
+        return False
+    return True
+
+def enhance_and_explain(resume_text: str, job_description: str) -> tuple[str, Optional[str]]:
+    """One model call for both the formatted rewrite and its explanation (None if malformed)."""
+    prompt, key = build_combined_prompt(resume_text, job_description)
+    with observe_stage('ai_combined'):
+        raw = generate_text_cached(prompt, key, generation_config={'response_mime_type': 'application/json'},
+                                   cache_if=_valid_combined_response)
+    resume_raw, explanation = parse_combined_response(raw)
+    return finish_enhanced_text(resume_raw), explanation
+
+def enhance_resume_with_ai(resume_text: str, job_description: str) -> tuple[str, str]:
+    """Enhance resume using AI with formatting + explanation fallback."""
+    if not model:
+        return resume_text, "AI disabled: original resume returned."
+    try:
+        formatted = enhance_resume_text(resume_text, job_description)
         explanation = _generate_explanation(resume_text, formatted, job_description)
         return formatted, explanation
     except Exception as e:
@@ -379,452 +1089,149 @@ ORIGINAL RESUME (trimmed):\n{resume_text[:5000]}\n---
 def is_probable_url(text: str) -> bool:
     return bool(re.match(r'^https?://[^\s]+$', text.strip()))
 
+job_fetch_stats = {'fresh_hits': 0, 'revalidated': 0, 'fetched': 0, 'stale_served': 0, 'errors': 0}
+_job_fetch_lock = threading.Lock()
+
+def _count_job_fetch(kind: str):
+    with _job_fetch_lock:
+        job_fetch_stats[kind] += 1
+
 def fetch_job_content(url: str, timeout: int = 10) -> str:
-    """Fetch and extract main textual content from a job posting URL."""
+    """Fetch and extract main textual content from a job posting URL (cached by URL)."""
+    key = url.strip()
+    entry = None
+    cached = job_content_cache.get(key)
+    if cached is not None:
+        try:
+            entry = json.loads(cached)
+        except ValueError:
+            entry = None
+    now = time.time()
+    if entry and now - entry.get('fetched_at', 0) < JOB_FETCH_FRESH_SECONDS:
+        _count_job_fetch('fresh_hits')
+        return entry['text']
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (JobContentFetcher/1.0)'
-        }
-        resp = requests.get(url, headers=headers, timeout=timeout)
-        if resp.status_code != 200:
-            logger.warning(f"Job URL fetch non-200: {resp.status_code}")
-            return ''
-        soup = BeautifulSoup(resp.text, 'html.parser')
-        # Remove script/style/nav/footer
-        for tag in soup(['script','style','noscript','header','footer','svg']):
-            tag.decompose()
-        text_parts = []
-        # Domain heuristics
-        domain = re.sub(r'^https?://','', url).split('/')[0]
-        selectors = []
-        if 'greenhouse' in domain:
-            selectors += ['div#content', 'div.opening', 'div.main']
-        if 'lever.co' in domain:
-            selectors += ['div.posting', 'div.content']
-        if 'workday' in domain:
-            selectors += ['div.body', 'div.GWTCKEditor']
-        if 'linkedin.' in domain:
-            selectors += ['div.description__text', 'section.description']
-        if 'indeed.' in domain:
-            selectors += ['div.jobsearch-JobComponent', 'div.jobsearch-JobDescription']
-        # Add generic probable containers
-        selectors += ['section','article','div']
-        grabbed = set()
-        for sel in selectors:
-            for node in soup.select(sel):
-                txt = node.get_text(separator=' ', strip=True)
-                if txt and len(txt.split()) > 40 and txt not in grabbed:
-                    text_parts.append(txt)
-                    grabbed.add(txt)
-                    if sum(len(p.split()) for p in text_parts) > 1600:
-                        break
-            if sum(len(p.split()) for p in text_parts) > 1600:
-                break
-        if not text_parts:
-            # fallback entire body text
-            body_txt = soup.get_text(separator=' ', strip=True)
-            return ' '.join(body_txt.split()[:1800])
-        combined = '\n'.join(text_parts)
-        cleaned = re.sub(r'\s+',' ', combined)
-        return cleaned[:12000]
+        resp = get_http_session().get(key, headers=headers, timeout=timeout)
     except Exception as e:
         logger.warning(f"Job content fetch failed: {e}")
+        _count_job_fetch('stale_served' if entry else 'errors')
+        return entry['text'] if entry else ''
+    if resp.status_code == 304 and entry:
+        entry['fetched_at'] = now
+        job_content_cache.set(key, json.dumps(entry))
+        _count_job_fetch('revalidated')
+        return entry['text']
+    if resp.status_code != 200:
+        logger.warning(f"Job URL fetch non-200: {resp.status_code}")
+        _count_job_fetch('stale_served' if entry else 'errors')
+        return entry['text'] if entry else ''
+    text = extract_job_text(resp.text, key)
+    _count_job_fetch('fetched')
+    if text:
+        job_content_cache.set(key, json.dumps({
+            'text': text,
+            'etag': resp.headers.get('ETag'),
+            'last_modified': resp.headers.get('Last-Modified'),
+            'fetched_at': now
+        }))
+    return text
+
+def extract_job_text(html: str, url: str) -> str:
+    """Extract the main job-posting text from a fetched HTML page."""
+    try:
+        from content_extractor import extract_main_text
+        return extract_main_text(html, url)
+    except Exception as e:
+        logger.warning(f"Job content extraction failed: {e}")
         return ''
 
-def create_pdf_resume(content: str, output_path: str):
+@observe_stage('render_pdf')
+def create_pdf_resume(content: Union[str, ResumeDocument], output_path: str):
     """Create a professionally formatted PDF with strict section layout."""
+    resume = None
     try:
-        from reportlab.lib.enums import TA_CENTER
-        content = final_format_resume(content)
-        content = clean_for_pdf(content)
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=letter,
-            rightMargin=54,
-            leftMargin=54,
-            topMargin=50,
-            bottomMargin=50,
-        )
-        styles = getSampleStyleSheet()
-        base = styles['Normal']
-        base.fontSize = 10
-        base.leading = 13
-        title_style = ParagraphStyle('TITLE', parent=base, fontSize=16, leading=18, alignment=TA_CENTER, spaceAfter=6)
-        contact_style = ParagraphStyle('CONTACT', parent=base, fontSize=9, alignment=TA_CENTER, textColor=colors.HexColor('#333333'), spaceAfter=10)
-        section_style = ParagraphStyle('SECTION', parent=base, fontSize=11, leading=14, spaceBefore=10, spaceAfter=4, textColor=colors.HexColor('#111111'))
-        bullet_style = ParagraphStyle('BULLET', parent=base, leftIndent=14, bulletIndent=6, spaceBefore=1, spaceAfter=1)
-        body_style = ParagraphStyle('BODY', parent=base, spaceBefore=0, spaceAfter=3)
-
-        structured = parse_structured_lines(content)
-        story = []
-        if structured['name']:
-            story.append(Paragraph(structured['name'], title_style))
-        if structured['contact']:
-            story.append(Paragraph(structured['contact'], contact_style))
-        for sec in structured['order']:
-            entries = structured['sections'].get(sec, [])
-            if not entries:
-                continue
-            story.append(Paragraph(sec, section_style))
-            for ent in entries:
-                if ent.startswith('- '):
-                    story.append(Paragraph(ent, bullet_style))
-                else:
-                    story.append(Paragraph(ent, body_style))
-        doc.build(story)
+        resume = build_resume_document(content)
+        import renderer
+        _write_bytes(output_path, renderer.render_pdf(resume))
     except Exception as e:
         logger.error(f"Error creating PDF: {e}")
         try:
             with open(output_path.replace('.pdf', '.txt'), 'w') as f:
-                f.write(content)
+                f.write('\n'.join(resume.pdf_lines) if resume else document_source(content))
         except Exception as fe:
             logger.error(f"Fallback write failed: {fe}")
         raise e
 
-def create_docx_resume(content: str, output_path: str):
+@observe_stage('render_docx')
+def create_docx_resume(content: Union[str, ResumeDocument], output_path: str):
     """Generate a DOCX resume mirroring the PDF structure."""
     try:
-        formatted = final_format_resume(content)
-        doc = Document()
-        style = doc.styles['Normal']
-        font = style.font
-        font.name = 'Arial'
-        font.size = Pt(10.5)
-        style._element.rPr.rFonts.set(qn('w:eastAsia'), 'Arial')
-
-        structured = parse_structured_lines(formatted)
-        if structured['name']:
-            p = doc.add_paragraph()
-            r = p.add_run(structured['name'])
-            r.bold = True
-            r.font.size = Pt(16)
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        if structured['contact']:
-            p = doc.add_paragraph(structured['contact'])
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        for sec in structured['order']:
-            entries = structured['sections'].get(sec, [])
-            if not entries:
-                continue
-            ph = doc.add_paragraph()
-            rh = ph.add_run(sec)
-            rh.bold = True
-            rh.font.size = Pt(11.5)
-            for ent in entries:
-                if ent.startswith('- '):
-                    bp = doc.add_paragraph(ent[2:], style='List Bullet')
-                else:
-                    doc.add_paragraph(ent)
-        doc.save(output_path)
+        import renderer
+        _write_bytes(output_path, renderer.render_docx(build_resume_document(content)))
     except Exception as e:
         logger.error(f"Error creating DOCX: {e}")
         raise
 
-#############################
-# Post-processing sanitation
-#############################
-
-def sanitize_enhanced_content(text: str) -> str:
-    """Clean AI output: remove markdown asterisks, placeholder brackets, fix headings & bullets."""
-    lines = text.splitlines()
-    cleaned = []
-    header_keywords = {"SUMMARY","EXPERIENCE","EDUCATION","SKILLS","PROJECTS","CERTIFICATIONS","OBJECTIVE","PROFILE"}
-    action_verbs = {"developed","designed","implemented","led","managed","optimized","improved","architected","built","created","enhanced","reduced","increased","automated","migrated","refactored"}
-
-    def is_placeholder(l: str) -> bool:
-        l_low = l.lower()
-        return ('quantifiable achievement' in l_low or 'specify framework' in l_low or 'add another bullet' in l_low or l_low.startswith('[add ') )
-
-    first_content_index = None
-    for idx, raw in enumerate(lines):
-        line = raw.strip()
-        if not line:
-            cleaned.append("")
-            continue
-        # Record first non-empty
-        if first_content_index is None:
-            first_content_index = idx
-
-        # Pattern like '- *Summary**' or '- *John Smith**' possibly followed by extra asterisks or parenthetical
-        m = re.match(r"^- \*([^*]+?)\*+.*$", line)
-        if m:
-            candidate = m.group(1).strip()
-            up = candidate.upper()
-            if up in header_keywords:
-                cleaned.append(up)
-            else:
-                # Probably name line; keep original capitalization
-                cleaned.append(candidate)
-            continue
-
-        # Strip leading '- ' if it appears to be a malformed heading
-        if line.startswith('- '):
-            after = line[2:].strip()
-            # Remove leading/trailing asterisks from after
-            after = re.sub(r'^\*+','', after)
-            after = re.sub(r'\*+$','', after)
-            upper_candidate = after.upper()
-            if upper_candidate in header_keywords and len(after.split()) <= 5:
-                cleaned.append(upper_candidate)
-                continue
-            # Placeholder bullet? skip
-            if is_placeholder(after):
-                continue
-            # Real bullet if starts with verb or contains digit/percentage/tech token
-            first_word = after.split()[0].lower() if after.split() else ''
-            if first_word in action_verbs or re.search(r'(\d|api|sql|flask|python|cloud)', after.lower()):
-                cleaned.append(f"- {after}")
-                continue
-            # Otherwise keep as plain line (maybe part of contact block)
-            cleaned.append(after)
-            continue
-
-        # Remove surrounding markdown asterisks
-        line = re.sub(r'^\*+','', line)
-        line = re.sub(r'\*+$','', line)
-
-        # Remove bracket placeholders containing guidance
-        line = re.sub(r'\[(?:[^\]]*quantifiable[^\]]*)\]','', line, flags=re.IGNORECASE)
-        line = re.sub(r'\[(?:[^\]]*specify[^\]]*)\]','', line, flags=re.IGNORECASE)
-        line = re.sub(r'\[(?:[^\]]*add another bullet[^\]]*)\]','', line, flags=re.IGNORECASE)
-        line = re.sub(r'\s{2,}',' ', line).strip()
-        if not line:
-            continue
-        # Header detection (non-bullet)
-        if (len(line) < 40 and line.upper() in header_keywords):
-            cleaned.append(line.upper())
-            continue
-        cleaned.append(line)
-
-    # Collapse excess blank lines
-    final = []
-    prev_blank = False
-    for l in cleaned:
-        if l == "":
-            if not prev_blank:
-                final.append("")
-            prev_blank = True
-        else:
-            final.append(l)
-            prev_blank = False
-    return "\n".join(final).strip()
-
-def clean_for_pdf(text: str) -> str:
-    """Final cleaning for PDF rendering: remove leftover asterisks, placeholders, malformed bullets."""
-    lines = []
-    for raw in text.splitlines():
-        l = raw.strip()
-        if not l:
-            lines.append("")
-            continue
-        # Remove '- *Heading**' patterns
-        l = re.sub(r'^- \*([^*]+?)\*+.*$', r'\1', l)
-        # Remove stray leading '*'
-        l = re.sub(r'^\*(.+)\*$', r'\1', l)
-        # Strip placeholder bracket content
-        if re.search(r'(quantifiable achievement|add another bullet|specify framework|dates of employment)', l, re.IGNORECASE):
-            continue
-        # Drop any remaining bracketed guidance completely
-        if '[' in l and ']' in l:
-            l = re.sub(r'\[[^\]]*\]', '', l).strip()
-        # Collapse multiple spaces
-        l = re.sub(r'\s{2,}', ' ', l)
-        lines.append(l)
-    # Ensure first non-empty line not prefixed with '-'
-    for i, val in enumerate(lines):
-        if val and val.startswith('- '):
-            # if likely name/contact (contains @ or digit or |) promote to plain line
-            if any(tok in val.lower() for tok in ['@', 'gmail', 'linkedin', ' | ', 'github']):
-                lines[i] = val[2:].strip()
-            break
-    # Remove trailing/leading empty lines
-    while lines and not lines[0]:
-        lines.pop(0)
-    while lines and not lines[-1]:
-        lines.pop()
-    return "\n".join(lines)
+def _write_bytes(path: str, data: bytes):
+    # Rendering happens in memory, so a failed render never leaves a partial file
+    with open(path, 'wb') as f:
+        f.write(data)
 
-#############################
-# Final formatting utilities
-#############################
+def _artifact_etag(file_path: str) -> str:
+    # Outputs get unique names and are only ever swapped in whole with
+    # os.replace, so name, size and mtime pin down the exact bytes
+    st = os.stat(file_path)
+    return hashlib.sha256(f"{os.path.basename(file_path)}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:32]
 
-CANONICAL_SECTION_ORDER = ["SUMMARY","EXPERIENCE","PROJECTS","EDUCATION","SKILLS","CERTIFICATIONS"]
-
-def final_format_resume(text: str) -> str:
-    lines = [l.rstrip() for l in text.splitlines()]
-    # Merge artificially wrapped lines (no terminal punctuation & next line lowercase)
-    merged = []
-    i = 0
-    while i < len(lines):
-        cur = lines[i].rstrip()
-        if cur and not cur.startswith('- ') and not cur.isupper() and not re.match(r'^[A-Z ]{3,}$', cur) and not re.match(r'^[A-Z0-9 .,&/-]{3,}$', cur):
-            # heuristic simplified later if needed
-            pass
-        if cur and not cur.startswith('-') and not cur.endswith(('.', '!', '?')):
-            if i + 1 < len(lines):
-                nxt = lines[i+1].strip()
-                if nxt and not nxt.startswith('- ') and not nxt.isupper() and nxt[0].islower():
-                    cur = cur + ' ' + nxt
-                    i += 1
-                    # continue merging chain
-                    while i + 1 < len(lines):
-                        look = lines[i+1].strip()
-                        if look and not look.startswith('- ') and not look.isupper() and look[0].islower() and not cur.endswith(('.', '!', '?')):
-                            cur = cur + ' ' + look
-                            i += 1
-                        else:
-                            break
-        merged.append(cur)
-        i += 1
-    lines = merged
-    name = ''
-    contact_parts = []
-    idx = 0
-    while idx < len(lines) and not lines[idx].strip():
-        idx += 1
-    if idx < len(lines):
-        name = lines[idx].strip()
-        idx += 1
-    contact_tokens = ['@','linkedin','github','portfolio','http','www.','gmail','phone','|']
-    while idx < len(lines):
-        l = lines[idx].strip()
-        if not l:
-            idx += 1
-            break
-        if l.isupper() and 1 < len(l.split()) <= 5:
-            break
-        # Heuristic: treat as contact only if it contains contact token AND not obviously a job/company line
-        is_contact = any(tok in l.lower() for tok in contact_tokens)
-        job_pattern = re.search(r'(\bmanager\b|\bengineer\b|\bdeveloper\b|\bdesigner\b|\bconsultant\b|\bproject\b)', l.lower())
-        date_pattern = re.search(r'(20\d{2}|19\d{2})', l)
-        if is_contact and not (job_pattern and date_pattern):
-            contact_parts.append(l)
-            idx += 1
-            continue
-        # If line looks like start of content (job line), stop contact block
-        break
-    contact_line = ' | '.join([re.sub(r'\s+',' ',c) for c in contact_parts])
-    current = None
-    sections: dict[str,list] = {}
-    def ensure(sec):
-        sections.setdefault(sec, [])
-    def polish_bullet(text_line: str) -> str:
-        if not text_line.startswith('- '):
-            text_line = '- ' + text_line.lstrip('- ').strip()
-        body = text_line[2:].strip()
-        if body:
-            if body[0].islower():
-                body = body[0].upper() + body[1:]
-            # Avoid double punctuation
-            if len(body) > 12 and not re.search(r'[.!?]$', body):
-                body += '.'
-            # Capitalize sentences after period if needed
-            body = re.sub(r'([.!?]\s+)([a-z])', lambda m: m.group(1) + m.group(2).upper(), body)
-        return '- ' + body
-
-    while idx < len(lines):
-        raw = lines[idx].strip()
-        idx += 1
-        if not raw:
-            continue
-        if raw.isupper() and raw.upper() in CANONICAL_SECTION_ORDER:
-            current = raw.upper()
-            ensure(current)
-            continue
-        if current is None:
-            current = 'SUMMARY'
-            ensure(current)
-        if current in {'EXPERIENCE','PROJECTS'}:
-            if raw.startswith('• '):
-                raw = '- ' + raw[2:].strip()
-            if not raw.startswith('- '):
-                if re.search(r'(\b20\d{2}\b|\b19\d{2}\b).*?(Present|20\d{2}|19\d{2})', raw) or ' - ' in raw or '–' in raw:
-                    sections[current].append(raw)
-                else:
-                    sections[current].append(polish_bullet(raw))
-            else:
-                sections[current].append(polish_bullet(raw))
-        else:
-            if current == 'SUMMARY':
-                if raw.startswith('- '):
-                    sections[current].append(polish_bullet(raw))
-                else:
-                    if re.search(r'\b(led|managed|built|developed|created|increased|reduced|optimized|designed|launched|implemented)\b', raw.lower()) and len(raw.split()) > 3:
-                        sections[current].append(polish_bullet(raw))
-                    else:
-                        sections[current].append(raw)
-            else:
-                if raw.startswith('- '):
-                    sections[current].append(polish_bullet(raw))
-                else:
-                    sections[current].append(raw)
-    output = []
-    if name:
-        output.append(name)
-    if contact_line:
-        output.append(contact_line)
-    for sec in CANONICAL_SECTION_ORDER:
-        if sec in sections and sections[sec]:
-            output.append('')
-            output.append(sec)
-            entries = sections[sec]
-            # Consolidate SKILLS / CERTIFICATIONS into single line if multiple non-bullets
-            if sec in {'SKILLS','CERTIFICATIONS'}:
-                non_bullets = [e for e in entries if not e.startswith('- ')]
-                if len(non_bullets) > 1:
-                    combined = ', '.join([re.sub(r'^-\s+','',n).rstrip('.') for n in non_bullets])
-                    output.append(combined)
-                    continue
-            output.extend(entries)
-    # collapse blanks
-    cleaned = []
-    prev_blank = False
-    for l in output:
-        if not l:
-            if not prev_blank:
-                cleaned.append('')
-            prev_blank = True
+def _send_artifact(filename: str, as_attachment: bool):
+    """Serve a generated file with a strong ETag, 304s, byte ranges and long-lived caching."""
+    url = artifact_storage.presigned_url(filename, as_attachment=as_attachment)
+    if url:
+        # Shared storage serves the bytes; the signed URL itself must not be cached for long
+        resp = redirect(url, code=302)
+        resp.cache_control.private = True
+        resp.cache_control.max_age = min(ARTIFACT_MAX_AGE, ARTIFACT_URL_EXPIRY // 2)
+        return resp
+    file_path = os.path.join(PREVIEWS_FOLDER, filename)
+    if not os.path.isfile(file_path):
+        return "File not found", 404
+    etag = _artifact_etag(file_path)
+    if not ARTIFACT_SENDFILE:
+        try:
+            resp = send_file(file_path, as_attachment=as_attachment, etag=etag, conditional=True, max_age=ARTIFACT_MAX_AGE)
+        except RequestedRangeNotSatisfiable as e:
+            return e
+    elif request.if_none_match.contains(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag)
+    else:
+        # The proxy sends the bytes (and handles Range) itself
+        resp = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        resp.set_etag(etag)
+        if ARTIFACT_SENDFILE == 'x-accel':
+            resp.headers['X-Accel-Redirect'] = ARTIFACT_ACCEL_PREFIX.rstrip('/') + '/' + filename
         else:
-            cleaned.append(l.rstrip())
-            prev_blank = False
-    return '\n'.join(cleaned).strip()
-
-def parse_structured_lines(text: str) -> dict:
-    lines = [l.rstrip() for l in text.splitlines()]
-    name = ''
-    contact = ''
-    idx = 0
-    while idx < len(lines) and not lines[idx].strip():
-        idx += 1
-    if idx < len(lines):
-        name = lines[idx].strip(); idx += 1
-    if idx < len(lines) and ('@' in lines[idx] or ' | ' in lines[idx]):
-        contact = lines[idx].strip(); idx += 1
-    sections = {}
-    current = None
-    for i in range(idx, len(lines)):
-        l = lines[i].strip()
-        if not l:
-            continue
-        if l.isupper() and l in CANONICAL_SECTION_ORDER:
-            current = l
-            sections.setdefault(current, [])
-            continue
-        if current is None:
-            current = 'SUMMARY'; sections.setdefault(current, [])
-        sections[current].append(l)
-    order = [s for s in CANONICAL_SECTION_ORDER if s in sections]
-    return {'name': name, 'contact': contact, 'sections': sections, 'order': order}
+            resp.headers['X-Sendfile'] = os.path.abspath(file_path)
+        if as_attachment:
+            resp.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Resumes are personal: browser cache only, never shared caches
+    resp.cache_control.public = False
+    resp.cache_control.private = True
+    resp.cache_control.max_age = ARTIFACT_MAX_AGE
+    resp.cache_control.immutable = True
+    return resp
 
 @app.route('/preview/<filename>')
 def preview_file(filename):
     """Serve preview files"""
     try:
-        file_path = os.path.join(PREVIEWS_FOLDER, filename)
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=False)
-        else:
-            return "File not found", 404
+        return _send_artifact(filename, as_attachment=False)
     except Exception as e:
         logger.error(f"Error serving preview: {str(e)}")
         return "Error serving file", 500
@@ -833,21 +1240,105 @@ def preview_file(filename):
 def download_file(filename):
     """Serve download files"""
     try:
-        file_path = os.path.join(PREVIEWS_FOLDER, filename)
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
-        else:
-            return "File not found", 404
+        if filename.endswith('.docx'):
+            ensure_docx_rendered(os.path.join(PREVIEWS_FOLDER, filename))
+        return _send_artifact(filename, as_attachment=True)
     except Exception as e:
         logger.error(f"Error serving download: {str(e)}")
         return "Error serving file", 500
 
+@app.before_request
+def _start_background_services():
+    # Threads don't survive gunicorn's fork, so start them in each worker
+    retention_sweeper.start()
+    analytics.start()
+
+# Filled in by warm_up(); reported by /admin/stats
+startup_stats = {'warm_up_seconds': None, 'warm_up_pid': None}
+
+def warm_up(connect: bool = True):
+    """Load the heavy subsystems now instead of on the first request.
+
+    gunicorn.conf.py runs this in the master with ``connect=False`` so
+    workers fork with the modules, fonts and templates already loaded, then
+    in each worker to open that worker's model client.
+    """
+    started = time.perf_counter()
+    import content_extractor
+    import renderer
+    renderer.warm_up()
+    content_extractor.warm_up()
+    pdf_extractor.warm_up()
+    get_http_session()
+    try:
+        warm_up_model(model, connect=connect)
+    except Exception as e:
+        logger.warning(f"Model warm-up failed (will retry on first use): {e}")
+    startup_stats['warm_up_seconds'] = round(time.perf_counter() - started, 3)
+    startup_stats['warm_up_pid'] = os.getpid()
+    logger.info(f"Warm-up finished in {startup_stats['warm_up_seconds']}s (pid {os.getpid()})")
+
+def _client_ip() -> str:
+    forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+    if RATE_LIMIT_TRUSTED_PROXIES and forwarded:
+        # Entries left of the ones our own proxies appended are client-controlled
+        return forwarded[-min(RATE_LIMIT_TRUSTED_PROXIES, len(forwarded))]
+    return request.remote_addr or 'unknown'
+
+@app.before_request
+def _enforce_rate_limit():
+    # Runs before the view touches request.files, so a limited client's
+    # upload is never parsed or written to disk
+    if request.endpoint not in RATE_LIMITED_ENDPOINTS or RATE_LIMIT_PER_MINUTE <= 0:
+        return None
+    retry_after = rate_limiter.acquire(_client_ip())
+    if retry_after is None:
+        return None
+    resp = jsonify({'error': 'Too many requests, please slow down.', 'retry_after': retry_after})
+    return resp, 429, {'Retry-After': str(retry_after)}
+
+def _admin_authorized() -> bool:
+    # Closed unless a token is configured; header only, so it stays out of access logs
+    if not ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+
+@app.route('/admin/stats')
+def admin_stats():
+    """Operational stats for queues and caches (requires ADMIN_TOKEN via X-Admin-Token)"""
+    if not _admin_authorized():
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify({
+        'job_queue': job_queue.stats(),
+        'pdf_text_cache': pdf_text_cache.stats(),
+        'pdf_extractor': pdf_extractor.stats(),
+        'ai_response_cache': ai_response_cache.stats(),
+        'job_content_cache': dict(job_content_cache.stats(), **job_fetch_stats),
+        'retention': retention_sweeper.stats(),
+        'analytics': analytics.stats(),
+        'gemini_limiter': gemini_limiter.stats(),
+        'rate_limiter': rate_limiter.stats(),
+        'artifact_storage': artifact_storage.stats(),
+        'startup': dict(startup_stats)
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics aggregated across all workers"""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
 @app.route('/analytics')
 def get_analytics():
     """Get basic analytics data"""
+    totals = analytics.totals()
+    daily = analytics.daily(days=ANALYTICS_ROLLUP_DAYS)
+    today = daily[0] if daily and daily[0]['date'] == time.strftime('%Y-%m-%d', time.gmtime()) else {}
     return jsonify({
-        'daily_users': analytics_data['daily_users'],
-        'total_resumes_generated': analytics_data['total_resumes_generated']
+        'daily_users': today.get('page_views', 0),
+        'total_resumes_generated': totals.get('resumes_generated', 0),
+        'totals': totals,
+        'daily': daily
     })
 
 if __name__ == '__main__':
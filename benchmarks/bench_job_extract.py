@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark job-posting text extraction: legacy selector scan vs single-pass extractor
+
+Runs offline on the saved HTML fixtures in benchmarks/fixtures plus a
+synthetic "large job board" page built by padding a fixture with nested
+similar-job cards (LinkedIn/Workday pages routinely reach several MB).
+
+    python benchmarks/bench_job_extract.py [--size-mb 2] [--repeat 3]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from content_extractor import HTML_PARSER, extract_main_text  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+FIXTURE_URLS = {
+    'greenhouse_posting.html': 'https://boards.greenhouse.io/acme/jobs/1',
+    'lever_posting.html': 'https://jobs.lever.co/globex/2',
+    'generic_posting.html': 'https://careers.initech.example/jobs/3',
+}
+
+
+def legacy_extract(html: str, url: str) -> str:
+    """The extraction loop fetch_job_content used before the single-pass extractor."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript', 'header', 'footer', 'svg']):
+        tag.decompose()
+    text_parts = []
+    domain = re.sub(r'^https?://', '', url).split('/')[0]
+    selectors = []
+    if 'greenhouse' in domain:
+        selectors += ['div#content', 'div.opening', 'div.main']
+    if 'lever.co' in domain:
+        selectors += ['div.posting', 'div.content']
+    selectors += ['section', 'article', 'div']
+    grabbed = set()
+    for sel in selectors:
+        for node in soup.select(sel):
+            txt = node.get_text(separator=' ', strip=True)
+            if txt and len(txt.split()) > 40 and txt not in grabbed:
+                text_parts.append(txt)
+                grabbed.add(txt)
+                if sum(len(p.split()) for p in text_parts) > 1600:
+                    break
+        if sum(len(p.split()) for p in text_parts) > 1600:
+            break
+    if not text_parts:
+        body_txt = soup.get_text(separator=' ', strip=True)
+        return ' '.join(body_txt.split()[:1800])
+    return re.sub(r'\s+', ' ', '\n'.join(text_parts))[:12000]
+
+
+def synthetic_large_page(base_html: str, size_mb: float) -> str:
+    """Pad a fixture with deeply nested similar-job cards until it reaches ``size_mb``."""
+    card = (
+        '<div class="card"><div class="card-inner"><div class="card-body">'
+        '<div class="title"><a href="/jobs/{i}">Software Engineer {i}</a></div>'
+        '<div class="meta"><span>Remote</span> <span>Posted {i} days ago</span></div>'
+        '<div class="snippet">Join a growing team building reliable services.</div>'
+        '</div></div></div>'
+    )
+    target = int(size_mb * 1024 * 1024)
+    cards = []
+    total = len(base_html)
+    i = 0
+    while total < target:
+        c = card.format(i=i)
+        cards.append(c)
+        total += len(c)
+        i += 1
+    rail = '<div class="similar-jobs"><div class="rail">' + ''.join(cards) + '</div></div>'
+    return base_html.replace('</body>', rail + '</body>')
+
+
+def time_call(fn, html, url, repeat):
+    best = None
+    out = ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(html, url)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, default=2.0, help='size of the synthetic large page')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case (best time is reported)')
+    args = parser.parse_args()
+
+    cases = []
+    for name, url in FIXTURE_URLS.items():
+        with open(os.path.join(FIXTURES, name)) as f:
+            cases.append((name, url, f.read()))
+    generic = dict((c[0], c[2]) for c in cases)['generic_posting.html']
+    cases.append((f'synthetic_{args.size_mb:g}mb.html', 'https://www.example-board.com/view/9',
+                  synthetic_large_page(generic, args.size_mb)))
+
+    print(f"parser for new extractor: {HTML_PARSER}")
+    print(f"{'fixture':<28}{'size KB':>10}{'legacy ms':>12}{'new ms':>10}{'speedup':>10}{'words':>8}")
+    for name, url, html in cases:
+        legacy_t, _ = time_call(legacy_extract, html, url, args.repeat)
+        new_t, text = time_call(extract_main_text, html, url, args.repeat)
+        print(f"{name:<28}{len(html) / 1024:>10.1f}{legacy_t * 1000:>12.1f}{new_t * 1000:>10.1f}"
+              f"{legacy_t / new_t:>9.1f}x{len(text.split()):>8}")
+
+
+if __name__ == '__main__':
+    main()
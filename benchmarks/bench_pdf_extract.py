@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compare PDF text extraction backends for speed and text fidelity
+
+Runs every backend over the sample resumes in fixtures/resumes/ plus synthetic
+multi-page resumes, next to the extraction loop the app used before
+pdf_extract (pdfplumber, one page after another). Fidelity is the share
+of the source text's words recovered (synthetic PDFs, where the source is
+known) and word-sequence similarity to the legacy output (all PDFs).
+
+    python benchmarks/bench_pdf_extract.py
+    python benchmarks/bench_pdf_extract.py --pages 1,10,30 --workers 4 --repeat 5
+"""
+
+import argparse
+import atexit
+import difflib
+import glob
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from bench_pipeline import synthetic_resume, write_resume_pdf  # noqa: E402
+from pdf_extract import BACKENDS, PdfExtractor, backend_available  # noqa: E402
+
+WORD_RE = re.compile(r'\w[\w.@$%/+-]*')
+
+
+def legacy_extract(path: str) -> str:
+    """extract_text_from_pdf before pdf_extract (with the None-page crash patched)."""
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        text = ""
+        for page in pdf.pages:
+            text += (page.extract_text() or '') + "\n"
+    return text
+
+
+def words(text: str) -> list:
+    return WORD_RE.findall(text.lower())
+
+
+def recall(source: str, extracted: str) -> float:
+    want, got = Counter(words(source)), Counter(words(extracted))
+    total = sum(want.values())
+    return sum(min(n, got[w]) for w, n in want.items()) / total if total else 1.0
+
+
+def similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, words(a), words(b), autojunk=False).ratio()
+
+
+def timed(fn, path: str, repeat: int):
+    fn(path)  # warm-up (imports, process pool start)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = fn(path)
+        times.append(time.perf_counter() - start)
+    return text, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', default='1,5,20', help='comma-separated synthetic page counts')
+    parser.add_argument('--samples', default=os.path.join(REPO_ROOT, 'benchmarks', 'fixtures', 'resumes', '*.pdf'), help='glob of real PDFs')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='process pool size')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='resume-extract-bench-')
+    atexit.register(shutil.rmtree, workdir, True)
+    cases = []  # (label, path, source text or None)
+    for path in sorted(glob.glob(args.samples)):
+        cases.append((os.path.basename(path)[:12], path, None))
+    for n in [int(p) for p in args.pages.split(',') if p.strip()]:
+        path = os.path.join(workdir, f'synthetic_{n}p.pdf')
+        source = synthetic_resume(n)
+        write_resume_pdf(source, path)
+        cases.append((f'synthetic {n}p', path, source))
+
+    extractors = {'legacy': legacy_extract}
+    for name in BACKENDS:
+        if backend_available(name):
+            # Only this backend, so fidelity is not masked by a fallback
+            single = PdfExtractor(backend=name, max_pages=10 ** 6, workers=1)
+            single.order = [name]
+            extractors[name] = single.extract
+            if BACKENDS[name].parallel and args.workers > 1:
+                pooled = PdfExtractor(backend=name, max_pages=10 ** 6, workers=args.workers)
+                pooled.order = [name]
+                extractors[f'{name} x{args.workers}'] = pooled.extract
+
+    print(f"{'pdf':<16}{'extractor':<18}{'median ms':>10}{'speedup':>9}{'recall':>8}{'vs legacy':>11}")
+    for label, path, source in cases:
+        legacy_text, legacy_time = timed(legacy_extract, path, args.repeat)
+        for name, fn in extractors.items():
+            text, elapsed = (legacy_text, legacy_time) if name == 'legacy' else timed(fn, path, args.repeat)
+            rec = f"{recall(source, text):.1%}" if source else '-'
+            print(f"{label:<16}{name:<18}{elapsed * 1000:>10.1f}{legacy_time / elapsed:>8.1f}x{rec:>8}"
+                  f"{similarity(legacy_text, text):>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
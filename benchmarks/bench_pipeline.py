@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the resume text, extraction and rendering pipeline
+
+Times each stage on synthetic resumes of 1 to 20 pages, recording ops/sec
+and tracemalloc peak memory, and compares the results with a stored
+baseline so regressions are caught before deploy. No network access or
+API key is needed.
+
+    python benchmarks/bench_pipeline.py                    # compare with baseline.json
+    python benchmarks/bench_pipeline.py --update-baseline  # record a new baseline
+    python benchmarks/bench_pipeline.py --pages 1,5 --stages final_format_resume
+
+Exit status is 1 when any stage is slower (or uses more memory) than the
+baseline by more than --tolerance. Baselines are machine specific: record
+them on the machine that runs the comparison.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_PAGES = (1, 2, 5, 10, 20)
+LINES_PER_PAGE = 48
+
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries']
+VERBS = ['Led', 'Built', 'Designed', 'Migrated', 'Optimized', 'Automated', 'Scaled', 'Shipped']
+THINGS = ['payment APIs', 'a data pipeline', 'CI/CD workflows', 'search ranking', 'the billing service',
+          'observability dashboards', 'a React design system', 'Kubernetes clusters']
+IMPACTS = ['cutting latency 35%', 'saving $120K per year', 'serving 2M users', 'reducing incidents by half',
+           'improving conversion 8%', 'with 99.95% uptime']
+
+
+def synthetic_resume(pages: int) -> str:
+    """Plain resume text roughly ``pages`` pages long once rendered."""
+    lines = ['JANE Q. DOE', 'jane.doe@example.com | (555) 010-2000 | Seattle, WA | linkedin.com/in/janedoe', '',
+             'SUMMARY',
+             'Backend engineer with 9 years of experience building reliable distributed systems and teams.',
+             '', 'EXPERIENCE']
+    target = pages * LINES_PER_PAGE
+    i = 0
+    while len(lines) < target - 12:
+        company = COMPANIES[i % len(COMPANIES)]
+        lines.append(f'Senior Software Engineer, {company}  {2010 + i % 12} - {2011 + i % 12}')
+        for j in range(5):
+            k = i * 5 + j
+            lines.append(f'• {VERBS[k % len(VERBS)]} {THINGS[k % len(THINGS)]}, {IMPACTS[k % len(IMPACTS)]}.')
+        lines.append('')
+        i += 1
+    lines += ['EDUCATION', 'B.S. Computer Science, University of Washington  2012', '',
+              'SKILLS', 'Python, Go, SQL, PostgreSQL, Redis, Kafka, AWS, Docker, Kubernetes, Terraform', '',
+              'CERTIFICATIONS', 'AWS Certified Solutions Architect']
+    return '\n'.join(lines)
+
+
+def synthetic_ai_output(resume: str) -> str:
+    """The same resume dressed up the way model output arrives (markdown, preamble)."""
+    out = ['Here is the enhanced resume tailored to the job description:', '']
+    for line in resume.split('\n'):
+        if line.isupper() and len(line) < 30:
+            out.append(f'## **{line}**')
+        elif line.startswith('• '):
+            out.append('* ' + line[2:].replace('Led', '**Led**'))
+        else:
+            out.append(line)
+    return '\n'.join(out)
+
+
+def write_resume_pdf(text: str, path: str):
+    """Render plain text into a simple multi-page PDF for extraction benchmarks."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(path, pagesize=letter)
+    y = 750
+    for line in text.split('\n'):
+        if y < 50:
+            c.showPage()
+            y = 750
+        c.drawString(50, y, line)
+        y -= 14
+    c.save()
+
+
+def build_stages(app, workdir):
+    """Stage name -> (setup(pages) -> args, fn)."""
+    def text_args(pages):
+        return (synthetic_ai_output(synthetic_resume(pages)),)
+
+    def formatted_args(pages):
+        return (app.final_format_resume(synthetic_resume(pages)),)
+
+    def pdf_input(pages):
+        path = os.path.join(workdir, f'input_{pages}.pdf')
+        if not os.path.exists(path):
+            write_resume_pdf(synthetic_resume(pages), path)
+        return (path,)
+
+    def render_args(ext):
+        def setup(pages):
+            return (app.final_format_resume(synthetic_resume(pages)), os.path.join(workdir, f'out_{pages}.{ext}'))
+        return setup
+
+    return {
+        'extract_text_from_pdf': (pdf_input, app.extract_text_from_pdf),
+        '_normalize_ai_text': (text_args, app._normalize_ai_text),
+        'sanitize_enhanced_content': (lambda p: (app._normalize_ai_text(text_args(p)[0]),),
+                                      app.sanitize_enhanced_content),
+        'final_format_resume': (lambda p: (synthetic_resume(p),), app.final_format_resume),
+        'parse_structured_lines': (formatted_args, app.parse_structured_lines),
+        'create_pdf_resume': (render_args('pdf'), app.create_pdf_resume),
+        'create_docx_resume': (render_args('docx'), app.create_docx_resume),
+    }
+
+
+def measure(fn, args, min_time: float, max_runs: int) -> dict:
+    fn(*args)  # warm-up (imports, regex and font caches)
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while runs < max_runs and (elapsed < min_time or runs < 3):
+        fn(*args)
+        runs += 1
+        elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'ops_per_sec': round(runs / elapsed, 3),
+        'mean_ms': round(elapsed / runs * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+        'runs': runs,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions of ``results`` against ``baseline``."""
+    regressions = []
+    for key, cur in sorted(results.items()):
+        base = baseline.get(key)
+        if not base:
+            continue
+        if cur['ops_per_sec'] < base['ops_per_sec'] * (1 - tolerance):
+            regressions.append(f"{key}: {cur['ops_per_sec']:.1f} ops/s vs baseline {base['ops_per_sec']:.1f}")
+        if cur['peak_kb'] > base['peak_kb'] * (1 + tolerance) and cur['peak_kb'] - base['peak_kb'] > 64:
+            regressions.append(f"{key}: peak {cur['peak_kb']:.0f} KB vs baseline {base['peak_kb']:.0f} KB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', default=','.join(map(str, DEFAULT_PAGES)), help='comma-separated page counts')
+    parser.add_argument('--stages', default='', help='comma-separated stage names (default: all)')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds to spend timing each case')
+    parser.add_argument('--max-runs', type=int, default=200, help='upper bound on timed runs per case')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON path')
+    parser.add_argument('--update-baseline', action='store_true', help='write results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    args = parser.parse_args()
+
+    pages = [int(p) for p in args.pages.split(',') if p.strip()]
+    workdir = tempfile.mkdtemp(prefix='resume-bench-')
+    atexit.register(shutil.rmtree, workdir, True)
+    # Importing app creates its working directories relative to the cwd
+    os.chdir(workdir)
+    import app  # noqa: E402
+
+    stages = build_stages(app, workdir)
+    selected = [s.strip() for s in args.stages.split(',') if s.strip()] or list(stages)
+    unknown = set(selected) - set(stages)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    results = {}
+    print(f"{'stage':<28}{'pages':>6}{'ops/sec':>10}{'mean ms':>10}{'peak KB':>10}")
+    for name in selected:
+        setup, fn = stages[name]
+        for n in pages:
+            res = measure(fn, setup(n), args.min_time, args.max_runs)
+            results[f'{name}[{n}p]'] = res
+            print(f"{name:<28}{n:>6}{res['ops_per_sec']:>10.1f}{res['mean_ms']:>10.2f}{res['peak_kb']:>10.0f}")
+
+    if args.update_baseline:
+        existing = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                existing = json.load(f).get('results', {})
+        existing.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'results': existing,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nno regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Cold-start cost: time to import app and time to the first healthy response
+
+Each measurement runs in a fresh interpreter in a scratch directory, the
+way a new gunicorn worker or a free-plan instance waking up would:
+
+  import_app            ``import app`` alone
+  warm_up               ``app.warm_up(connect=False)`` after the import
+  first_health[...]     launch to the first 200 from /health, under gunicorn
+                        with and without preloading (one worker each)
+
+The slowest top-level imports (``python -X importtime``) are listed as
+well. Results use baseline.json's format so startup regressions show up
+next to the pipeline numbers.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 5 --update-baseline
+    MODEL_BACKEND=gemini GOOGLE_API_KEY=... python benchmarks/bench_startup.py
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from bench_pipeline import DEFAULT_BASELINE, compare  # noqa: E402
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+if {warm!r}:
+    app.warm_up(connect=False)
+print(imported - started, time.perf_counter() - imported)
+"""
+IMPORTTIME_RE = re.compile(r'import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)')
+
+
+def run_python(code: str, cwd: str, *args) -> str:
+    return subprocess.run([sys.executable, *args, '-c', code], cwd=cwd, check=True,
+                          capture_output=True, text=True).stdout
+
+
+def time_import(workdir: str, repeat: int) -> dict:
+    """Median seconds for the import and for warm-up, each in a fresh process."""
+    imports, warm_ups = [], []
+    for _ in range(repeat):
+        imported, warmed = map(float, run_python(IMPORT_SCRIPT.format(root=REPO_ROOT, warm=True), workdir).split())
+        imports.append(imported)
+        warm_ups.append(warmed)
+    return {'import_app': statistics.median(imports), 'warm_up': statistics.median(warm_ups)}
+
+
+def slowest_imports(workdir: str, limit: int) -> list:
+    """(module, cumulative ms) for the modules app imports directly, slowest first."""
+    code = f"import sys; sys.path.insert(0, {REPO_ROOT!r}); import app"
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=workdir,
+                          capture_output=True, text=True, check=True)
+    # Children are listed before their parent, one level deeper
+    children = []
+    for m in IMPORTTIME_RE.finditer(proc.stderr):
+        depth, module = len(m.group(2)), m.group(3)
+        if depth == 2:
+            children.append((module, int(m.group(1)) / 1000))
+        elif depth == 0:
+            if module == 'app':
+                return sorted(children, key=lambda item: -item[1])[:limit]
+            children = []
+    return []
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_first_health(workdir: str, preload: bool, timeout: float) -> float:
+    """Seconds from launching gunicorn to the first 200 from /health."""
+    port = free_port()
+    env = dict(os.environ, GUNICORN_PRELOAD='true' if preload else 'false',
+               PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'prometheus'))
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(REPO_ROOT, 'gunicorn.conf.py'),
+         '--pythonpath', REPO_ROOT, '-w', '1', '-b', f'127.0.0.1:{port}', 'app:app'],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {proc.returncode}")
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"/health not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def as_result(seconds: float, runs: int) -> dict:
+    return {'ops_per_sec': round(1 / seconds, 3), 'mean_ms': round(seconds * 1000, 1), 'peak_kb': 0, 'runs': runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='fresh processes per measurement')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    parser.add_argument('--timeout', type=float, default=60.0, help='seconds to wait for /health')
+    parser.add_argument('--no-server', action='store_true', help='skip the gunicorn measurements')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON path')
+    parser.add_argument('--update-baseline', action='store_true', help='write results into the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed relative regression')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='resume-startup-bench-')
+    atexit.register(shutil.rmtree, workdir, True)
+
+    print("slowest imports under app (cumulative ms):")
+    for module, ms in slowest_imports(workdir, args.top):
+        print(f"  {module:<32}{ms:>8.1f}")
+
+    seconds = time_import(workdir, args.repeat)
+    if not args.no_server:
+        for preload in (True, False):
+            label = f"first_health[{'preload' if preload else 'no-preload'}]"
+            seconds[label] = statistics.median(
+                time_first_health(workdir, preload, args.timeout) for _ in range(args.repeat)
+            )
+
+    results = {f'startup_{name}': as_result(value, args.repeat) for name, value in seconds.items()}
+    print(f"\n{'measurement':<36}{'median ms':>10}")
+    for name, res in results.items():
+        print(f"{name:<36}{res['mean_ms']:>10.1f}")
+
+    if args.update_baseline:
+        existing = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                existing = json.load(f).get('results', {})
+        existing.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'results': existing,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nno regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Per-request disk I/O and latency of the upload path of /generate_resume
+
+Posts a resume PDF through Flask's test client (in process, AI disabled,
+text cache bypassed so every request extracts) and reports mean/p95
+latency plus the bytes and write() calls each request made, read from
+/proc/self/io, and how many files were left in uploads/.
+
+    python benchmarks/bench_upload.py
+    python benchmarks/bench_upload.py --pages 40 --requests 50   # ~0.5 MB+ uploads
+
+Rendered outputs are written to previews/ either way, so the write
+counters include them; compare runs on the same input to see the upload
+path's share.
+"""
+
+import argparse
+import atexit
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from bench_pipeline import synthetic_resume, write_resume_pdf  # noqa: E402
+
+
+def io_counters() -> dict:
+    """wchar/syscw/write_bytes for this process (zeros where /proc is unavailable)."""
+    counters = {'wchar': 0, 'syscw': 0, 'write_bytes': 0}
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in counters:
+                    counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+
+class NoCache:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=2, help='synthetic resume length')
+    parser.add_argument('--resume', help='upload this PDF instead of a synthetic one')
+    parser.add_argument('--requests', type=int, default=30)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='resume-upload-bench-')
+    atexit.register(shutil.rmtree, workdir, True)
+    pdf_path = args.resume or os.path.join(workdir, 'input.pdf')
+    if not args.resume:
+        write_resume_pdf(synthetic_resume(args.pages), pdf_path)
+    with open(pdf_path, 'rb') as f:
+        pdf_bytes = f.read()
+
+    # Importing app creates its working directories relative to the cwd
+    os.chdir(workdir)
+    import io
+    import app
+    from limits import TokenBucketLimiter
+    app.model = None
+    app.pdf_text_cache = NoCache()
+    app.rate_limiter = TokenBucketLimiter(rate=1000.0, burst=10 ** 6)
+    client = app.app.test_client()
+
+    def post():
+        return client.post('/generate_resume', data={
+            'resume_file': (io.BytesIO(pdf_bytes), 'resume.pdf'),
+            'job_description': 'Senior Python engineer: APIs, PostgreSQL, AWS.',
+            'format': 'pdf',
+        }, content_type='multipart/form-data')
+
+    post()  # warm-up (imports, fonts, templates)
+    uploads_before = len(os.listdir(app.UPLOAD_FOLDER))
+    latencies = []
+    before = io_counters()
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        resp = post()
+        latencies.append(time.perf_counter() - start)
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+    after = io_counters()
+    uploads_left = len(os.listdir(app.UPLOAD_FOLDER)) - uploads_before
+
+    latencies.sort()
+    n = args.requests
+    print(f"upload {len(pdf_bytes) / 1024:.0f} KB, {n} requests")
+    print(f"latency mean {statistics.mean(latencies) * 1000:.1f} ms, "
+          f"p95 {latencies[int(0.95 * (n - 1))] * 1000:.1f} ms")
+    print(f"per request: {(after['wchar'] - before['wchar']) / n / 1024:.1f} KB written, "
+          f"{(after['syscw'] - before['syscw']) / n:.1f} write calls, "
+          f"{(after['write_bytes'] - before['write_bytes']) / n / 1024:.1f} KB to block devices")
+    print(f"files left in uploads/: {uploads_left}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for /generate_resume against the fake model backend
+
+Starts gunicorn once per configuration with MODEL_BACKEND=fake (no Gemini
+quota is used), fires concurrent multipart uploads at it and reports
+throughput, p50/p95/p99 latency and error rates for each configuration.
+Requests that succeeded on a degraded path (template fallback instead of
+the model, ...) are counted from the resume_fallbacks_total counter in
+/metrics, scraped before and after each run, and reported separately.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --config "-w 2 --threads 1" --config "-w 2 --threads 8" \\
+        --concurrency 16 --requests 200 --latency-ms 1200 --error-rate 0.02
+    python benchmarks/load_test.py --target http://localhost:5001   # existing server
+
+Every request gets a unique job description so the AI response cache does
+not short-circuit the model. All requests come from 127.0.0.1, so spawned
+servers run with the per-client rate limit off, and the Gemini concurrency
+limiter is opened wide unless --gemini-* flags say otherwise, so the run
+measures the pipeline rather than the limiters.
+"""
+
+import argparse
+import os
+import re
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESUME = os.path.join(REPO_ROOT, 'benchmarks', 'fixtures', 'resumes',
+                              '281f75e7-2121-47d9-84d5-9c5c596b575f_resume.pdf')
+DEFAULT_CONFIGS = ('-w 1 --threads 1', '-w 2 --threads 4', '-w 4 --threads 4')
+FALLBACK_SAMPLE_RE = re.compile(r'^resume_fallbacks_total\{reason="([^"]*)"\} (\S+)$', re.MULTILINE)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Server:
+    """A gunicorn process serving app:app from a throwaway working directory."""
+
+    def __init__(self, config: str, env_overrides: dict, startup_timeout: float = 60):
+        self.port = free_port()
+        self.workdir = tempfile.mkdtemp(prefix='resume-load-')
+        env = dict(os.environ, MODEL_BACKEND='fake', PYTHONPATH=REPO_ROOT, RATE_LIMIT_PER_MINUTE='0',
+                   PROMETHEUS_MULTIPROC_DIR=os.path.join(self.workdir, 'prometheus'), **env_overrides)
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(REPO_ROOT, 'gunicorn.conf.py'),
+               '--bind', f'127.0.0.1:{self.port}', '--timeout', '300',
+               '--log-level', 'warning'] + shlex.split(config) + ['app:app']
+        self.log = open(os.path.join(self.workdir, 'gunicorn.log'), 'w')
+        self.proc = subprocess.Popen(cmd, cwd=self.workdir, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+        self.url = f'http://127.0.0.1:{self.port}'
+        self._wait_healthy(startup_timeout)
+
+    def _wait_healthy(self, timeout: float):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"gunicorn exited early; see {self.log.name}")
+            try:
+                if requests.get(self.url + '/', timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"gunicorn not healthy after {timeout}s")
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.log.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def scrape_fallbacks(url: str) -> Counter:
+    """resume_fallbacks_total by reason; empty if /metrics is unavailable."""
+    try:
+        resp = requests.get(url + '/metrics', timeout=10)
+        resp.raise_for_status()
+    except requests.RequestException:
+        return Counter()
+    return Counter({reason: float(value) for reason, value in FALLBACK_SAMPLE_RE.findall(resp.text)})
+
+
+def run_load(url: str, resume_bytes: bytes, endpoint: str, concurrency: int, total: int, timeout: float) -> dict:
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    counter = iter(range(total))
+    session_local = threading.local()
+
+    def one_request(i: int):
+        session = getattr(session_local, 'session', None)
+        if session is None:
+            session = session_local.session = requests.Session()
+        files = {'resume_file': ('resume.pdf', resume_bytes, 'application/pdf')}
+        data = {'job_description': f'Senior Python engineer #{i}: APIs, PostgreSQL, AWS, mentoring.',
+                'format': 'pdf'}
+        start = time.perf_counter()
+        try:
+            resp = session.post(url + endpoint, files=files, data=data, timeout=timeout)
+            status = resp.status_code
+            if status == 200 and not resp.json().get('success'):
+                status = 'unsuccessful'
+        except requests.RequestException as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] += 1
+
+    def worker():
+        for i in counter:
+            one_request(i)
+
+    fallbacks_before = scrape_fallbacks(url)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    fallbacks = scrape_fallbacks(url)
+    fallbacks.subtract(fallbacks_before)
+    fallbacks = {reason: int(n) for reason, n in fallbacks.items() if n > 0}
+
+    latencies.sort()
+    ok = statuses.get(200, 0)
+    return {
+        'requests': len(latencies),
+        'wall_seconds': wall,
+        'throughput_rps': len(latencies) / wall if wall else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'error_rate': 1 - ok / len(latencies) if latencies else 0.0,
+        'statuses': dict(statuses),
+        # Degraded paths taken, by reason; one request can take several
+        'fallbacks': fallbacks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', action='append', help='gunicorn arguments for one run (repeatable)')
+    parser.add_argument('--target', help='load an already running server instead of spawning gunicorn')
+    parser.add_argument('--endpoint', default='/generate_resume')
+    parser.add_argument('--resume', default=DEFAULT_RESUME, help='PDF to upload')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=64, help='requests per configuration')
+    parser.add_argument('--timeout', type=float, default=120.0, help='per-request timeout in seconds')
+    parser.add_argument('--latency-ms', type=float, default=800.0, help='fake model median latency')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='fake model log-normal sigma')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fake model injected error rate')
+    parser.add_argument('--gemini-max-concurrency', type=int, default=64, help='GEMINI_MAX_CONCURRENCY per worker')
+    parser.add_argument('--gemini-max-waiting', type=int, default=256, help='GEMINI_MAX_WAITING per worker')
+    parser.add_argument('--gemini-wait-timeout', type=float, default=120.0, help='GEMINI_WAIT_TIMEOUT seconds')
+    args = parser.parse_args()
+
+    with open(args.resume, 'rb') as f:
+        resume_bytes = f.read()
+    fake_env = {
+        'FAKE_MODEL_LATENCY_MS': str(args.latency_ms),
+        'FAKE_MODEL_LATENCY_SIGMA': str(args.latency_sigma),
+        'FAKE_MODEL_ERROR_RATE': str(args.error_rate),
+        'GEMINI_MAX_CONCURRENCY': str(args.gemini_max_concurrency),
+        'GEMINI_MAX_WAITING': str(args.gemini_max_waiting),
+        'GEMINI_WAIT_TIMEOUT': str(args.gemini_wait_timeout),
+    }
+
+    runs = []
+    if args.target:
+        runs.append((args.target, run_load(args.target.rstrip('/'), resume_bytes, args.endpoint,
+                                           args.concurrency, args.requests, args.timeout)))
+    else:
+        # One server at a time so configurations never compete for CPU
+        for config in args.config or DEFAULT_CONFIGS:
+            server = Server(config, fake_env)
+            try:
+                result = run_load(server.url, resume_bytes, args.endpoint,
+                                  args.concurrency, args.requests, args.timeout)
+            finally:
+                server.stop()
+            runs.append((config, result))
+
+    print(f"\n{args.requests} requests per run, concurrency {args.concurrency}, endpoint {args.endpoint}")
+    print(f"{'configuration':<28}{'req/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}"
+          f"{'fallbacks':>11}  statuses")
+    for name, r in runs:
+        statuses = ', '.join(f'{k}: {v}' for k, v in sorted(r['statuses'].items(), key=lambda kv: str(kv[0])))
+        print(f"{name:<28}{r['throughput_rps']:>8.2f}{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}"
+              f"{r['p99_ms']:>10.0f}{r['error_rate']:>8.1%}{sum(r['fallbacks'].values()):>11}  {statuses}")
+        if r['fallbacks']:
+            print(f"{'':<28}fallbacks: {', '.join(f'{k}: {v}' for k, v in sorted(r['fallbacks'].items()))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""
+Caching primitives shared by the resume pipeline
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DIGEST_RE = re.compile(r'^[0-9a-f]{16,128}$')
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU bounded by entry count and total value size."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key: str, value: str):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._bytes -= len(self._data.pop(key))
+            self._data[key] = value
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, old = self._data.popitem(last=False)
+                self._bytes -= len(old)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class ContentCache:
+    """Content-addressed text cache: in-memory LRU in front of a directory of files.
+
+    Keys are hex digests, so entries never go stale and any worker process can
+    reuse what another one wrote. Disk usage is tracked as a running total of
+    this process's writes; the directory is only rescanned when that total
+    passes the quota, or every ``RESCAN_EVERY`` writes to pick up what other
+    workers wrote.
+    """
+
+    RESCAN_EVERY = 100
+
+    def __init__(self, directory: str, max_entries: int = 256, max_disk_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = LRUCache(max_entries=max_entries)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        self.disk_scans = 0
+        self._disk_bytes = None  # unknown until the first scan
+        self._writes_since_scan = 0
+
+    def get(self, digest: str) -> Optional[str]:
+        if not DIGEST_RE.match(digest):
+            return None
+        value = self.memory.get(digest)
+        if value is not None:
+            return value
+        path = self._path(digest)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # keep recently used files out of eviction
+        except OSError:
+            pass
+        with self._lock:
+            self.disk_hits += 1
+        self.memory.set(digest, value)
+        return value
+
+    def set(self, digest: str, value: str):
+        if not DIGEST_RE.match(digest):
+            return
+        self.memory.set(digest, value)
+        path = self._path(digest)
+        data = value.encode('utf-8')
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            replaced = os.stat(path).st_size
+        except OSError:
+            replaced = 0
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Content cache write failed: {e}")
+            return
+        with self._lock:
+            self._writes_since_scan += 1
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data) - replaced
+            due = (self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+                   or self._writes_since_scan >= self.RESCAN_EVERY)
+        if due:
+            self._enforce_disk_limit()
+
+    def stats(self) -> dict:
+        mem = self.memory.stats()
+        with self._lock:
+            lookups = mem['hits'] + self.disk_hits + self.misses
+            return {
+                'memory': mem,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'disk_evictions': self.disk_evictions,
+                'disk_bytes': self._disk_bytes,
+                'disk_scans': self.disk_scans,
+                'max_disk_bytes': self.max_disk_bytes,
+                'hit_ratio': round((mem['hits'] + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.txt")
+
+    def _enforce_disk_limit(self):
+        """Rescan the directory, evicting least recently used files beyond the quota."""
+        with self._lock:
+            self.disk_scans += 1
+            self._writes_since_scan = 0
+        try:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith('.txt'):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        except OSError:
+            return
+        if total > self.max_disk_bytes:
+            total = self._evict(entries, total)
+        with self._lock:
+            self._disk_bytes = total
+
+    def _evict(self, entries: list, total: int) -> int:
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.disk_evictions += 1
+            if total <= self.max_disk_bytes:
+                break
+        return total
+
+
+class SQLiteCache:
+    """Persistent key/value cache with TTL and entry-count eviction.
+
+    Backed by a single SQLite file in WAL mode so every gunicorn worker shares
+    the same entries. Connections are opened per operation, which keeps the
+    cache safe across threads and forks.
+    """
+
+    def __init__(self, path: str, ttl: int = 86400, max_entries: int = 1000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'created REAL NOT NULL, expires REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_created ON entries(created)')
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT value FROM entries WHERE key = ? AND expires > ?',
+                    (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Cache read failed ({self.path}): {e}")
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None):
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries (key, value, created, expires) VALUES (?, ?, ?, ?)',
+                    (key, value, now, now + (self.ttl if ttl is None else ttl))
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed ({self.path}): {e}")
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % 50 == 1
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired rows, then the oldest rows beyond ``max_entries``."""
+        try:
+            with self._connect() as conn:
+                conn.execute('DELETE FROM entries WHERE expires <= ?', (time.time(),))
+                conn.execute(
+                    'DELETE FROM entries WHERE key IN ('
+                    'SELECT key FROM entries ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Cache eviction failed ({self.path}): {e}")
+
+    def stats(self) -> dict:
+        try:
+            with self._connect() as conn:
+                entries = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def _connect(self):
+        return _closing_connection(self.path)
+
+
+class _closing_connection:
+    """sqlite3 connection context manager that commits and always closes."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, timeout=5)
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+        return False
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+import app
+from limits import TokenBucketLimiter
+from storage import LocalStorage
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'fixtures', 'resumes',
+                          '281f75e7-2121-47d9-84d5-9c5c596b575f_resume.pdf')
+
+
+@pytest.fixture
+def sample_pdf():
+    return SAMPLE_PDF
+
+
+@pytest.fixture
+def previews(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'PREVIEWS_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app, 'artifact_storage', LocalStorage(str(tmp_path)))
+    monkeypatch.setattr(app, 'model', None)
+    monkeypatch.setattr(app, 'rate_limiter', TokenBucketLimiter(rate=1.0, burst=1000))
+    return tmp_path
+
+
+@pytest.fixture
+def upload_copies(tmp_path, tmp_path_factory, monkeypatch):
+    """Callable listing files written during the test that hold SAMPLE_PDF's bytes."""
+    spool = tmp_path_factory.mktemp('spool')
+    monkeypatch.setattr(tempfile, 'tempdir', str(spool))
+    with open(SAMPLE_PDF, 'rb') as f:
+        upload = f.read()
+    started = time.time() - 1
+
+    def copies():
+        found = []
+        for root in (os.getcwd(), str(tmp_path), str(spool)):
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d != '.git']
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        if os.path.getmtime(path) < started or os.path.getsize(path) != len(upload):
+                            continue
+                        with open(path, 'rb') as f:
+                            if f.read() == upload:
+                                found.append(path)
+                    except OSError:
+                        continue
+        return found
+    return copies
@@ -0,0 +1,219 @@
+"""
+Single-pass main-content extraction for job posting pages
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+import soupsieve
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml ships with python-docx
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+# Native lxml trees are an order of magnitude faster to build than
+# BeautifulSoup trees on multi-MB job board pages
+HTML_PARSER = 'lxml' if lxml is not None else 'html.parser'
+
+STRIP_TAGS = ['script', 'style', 'noscript', 'header', 'footer', 'svg', 'nav', 'form', 'iframe']
+CONTAINER_TAGS = {'html', 'body', 'main', 'article', 'section', 'div', 'td', 'table', 'tbody', 'tr', 'aside'}
+MIN_BLOCK_WORDS = 40
+MIN_PROPAGATE_CHARS = 120
+MAX_WORDS = 1800
+MAX_CHARS = 12000
+
+WHITESPACE_RE = re.compile(r'\s+')
+SCHEME_RE = re.compile(r'^https?://')
+SIMPLE_SELECTOR_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?((?:[#.][\w-]+)*)$')
+SELECTOR_PART_RE = re.compile(r'([#.])([\w-]+)')
+
+
+class SiteSelector:
+    """A CSS selector precompiled for both BeautifulSoup and lxml trees."""
+
+    def __init__(self, css: str):
+        self.css = css
+        self.soup = soupsieve.compile(css)
+        self.xpath = etree.XPath(_selector_to_xpath(css)) if lxml is not None else None
+
+    def first_lxml(self, root):
+        found = self.xpath(root)
+        return found[0] if found else None
+
+    def first_soup(self, soup):
+        return self.soup.select_one(soup)
+
+
+# Domain fragment -> precompiled selectors tried before density scoring
+SITE_SELECTORS: Dict[str, List[SiteSelector]] = {}
+
+
+def register_site_selectors(domain_fragment: str, *selectors: str):
+    """Register ``tag#id.class`` selectors for pages whose host contains ``domain_fragment``."""
+    SITE_SELECTORS.setdefault(domain_fragment, []).extend(SiteSelector(sel) for sel in selectors)
+
+
+def _selector_to_xpath(css: str) -> str:
+    m = SIMPLE_SELECTOR_RE.match(css.strip())
+    if not m:
+        raise ValueError(f"Unsupported site selector: {css!r}")
+    tests = []
+    for kind, value in SELECTOR_PART_RE.findall(m.group(2)):
+        if kind == '#':
+            tests.append(f"@id='{value}'")
+        else:
+            tests.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {value} ')")
+    path = f"//{m.group(1) or '*'}"
+    return path + ''.join(f'[{t}]' for t in tests)
+
+
+register_site_selectors('greenhouse', 'div#content', 'div.opening', 'div.main')
+register_site_selectors('lever.co', 'div.posting', 'div.content')
+register_site_selectors('workday', 'div.body', 'div.GWTCKEditor')
+register_site_selectors('linkedin.', 'div.description__text', 'section.description')
+register_site_selectors('indeed.', 'div.jobsearch-JobComponent', 'div.jobsearch-JobDescription')
+
+
+def warm_up():
+    """Run one tiny page through the parser so its lazy setup happens now."""
+    extract_main_text('<html><body><main><p>Warm-up</p></main></body></html>')
+
+
+def extract_main_text(html: str, url: str = '') -> str:
+    """Return the main textual content of ``html``, whitespace-collapsed and capped."""
+    if not html or not html.strip():
+        return ''
+    if lxml is not None:
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # str input that still carries an XML encoding declaration
+            root = lxml.html.document_fromstring(html.encode('utf-8'))
+        etree.strip_elements(root, etree.Comment, *STRIP_TAGS, with_tail=False)
+        get_text, first = _lxml_text, SiteSelector.first_lxml
+        densest = _densest_lxml
+    else:
+        root = BeautifulSoup(html, HTML_PARSER)
+        for tag in root(STRIP_TAGS):
+            tag.decompose()
+        for comment in root.find_all(string=lambda s: isinstance(s, Comment)):
+            comment.extract()
+        get_text, first = _soup_text, SiteSelector.first_soup
+        densest = _densest_soup
+
+    text = _site_text(root, url, get_text, first)
+    if not text:
+        node = densest(root)
+        if node is not None:
+            candidate = get_text(node)
+            if len(candidate.split()) > MIN_BLOCK_WORDS:
+                text = candidate
+    if not text:
+        # fallback entire body text
+        return ' '.join(get_text(root).split()[:MAX_WORDS])
+    return WHITESPACE_RE.sub(' ', text)[:MAX_CHARS]
+
+
+def _site_text(root, url: str, get_text, first) -> str:
+    domain = SCHEME_RE.sub('', url).split('/')[0]
+    parts = []
+    for fragment, selectors in SITE_SELECTORS.items():
+        if fragment not in domain:
+            continue
+        for sel in selectors:
+            node = first(sel, root)
+            if node is None:
+                continue
+            txt = get_text(node)
+            if len(txt.split()) > MIN_BLOCK_WORDS and txt not in parts:
+                parts.append(txt)
+                break
+    return '\n'.join(parts)
+
+
+def _lxml_text(node) -> str:
+    return ' '.join(t.strip() for t in node.itertext() if t.strip())
+
+
+def _soup_text(node) -> str:
+    return node.get_text(separator=' ', strip=True)
+
+
+#############################
+# Text-density scoring
+#############################
+#
+# Each node is visited once, children before parents. A container scores the
+# text of its non-container children (paragraphs, lists, inline runs) minus
+# link text, plus half the score of each child container that holds at least a
+# sentence or two. That lets a wrapper around several description blocks beat
+# any single block, while rails of tiny job cards and page-level wrappers
+# decay away.
+
+def _combine(name: str, own_chars: int, children: List[Tuple[str, Tuple[int, int], float]]):
+    """Fold child results into (subtree totals, score) for one node."""
+    text_len = own_chars
+    link_len = 0
+    own = float(own_chars)
+    child_score = 0.0
+    for child_name, (ct, cl), score in children:
+        text_len += ct
+        child_links = ct if child_name == 'a' else cl
+        link_len += child_links
+        if child_name in CONTAINER_TAGS:
+            if score >= MIN_PROPAGATE_CHARS:
+                child_score += score
+        else:
+            own += ct - child_links
+    if name == 'a':
+        link_len = text_len
+    return (text_len, link_len), own + 0.5 * child_score
+
+
+def _densest_lxml(root):
+    results = {}
+    best, best_score = None, 0.0
+    # Reversed document order visits every descendant before its ancestor
+    for el in reversed(list(root.iter(tag=etree.Element))):
+        own_chars = len((el.text or '').strip())
+        children = []
+        for child in el:
+            own_chars += len((child.tail or '').strip())
+            totals, score = results.pop(child, ((0, 0), 0.0))
+            children.append((child.tag, totals, score))
+        totals, score = _combine(el.tag, own_chars, children)
+        results[el] = (totals, score)
+        if el.tag in CONTAINER_TAGS and score > best_score:
+            best, best_score = el, score
+    return best
+
+
+def _densest_soup(root: Tag) -> Optional[Tag]:
+    results = {}
+    best, best_score = None, 0.0
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if not visited:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.contents if isinstance(child, Tag))
+            continue
+        own_chars = 0
+        children = []
+        for child in node.contents:
+            if isinstance(child, NavigableString):
+                own_chars += len(child.strip())
+            elif isinstance(child, Tag):
+                totals, score = results.pop(id(child))
+                children.append((child.name, totals, score))
+        totals, score = _combine(node.name, own_chars, children)
+        results[id(node)] = (totals, score)
+        if node.name in CONTAINER_TAGS and score > best_score:
+            best, best_score = node, score
+    return best
@@ -0,0 +1,56 @@
+"""
+Gunicorn settings, loaded automatically when gunicorn starts in the repo root
+"""
+
+import os
+import shutil
+import threading
+
+# Workers inherit this from the master, so every worker's metrics land in one
+# directory that /metrics aggregates
+prometheus_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'prometheus')
+)
+# A preloaded app registers metric samples before on_starting runs
+os.makedirs(prometheus_dir, exist_ok=True)
+
+# With GUNICORN_PRELOAD=true the master imports and warms up the app once and
+# workers fork with the heavy modules, fonts and DOCX template already loaded,
+# sharing those pages copy-on-write: worth it with several workers. Off by
+# default because a single worker answers /health sooner when it imports the
+# (lazy) app itself and warms up in the background.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false').lower() in ('1', 'true', 'yes')
+
+# The page streams generations over SSE, holding a connection for the whole
+# Gemini call. Threaded workers keep serving /health and other requests
+# meanwhile, and their heartbeat does not depend on any one request, so a
+# stream longer than the timeout no longer gets the worker killed.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+
+def on_starting(server):
+    # Samples left over from a previous run would be summed into this one
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+
+
+def when_ready(server):
+    if preload_app:
+        import app
+        app.warm_up(connect=False)
+
+
+def post_worker_init(worker):
+    # Model clients hold network channels that must not cross the fork, and
+    # without preloading this is the worker's only warm-up. It runs beside
+    # the worker's first requests, so /health answers as soon as the app is
+    # imported.
+    import app
+    threading.Thread(target=app.warm_up, name='warm-up', daemon=True).start()
+
+
+def child_exit(server, worker):
+    from metrics import mark_process_dead
+    mark_process_dead(worker.pid)
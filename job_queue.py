@@ -0,0 +1,206 @@
+"""
+Bounded background job queue for long-running resume generation
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class QueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is at capacity."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """Run jobs on a bounded local thread pool.
+
+    Job records are persisted as small JSON files so that a status poll served
+    by a different gunicorn worker still finds the job. A queued or running
+    record whose owning process has died (a worker killed or restarted) is
+    reported as failed once it is older than ``stale_after`` seconds.
+    """
+
+    def __init__(self, jobs_dir: str, max_workers: int = 2, max_pending: int = 16,
+                 result_ttl: int = 3600, stale_after: int = 120):
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='resume-job')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_times = deque(maxlen=200)
+        self._run_times = deque(maxlen=200)
+        self._last_prune = 0.0
+        self._owned = set()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """Queue ``fn(*args, **kwargs)`` and return the new job id."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise QueueFull(self._estimate_wait())
+            self._pending += 1
+        job_id = uuid.uuid4().hex
+        record = {
+            'job_id': job_id,
+            'status': 'queued',
+            'created_at': time.time(),
+            'owner_pid': os.getpid(),
+        }
+        with self._lock:
+            self._owned.add(job_id)
+        self._write(record)
+        self._executor.submit(self._run, record, fn, args, kwargs)
+        self._maybe_prune()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return the stored record for ``job_id`` or None if unknown."""
+        if not JOB_ID_RE.match(job_id or ''):
+            return None
+        try:
+            with open(self._path(job_id)) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._is_orphaned(record):
+            logger.warning(f"Job {job_id} was abandoned by process {record.get('owner_pid')}; marking it failed")
+            record.update(status='failed', error='The server restarted while this resume was being generated. Please try again.',
+                          finished_at=time.time())
+            try:
+                self._write(record)
+            except OSError as e:
+                logger.error(f"Could not persist job {job_id}: {e}")
+        return record
+
+    def stats(self) -> dict:
+        """Queue depth and wait-time figures for this worker process."""
+        with self._lock:
+            waits = list(self._wait_times)
+            runs = list(self._run_times)
+            return {
+                'pid': os.getpid(),
+                'workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'queue_depth': self._pending,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'avg_wait_seconds': round(sum(waits) / len(waits), 3) if waits else 0.0,
+                'max_wait_seconds': round(max(waits), 3) if waits else 0.0,
+                'avg_run_seconds': round(sum(runs) / len(runs), 3) if runs else 0.0,
+                'estimated_wait_seconds': self._estimate_wait(),
+            }
+
+    def _run(self, record: dict, fn: Callable, args: tuple, kwargs: dict):
+        started = time.time()
+        wait = started - record['created_at']
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+            self._wait_times.append(wait)
+        record.update(status='running', started_at=started, queue_wait_seconds=round(wait, 3))
+        self._write(record)
+        try:
+            result = fn(*args, **kwargs)
+            record.update(status='finished', result=result)
+            ok = True
+        except Exception as e:
+            logger.error(f"Job {record['job_id']} failed: {e}")
+            record.update(status='failed', error=str(e))
+            ok = False
+        finished = time.time()
+        record.update(finished_at=finished, run_seconds=round(finished - started, 3))
+        with self._lock:
+            self._running -= 1
+            self._run_times.append(finished - started)
+            self._owned.discard(record['job_id'])
+            if ok:
+                self._completed += 1
+            else:
+                self._failed += 1
+        try:
+            self._write(record)
+        except Exception as e:
+            logger.error(f"Could not persist job {record['job_id']}: {e}")
+
+    def _is_orphaned(self, record: dict) -> bool:
+        if record.get('status') not in ('queued', 'running'):
+            return False
+        with self._lock:
+            if record['job_id'] in self._owned:
+                return False
+        since = record.get('started_at') or record.get('created_at') or 0
+        if time.time() - since < self.stale_after:
+            return False
+        return not _process_alive(record.get('owner_pid'))
+
+    def _estimate_wait(self) -> int:
+        # Caller holds the lock; rough guess from recent run times.
+        runs = list(self._run_times)
+        avg = sum(runs) / len(runs) if runs else 15.0
+        backlog = self._pending + self._running
+        return max(1, int(avg * backlog / max(1, self.max_workers)))
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _write(self, record: dict):
+        path = self._path(record['job_id'])
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp, path)
+
+    def _maybe_prune(self):
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        cutoff = now - self.result_ttl
+        try:
+            for name in os.listdir(self.jobs_dir):
+                path = os.path.join(self.jobs_dir, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    continue
+        except OSError as e:
+            logger.warning(f"Job directory prune failed: {e}")
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to another user
+        return True
+    return True
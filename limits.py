@@ -0,0 +1,222 @@
+"""
+Admission control: model-call concurrency and per-client rate limits
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a limiter cannot admit a caller soon enough."""
+
+    def __init__(self, retry_after: int, message: str = "Too many AI requests in flight"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Cap concurrent calls, with a bounded queue of waiters.
+
+    At most ``max_concurrent`` callers hold a slot; up to ``max_waiting``
+    more wait for one, each for at most ``wait_timeout`` seconds. Anyone
+    beyond that is rejected immediately with Overloaded, so callers fail
+    fast instead of piling up behind an upstream rate limit.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_waiting: int = 8, wait_timeout: float = 10.0):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._hold_times = deque(maxlen=100)
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def check(self):
+        """Raise Overloaded now if a new caller would be turned away."""
+        with self._cond:
+            if self._active >= self.max_concurrent and self._waiting >= self.max_waiting:
+                self.rejected += 1
+                raise Overloaded(self._retry_after())
+
+    @contextmanager
+    def slot(self):
+        """Hold one slot for the duration of the block."""
+        with self._cond:
+            if self._active >= self.max_concurrent:
+                if self._waiting >= self.max_waiting:
+                    self.rejected += 1
+                    raise Overloaded(self._retry_after())
+                self._waiting += 1
+                deadline = time.monotonic() + self.wait_timeout
+                try:
+                    while self._active >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timed_out += 1
+                            raise Overloaded(self._retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._active += 1
+            self.admitted += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._hold_times.append(time.monotonic() - start)
+                self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_waiting': self.max_waiting,
+                'wait_timeout_seconds': self.wait_timeout,
+                'active': self._active,
+                'waiting': self._waiting,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'avg_hold_seconds': round(sum(self._hold_times) / len(self._hold_times), 3) if self._hold_times else None,
+            }
+
+    def _retry_after(self) -> int:
+        # Callers hold the condition lock
+        avg = sum(self._hold_times) / len(self._hold_times) if self._hold_times else 5.0
+        rounds = (self._waiting + 1) / max(1, self.max_concurrent)
+        return max(1, int(math.ceil(avg * rounds)))
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets: ``burst`` requests at once, refilled at ``rate`` per second.
+
+    Buckets live in process memory by default. With ``path`` they live in a
+    shared SQLite file instead, so the limit holds across gunicorn workers.
+    ``charge`` bills extra tokens for a request that turned out to cost more
+    than one; the bucket may go negative, and the client waits for it to
+    refill before its next request.
+    """
+
+    def __init__(self, rate: float, burst: int, path: Optional[str] = None, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.path = path
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self._ops = 0
+        self.allowed = 0
+        self.limited = 0
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS buckets ('
+                    'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+                )
+            finally:
+                conn.close()
+
+    def acquire(self, key: str, now: Optional[float] = None) -> Optional[int]:
+        """Take one token for ``key``. Returns None if allowed, else seconds until retry."""
+        now = time.time() if now is None else now
+        try:
+            allowed, tokens = self._take_shared(key, now) if self.path else self._take_local(key, now)
+        except sqlite3.Error as e:
+            # Never turn a storage hiccup into an outage
+            logger.warning(f"Rate limit store unavailable ({self.path}): {e}")
+            allowed, tokens = True, 0.0
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.limited += 1
+        if allowed:
+            return None
+        return max(1, int(math.ceil((1.0 - tokens) / self.rate)))
+
+    def charge(self, key: str, cost: float, now: Optional[float] = None):
+        """Take ``cost`` more tokens from ``key``'s bucket, even if that empties it."""
+        if cost <= 0:
+            return
+        now = time.time() if now is None else now
+        try:
+            if self.path:
+                self._take_shared(key, now, cost, force=True)
+            else:
+                self._take_local(key, now, cost, force=True)
+        except sqlite3.Error as e:
+            logger.warning(f"Rate limit store unavailable ({self.path}): {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'rate_per_second': self.rate,
+                'burst': self.burst,
+                'store': 'sqlite' if self.path else 'memory',
+                'tracked_keys': None if self.path else len(self._buckets),
+                'allowed': self.allowed,
+                'limited': self.limited,
+            }
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        return min(float(self.burst), tokens + max(0.0, now - updated) * self.rate)
+
+    def _take_local(self, key: str, now: float, cost: float = 1.0, force: bool = False) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = self._refill(tokens, updated, now)
+            allowed = force or tokens >= 1.0
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def _take_shared(self, key: str, now: float, cost: float = 1.0, force: bool = False) -> Tuple[bool, float]:
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front so the read-modify-write
+            # is atomic across worker processes
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = self._refill(*row, now) if row else float(self.burst)
+            allowed = force or tokens >= 1.0
+            if allowed:
+                tokens -= cost
+            conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', (key, tokens, now))
+            self._ops += 1
+            if self._ops % 500 == 0:
+                # Buckets idle long enough to be full again carry no state
+                conn.execute('DELETE FROM buckets WHERE updated + (? - tokens) / ? < ?', (self.burst, self.rate, now))
+            conn.execute('COMMIT')
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        return allowed, tokens
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
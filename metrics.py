@@ -0,0 +1,74 @@
+"""
+Prometheus metrics for the resume pipeline
+
+Under gunicorn, gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR at a shared
+directory before workers import the app, so every worker writes its samples
+there and ``/metrics`` aggregates all of them regardless of which worker
+serves the scrape.
+"""
+
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# Stages take from milliseconds (cache hits) to tens of seconds (Gemini)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+
+STAGE_SECONDS = Histogram(
+    'resume_stage_duration_seconds',
+    'Time spent in each resume pipeline stage',
+    ['stage'],
+    buckets=STAGE_BUCKETS,
+)
+FALLBACKS = Counter(
+    'resume_fallbacks_total',
+    'Requests that took a degraded path',
+    ['reason'],
+)
+RESUMES_GENERATED = Counter(
+    'resumes_generated_total',
+    'Resume generations completed',
+    ['mode'],
+)
+PROMPT_TOKENS = Counter(
+    'resume_prompt_tokens_total',
+    'Estimated prompt input tokens before (original) and after (sent) compression',
+    ['prompt', 'kind'],
+)
+IN_FLIGHT = Gauge(
+    'resume_pipelines_in_flight',
+    'Resume generations currently running',
+    ['mode'],
+    multiprocess_mode='livesum',
+)
+
+
+def observe_stage(stage: str):
+    """Time a stage; usable as a context manager or a decorator."""
+    return STAGE_SECONDS.labels(stage=stage).time()
+
+
+def record_fallback(reason: str):
+    FALLBACKS.labels(reason=reason).inc()
+
+
+def track_in_flight(mode: str):
+    """Context manager/decorator counting a running pipeline."""
+    return IN_FLIGHT.labels(mode=mode).track_inprogress()
+
+
+def render_metrics():
+    """Return (body, content_type) for the metrics endpoint."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop a dead worker's live gauges (called from gunicorn's child_exit hook)."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,182 @@
+"""
+Pluggable text-generation backends: Gemini, a local fake for load tests, or none
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('gemini', 'fake', 'none')
+
+RESUME_BLOCK_RE = re.compile(r'ORIGINAL RESUME \((?:trimmed|condensed)\):\s*(.*?)\n---', re.S)
+
+DEFAULT_EXPLANATION = "\n".join([
+    '• **SUMMARY:** Reframed the opening around "reliable backend services" to mirror the role\'s core focus.',
+    '• **EXPERIENCE:** Led bullets with stronger action verbs ("Designed", "Scaled") so ownership reads clearly.',
+    '• **SKILLS:** Grouped the tools the posting names first, improving keyword match for ATS screening.',
+    '• **EDUCATION:** Kept degree details concise so reviewers reach relevant experience sooner.',
+    '• **OVERALL IMPACT:** Consistent section order and bullet style make the resume faster to scan.',
+])
+
+
+class FakeModelError(RuntimeError):
+    """Injected failure from FakeModel, standing in for a Gemini API error."""
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Offline stand-in for ``genai.GenerativeModel``.
+
+    Latency is log-normal around ``latency_ms`` (``latency_sigma`` controls
+    the tail), ``error_rate`` of calls raise FakeModelError, and responses
+    come from ``outputs`` (``enhance`` / ``explain`` / ``combined`` /
+    ``default`` keys) or, by default, an echo of the resume in the prompt.
+    """
+
+    def __init__(self, latency_ms: float = 800.0, latency_sigma: float = 0.5, error_rate: float = 0.0,
+                 outputs: Optional[Dict[str, str]] = None, stream_chunks: int = 8, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.outputs = outputs or {}
+        self.stream_chunks = max(1, stream_chunks)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> 'FakeModel':
+        outputs = None
+        outputs_path = os.getenv('FAKE_MODEL_OUTPUTS')
+        if outputs_path:
+            with open(outputs_path, encoding='utf-8') as f:
+                outputs = json.load(f)
+        seed = os.getenv('FAKE_MODEL_SEED')
+        return cls(
+            latency_ms=float(os.getenv('FAKE_MODEL_LATENCY_MS', '800')),
+            latency_sigma=float(os.getenv('FAKE_MODEL_LATENCY_SIGMA', '0.5')),
+            error_rate=float(os.getenv('FAKE_MODEL_ERROR_RATE', '0')),
+            outputs=outputs,
+            stream_chunks=int(os.getenv('FAKE_MODEL_STREAM_CHUNKS', '8')),
+            seed=int(seed) if seed else None,
+        )
+
+    def generate_content(self, prompt: str, stream: bool = False, generation_config: Optional[dict] = None):
+        with self._lock:
+            self.calls += 1
+            delay = self._delay()
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        text = self._respond(prompt)
+        if not stream:
+            time.sleep(delay)
+            if failed:
+                raise FakeModelError("Injected fake model failure")
+            return FakeResponse(text)
+        return self._stream(text, delay, failed)
+
+    def _stream(self, text: str, delay: float, failed: bool):
+        step = max(1, len(text) // self.stream_chunks + 1)
+        pieces = [text[i:i + step] for i in range(0, len(text), step)] or ['']
+        for n, piece in enumerate(pieces):
+            time.sleep(delay / len(pieces))
+            if failed and n == len(pieces) // 2:
+                raise FakeModelError("Injected fake model failure mid-stream")
+            yield FakeResponse(piece)
+
+    def _delay(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self._random.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000.0
+
+    def _respond(self, prompt: str) -> str:
+        if 'JSON object' in prompt:
+            if 'combined' in self.outputs:
+                return self.outputs['combined']
+            m = RESUME_BLOCK_RE.search(prompt)
+            return json.dumps({
+                'resume': m.group(1).strip() if m else prompt,
+                'explanation': [line.lstrip('• ') for line in DEFAULT_EXPLANATION.split('\n')],
+            })
+        if 'ORIGINAL RESUME' in prompt:
+            if 'enhance' in self.outputs:
+                return self.outputs['enhance']
+            m = RESUME_BLOCK_RE.search(prompt)
+            return m.group(1).strip() if m else prompt
+        if 'ENHANCED' in prompt:
+            return self.outputs.get('explain', DEFAULT_EXPLANATION)
+        return self.outputs.get('default', DEFAULT_EXPLANATION)
+
+
+class LazyGeminiModel:
+    """``genai.GenerativeModel`` built on first use.
+
+    Importing google.generativeai takes about a second, so the app imports
+    it in ``warm_up()`` (or on the first request) rather than at import.
+    """
+
+    def __init__(self, model_name: str, api_key: str):
+        self.model_name = model_name
+        self._api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self._api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate_content(self, *args, **kwargs):
+        return self.model.generate_content(*args, **kwargs)
+
+    def warm_up(self, connect: bool = True):
+        """Import the SDK and, with ``connect``, create this process's API client.
+
+        Clients hold gRPC channels, which must not cross a fork: under a
+        preloading gunicorn, connect in each worker, not in the master.
+        """
+        model = self.model
+        if connect and model._client is None:
+            from google.generativeai import client
+            model._client = client.get_default_generative_client()
+
+
+def warm_up_model(model, connect: bool = True):
+    """Prime ``model`` (any backend, or None) before the first request."""
+    if isinstance(model, LazyGeminiModel):
+        model.warm_up(connect=connect)
+
+
+def load_model(backend: str, model_name: str, api_key: Optional[str] = None):
+    """Build the model object for ``backend``; None disables AI features."""
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown MODEL_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+    if backend == 'none':
+        return None
+    if backend == 'fake':
+        fake = FakeModel.from_env()
+        logger.warning(f"Using fake model backend (latency ~{fake.latency_ms:.0f}ms, error rate {fake.error_rate})")
+        return fake
+    if not api_key:
+        logger.warning("GOOGLE_API_KEY not found. AI features will be disabled.")
+        return None
+    return LazyGeminiModel(model_name, api_key)
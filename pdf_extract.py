@@ -0,0 +1,266 @@
+"""
+PDF text extraction backends: pypdfium2 fast path, pdfplumber fallback
+"""
+
+import atexit
+import importlib
+import importlib.util
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Tried in this order; later backends run when earlier ones fail or find no text
+DEFAULT_ORDER = ('pdfium', 'pdfplumber')
+
+
+# PDFium is not thread-safe, not even across separate documents, and
+# pypdfium2 does not serialize calls itself
+_pdfium_lock = threading.Lock()
+
+
+class PdfiumBackend:
+    """pdfium's character-order text: no layout analysis, ~1ms per page.
+
+    Every call into PDFium holds a process-wide lock, so request and job
+    threads take turns; at ~1ms per page that costs less than the pool's
+    pickling round-trip would.
+    """
+    name = 'pdfium'
+    module = 'pypdfium2'
+    parallel = False
+
+    def open(self, data: bytes):
+        import pypdfium2 as pdfium
+        with _pdfium_lock:
+            return pdfium.PdfDocument(data)
+
+    def page_count(self, doc) -> int:
+        with _pdfium_lock:
+            return len(doc)
+
+    def page_text(self, doc, index: int) -> Optional[str]:
+        with _pdfium_lock:
+            page = doc[index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    return textpage.get_text_range()
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+
+    def close(self, doc):
+        with _pdfium_lock:
+            doc.close()
+
+
+class PdfplumberBackend:
+    """pdfplumber's layout-aware text; slow, but copes with unusual PDFs."""
+    name = 'pdfplumber'
+    module = 'pdfplumber'
+    parallel = True
+
+    def open(self, data: bytes):
+        import pdfplumber
+        return pdfplumber.open(io.BytesIO(data))
+
+    def page_count(self, doc) -> int:
+        return len(doc.pages)
+
+    def page_text(self, doc, index: int) -> Optional[str]:
+        page = doc.pages[index]
+        try:
+            return page.extract_text()
+        finally:
+            page.close()
+
+    def close(self, doc):
+        doc.close()
+
+
+BACKENDS = {backend.name: backend for backend in (PdfiumBackend(), PdfplumberBackend())}
+
+
+def backend_available(name: str) -> bool:
+    # find_spec, not import: the app builds its extractor at import time
+    return importlib.util.find_spec(BACKENDS[name].module) is not None
+
+
+def _read_pages(backend, doc, start: int, stop: int, deadline: float) -> Tuple[List[Optional[str]], bool]:
+    """Text of pages [start, stop) and whether the deadline cut them short."""
+    pages = []
+    for i in range(start, stop):
+        if time.time() > deadline:
+            # A page cannot be interrupted, but the document stops here
+            logger.warning(f"{backend.name} ran out of time at page {i + 1}")
+            pages.extend([None] * (stop - i))
+            return pages, True
+        try:
+            pages.append(backend.page_text(doc, i))
+        except Exception as e:
+            logger.warning(f"{backend.name} could not read page {i + 1}: {e}")
+            pages.append(None)
+    return pages, False
+
+
+def _extract_range(name: str, data: bytes, start: int, stop: int, deadline: float) -> Tuple[List[Optional[str]], bool]:
+    """Pool task: _read_pages on a fresh copy of the document (module level so it pickles)."""
+    backend = BACKENDS[name]
+    doc = backend.open(data)
+    try:
+        return _read_pages(backend, doc, start, stop, deadline)
+    finally:
+        backend.close(doc)
+
+
+def _clean_page(text: Optional[str]) -> str:
+    return (text or '').replace('\r\n', '\n').replace('\r', '\n')
+
+
+class PdfExtractor:
+    """Extract PDF text page by page with the first backend that yields any.
+
+    Every document gets ``page_timeout`` seconds per page; pages left when
+    the budget runs out come back empty. For slow backends, documents with
+    at least ``parallel_min_pages`` pages are split into page ranges run on
+    a pool of ``workers`` processes, and a range that overruns its budget is
+    abandoned and the pool replaced, since a stuck worker cannot be
+    interrupted otherwise. Pages past ``max_pages`` are ignored.
+    """
+
+    def __init__(self, backend: str = 'auto', max_pages: int = 30, page_timeout: float = 5.0,
+                 parallel_min_pages: int = 4, workers: int = 2):
+        if backend == 'auto':
+            order = [name for name in DEFAULT_ORDER if backend_available(name)]
+        elif backend in BACKENDS:
+            order = [backend] + [name for name in DEFAULT_ORDER if name != backend and backend_available(name)]
+        else:
+            raise ValueError(f"Unknown PDF_EXTRACT_BACKEND {backend!r}; expected auto or one of {', '.join(BACKENDS)}")
+        self.order = order
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.parallel_min_pages = parallel_min_pages
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self.extracted: Dict[str, int] = {name: 0 for name in order}
+        self.fallbacks = 0
+        self.truncated = 0
+        self.timeouts = 0
+        self.parallel_documents = 0
+
+    @property
+    def cache_tag(self) -> str:
+        """Identifies the settings that shape the output, for text cache keys."""
+        return f"{'>'.join(self.order)}:{self.max_pages}"
+
+    def warm_up(self):
+        """Import the backend libraries now instead of on the first upload."""
+        for name in self.order:
+            try:
+                importlib.import_module(BACKENDS[name].module)
+            except Exception as e:
+                logger.warning(f"Could not load PDF backend {name}: {e}")
+
+    def extract(self, source: Union[str, BinaryIO]) -> str:
+        """Text of ``source`` (a path or binary file), pages separated by newlines."""
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                data = f.read()
+        else:
+            data = source.read()
+        for i, name in enumerate(self.order):
+            try:
+                pages = self._extract_with(BACKENDS[name], data)
+            except Exception as e:
+                logger.warning(f"{name} extraction failed: {e}")
+                continue
+            if any(p.strip() for p in pages):
+                with self._lock:
+                    self.extracted[name] += 1
+                    if i:
+                        self.fallbacks += 1
+                return '\n'.join(pages) + '\n'
+        return ''
+
+    def _extract_with(self, backend, data: bytes) -> List[str]:
+        doc = backend.open(data)
+        try:
+            total = backend.page_count(doc)
+            if total > self.max_pages:
+                logger.warning(f"PDF has {total} pages; extracting the first {self.max_pages}")
+                with self._lock:
+                    self.truncated += 1
+                total = self.max_pages
+            parallel = backend.parallel and self.workers > 1 and total >= max(2, self.parallel_min_pages)
+            if not parallel:
+                pages, timed_out = _read_pages(backend, doc, 0, total, time.time() + self.page_timeout * total)
+        finally:
+            backend.close(doc)
+        if parallel:
+            pages, timed_out = self._extract_parallel(backend.name, data, total)
+        if timed_out:
+            with self._lock:
+                self.timeouts += 1
+        return [_clean_page(p) for p in pages]
+
+    def _extract_parallel(self, name: str, data: bytes, total: int) -> Tuple[List[Optional[str]], bool]:
+        size = -(-total // self.workers)
+        ranges = [(start, min(start + size, total)) for start in range(0, total, size)]
+        # Ranges run side by side, so they share one budget
+        budget = self.page_timeout * size
+        deadline = time.time() + budget
+        pool = self._get_pool()
+        tasks = [pool.apply_async(_extract_range, (name, data, start, stop, deadline)) for start, stop in ranges]
+        wait_until = time.monotonic() + budget + 1.0
+        pages = []
+        timed_out = stuck = False
+        for (start, stop), task in zip(ranges, tasks):
+            try:
+                chunk, chunk_timed_out = task.get(timeout=max(0.0, wait_until - time.monotonic()))
+            except multiprocessing.TimeoutError:
+                logger.warning(f"{name} timed out on pages {start + 1}-{stop}")
+                chunk, chunk_timed_out = [None] * (stop - start), True
+                stuck = True
+            pages.extend(chunk)
+            timed_out = timed_out or chunk_timed_out
+        with self._lock:
+            self.parallel_documents += 1
+        if stuck:
+            self._discard_pool(pool)
+        return pages, timed_out
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                # spawn, not fork: request threads may hold locks at fork time
+                self._pool = multiprocessing.get_context('spawn').Pool(self.workers)
+                self._pool_pid = os.getpid()
+                atexit.register(self._pool.terminate)
+            return self._pool
+
+    def _discard_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.terminate()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'backends': list(self.order),
+                'extracted': dict(self.extracted),
+                'fallbacks': self.fallbacks,
+                'truncated_documents': self.truncated,
+                'parallel_documents': self.parallel_documents,
+                'timeouts': self.timeouts,
+                'pool_running': self._pool is not None and self._pool_pid == os.getpid(),
+            }
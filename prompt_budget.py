@@ -0,0 +1,148 @@
+"""
+Token budgeting for model prompts: keep whole sections, drop boilerplate, dedupe
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from resume_format import CANONICAL_SECTION_ORDER, HEADER_KEYWORDS
+
+# Rough size of a Gemini token for English prose; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Resume sections in the order they are worth keeping when space runs out;
+# the untitled block before the first header (name, contact) always goes first
+SECTION_PRIORITY = ['GENERAL', 'SUMMARY', 'EXPERIENCE', 'SKILLS', 'PROJECTS', 'EDUCATION', 'CERTIFICATIONS']
+
+# All-caps lines that start a section. Any other all-caps line (an employer,
+# a job title) is content and stays with the lines around it.
+SECTION_NAMES = set(SECTION_PRIORITY) | set(CANONICAL_SECTION_ORDER) | HEADER_KEYWORDS | {
+    'WORK EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'EMPLOYMENT HISTORY', 'TECHNICAL SKILLS', 'CORE COMPETENCIES',
+    'PROFESSIONAL SUMMARY', 'AWARDS', 'ACHIEVEMENTS', 'PUBLICATIONS', 'LANGUAGES', 'INTERESTS', 'HOBBIES',
+    'VOLUNTEER EXPERIENCE', 'VOLUNTEERING', 'REFERENCES', 'COURSEWORK',
+}
+
+# Job-posting sentences that say nothing about the role itself
+# Whole words only: "sign in" must not match "design interfaces"
+BOILERPLATE_RE = re.compile(
+    r'\b(?:'
+    r'equal (?:employment )?opportunity|eeo|affirmative action|without regard to|'
+    r'sexual orientation|gender identity|veteran status|protected (?:veteran|characteristic)s?|'
+    r'reasonable accommodations?|e-verify|background checks?|'
+    r'benefits (?:include|package)|401\(?k\)?|paid time off|pto|medical, dental|dental and vision|parental leave|'
+    r'wellness (?:program|stipend)|commuter|perks|'
+    r'cookies?|privacy (?:policy|notice)|terms of (?:use|service)|all rights reserved|'
+    r'apply (?:now|today)|share this (?:job|posting)|follow us|sign in|create (?:an )?account|similar jobs'
+    r')(?![\w-])',
+    re.I
+)
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?;])\s+|\s+(?=[•▪◦]\s)')
+DEDUPE_KEY_RE = re.compile(r'[^a-z0-9]+')
+RESUME_BULLET_RE = re.compile(r'^[-•*▪◦]\s')
+# Shorter resume lines (titles, dates, company names) legitimately repeat
+DEDUPE_MIN_WORDS = 5
+
+
+@dataclass(frozen=True)
+class CompressedText:
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _dedupe(lines: List[str], seen: set) -> List[str]:
+    kept = []
+    for line in lines:
+        key = DEDUPE_KEY_RE.sub(' ', line.lower()).strip()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return kept
+
+
+def _is_repeatable(line: str) -> bool:
+    """Whether a resume line may be dropped as a repeat: only long bullets."""
+    return bool(RESUME_BULLET_RE.match(line)) and len(line.split()) > DEDUPE_MIN_WORDS
+
+
+def _resume_blocks(text: str) -> List[Tuple[str, List[str]]]:
+    """(title, lines) per section in resume order; a title may occur more than once."""
+    blocks = [('GENERAL', [])]
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.isupper() and line in SECTION_NAMES:
+            blocks.append((line, [line]))
+        else:
+            blocks[-1][1].append(line)
+    return blocks
+
+
+def _take_lines(lines: List[str], budget: int) -> List[str]:
+    """Longest prefix of ``lines`` that fits ``budget`` tokens (never splits a line)."""
+    taken = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        taken.append(line)
+        used += cost
+    return taken
+
+
+def compress_resume(text: str, budget: int) -> CompressedText:
+    """Fit resume text into ``budget`` tokens, keeping sections whole where possible."""
+    original_tokens = estimate_tokens(text)
+    seen = set()
+    blocks = []
+    for title, lines in _resume_blocks(text):
+        blocks.append((title, [line for line in lines if not _is_repeatable(line) or _dedupe([line], seen)]))
+
+    known = SECTION_PRIORITY + [t for t in CANONICAL_SECTION_ORDER if t not in SECTION_PRIORITY]
+    rank = {title: i for i, title in enumerate(known)}
+    order = sorted(range(len(blocks)), key=lambda i: rank.get(blocks[i][0], len(known)))
+    chosen = {}
+    remaining = budget
+    for i in order:
+        title, block = blocks[i]
+        cost = sum(estimate_tokens(line) + 1 for line in block)
+        if cost <= remaining:
+            chosen[i] = block
+            remaining -= cost
+        else:
+            # Partial section: only at line boundaries, and only if the header
+            # still comes with some content
+            partial = _take_lines(block, remaining)
+            if len(partial) > (0 if title == 'GENERAL' else 1):
+                chosen[i] = partial
+                remaining -= sum(estimate_tokens(line) + 1 for line in partial)
+    # Emit in the resume's own order
+    out = []
+    for i in range(len(blocks)):
+        out.extend(chosen.get(i, []))
+    compressed = '\n'.join(out)
+    return CompressedText(compressed, original_tokens, estimate_tokens(compressed))
+
+
+def compress_job_description(text: str, budget: int) -> CompressedText:
+    """Fit a job posting into ``budget`` tokens, dropping boilerplate and repeats."""
+    original_tokens = estimate_tokens(text)
+    sentences = []
+    for line in text.splitlines():
+        sentences.extend(s.strip() for s in SENTENCE_SPLIT_RE.split(line) if s.strip())
+    sentences = [s for s in sentences if not BOILERPLATE_RE.search(s)]
+    sentences = _take_lines(_dedupe(sentences, set()), budget)
+    compressed = '\n'.join(sentences)
+    return CompressedText(compressed, original_tokens, estimate_tokens(compressed))
@@ -0,0 +1,196 @@
+"""
+In-memory PDF and DOCX rendering with styles and templates built once per process
+"""
+
+import copy
+import io
+import logging
+import os
+import threading
+import zipfile
+from collections import namedtuple
+from typing import List, Optional, Tuple
+
+from docx import Document
+from docx.document import Document as DocumentProxy
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+from docx.shared import Pt
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+from resume_format import ResumeDocument
+
+logger = logging.getLogger(__name__)
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DejaVuSans.ttf')
+FONT_NAME = 'DejaVuSans'
+FALLBACK_FONT = 'Helvetica'
+DOCX_BODY_PART = 'word/document.xml'
+
+PdfStyles = namedtuple('PdfStyles', 'title contact section bullet body')
+
+_lock = threading.Lock()
+_font_name = None
+_pdf_styles = {}
+_docx_template = None
+
+
+def register_fonts() -> str:
+    """Register the bundled Unicode font once; returns the font name to use."""
+    global _font_name
+    if _font_name is None:
+        with _lock:
+            if _font_name is None:
+                try:
+                    pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
+                    # No bold/italic faces are bundled, so map them to the regular one
+                    pdfmetrics.registerFontFamily(FONT_NAME, normal=FONT_NAME, bold=FONT_NAME,
+                                                  italic=FONT_NAME, boldItalic=FONT_NAME)
+                    _font_name = FONT_NAME
+                except Exception as e:
+                    logger.warning(f"Could not register {FONT_PATH}, using {FALLBACK_FONT}: {e}")
+                    _font_name = FALLBACK_FONT
+    return _font_name
+
+
+def needs_unicode_font(lines: List[str]) -> bool:
+    """True when some character is outside what the built-in Helvetica can show (cp1252)."""
+    try:
+        '\n'.join(lines).encode('cp1252')
+    except UnicodeEncodeError:
+        return True
+    return False
+
+
+def pdf_styles(unicode: bool = False) -> PdfStyles:
+    """Paragraph styles for the PDF layout (read-only, shared across threads).
+
+    The built-in Helvetica needs no font embedding, so it stays the default;
+    ``unicode`` styles use the bundled TTF for text Helvetica cannot encode.
+    """
+    key = FONT_NAME if unicode else FALLBACK_FONT
+    styles = _pdf_styles.get(key)
+    if styles is None:
+        font = register_fonts() if unicode else FALLBACK_FONT
+        with _lock:
+            styles = _pdf_styles.get(key)
+            if styles is None:
+                base = ParagraphStyle('BASE', fontName=font, fontSize=10, leading=13)
+                styles = _pdf_styles[key] = PdfStyles(
+                    title=ParagraphStyle('TITLE', parent=base, fontSize=16, leading=18, alignment=TA_CENTER, spaceAfter=6),
+                    contact=ParagraphStyle('CONTACT', parent=base, fontSize=9, alignment=TA_CENTER, textColor=colors.HexColor('#333333'), spaceAfter=10),
+                    section=ParagraphStyle('SECTION', parent=base, fontSize=11, leading=14, spaceBefore=10, spaceAfter=4, textColor=colors.HexColor('#111111')),
+                    bullet=ParagraphStyle('BULLET', parent=base, leftIndent=14, bulletIndent=6, spaceBefore=1, spaceAfter=1),
+                    body=ParagraphStyle('BODY', parent=base, spaceBefore=0, spaceAfter=3),
+                )
+    return styles
+
+
+def render_pdf(resume: ResumeDocument) -> bytes:
+    """Render the PDF layout of ``resume`` and return the file bytes."""
+    styles = pdf_styles(unicode=needs_unicode_font(resume.pdf_lines))
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter, rightMargin=54, leftMargin=54, topMargin=50, bottomMargin=50)
+    structured = resume.pdf_view
+    story = []
+    if structured.name:
+        story.append(Paragraph(structured.name, styles.title))
+    if structured.contact:
+        story.append(Paragraph(structured.contact, styles.contact))
+    for sec in structured.sections:
+        if not sec.entries:
+            continue
+        story.append(Paragraph(sec.title, styles.section))
+        for ent in sec.entries:
+            story.append(Paragraph(ent.text, styles.bullet if ent.is_bullet else styles.body))
+    doc.build(story)
+    return buf.getvalue()
+
+
+class DocxTemplate:
+    """The default python-docx template, restyled and parsed once.
+
+    Each render deep-copies only the (empty) body element and serializes
+    only that part; every other part of the package is reused as the bytes
+    captured at build time. Style ids are resolved up front because
+    python-docx looks styles up by name with an XPath scan per paragraph.
+    """
+
+    def __init__(self):
+        doc = Document()
+        style = doc.styles['Normal']
+        style.font.name = 'Arial'
+        style.font.size = Pt(10.5)
+        style._element.rPr.rFonts.set(qn('w:eastAsia'), 'Arial')
+        self.element = doc.element
+        self.part = doc.part
+        self.bullet_style_id = doc.styles['List Bullet'].style_id
+        buf = io.BytesIO()
+        doc.save(buf)
+        with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as z:
+            self.entries: List[Tuple[zipfile.ZipInfo, Optional[bytes]]] = [
+                (info, None if info.filename == DOCX_BODY_PART else z.read(info))
+                for info in z.infolist()
+            ]
+
+    def new_document(self) -> DocumentProxy:
+        return DocumentProxy(copy.deepcopy(self.element), self.part)
+
+    def package(self, document: DocumentProxy) -> bytes:
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as z:
+            for info, data in self.entries:
+                z.writestr(info.filename, serialize_part_xml(document.element) if data is None else data)
+        return buf.getvalue()
+
+
+def docx_template() -> DocxTemplate:
+    global _docx_template
+    if _docx_template is None:
+        with _lock:
+            if _docx_template is None:
+                _docx_template = DocxTemplate()
+    return _docx_template
+
+
+def render_docx(resume: ResumeDocument) -> bytes:
+    """Render the DOCX layout of ``resume`` and return the file bytes."""
+    template = docx_template()
+    doc = template.new_document()
+    structured = resume.view
+    if structured.name:
+        p = doc.add_paragraph()
+        r = p.add_run(structured.name)
+        r.bold = True
+        r.font.size = Pt(16)
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    if structured.contact:
+        p = doc.add_paragraph(structured.contact)
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    for sec in structured.sections:
+        if not sec.entries:
+            continue
+        ph = doc.add_paragraph()
+        rh = ph.add_run(sec.title)
+        rh.bold = True
+        rh.font.size = Pt(11.5)
+        for ent in sec.entries:
+            if ent.is_bullet:
+                doc.add_paragraph(ent.body)._p.style = template.bullet_style_id
+            else:
+                doc.add_paragraph(ent.text)
+    return template.package(doc)
+
+
+def warm_up():
+    """Build fonts, styles and the DOCX template now instead of on the first request."""
+    pdf_styles()
+    pdf_styles(unicode=True)
+    docx_template()
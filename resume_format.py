@@ -0,0 +1,470 @@
+"""
+Resume text normalization and the parsed resume representation shared by renderers
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List, Optional, Union
+
+CANONICAL_SECTION_ORDER = ["SUMMARY","EXPERIENCE","PROJECTS","EDUCATION","SKILLS","CERTIFICATIONS"]
+
+#############################
+# Precompiled patterns
+#############################
+
+AI_BULLET_RE = re.compile(r"^[•*\-]\s+")
+AI_HEADER_WORDS = {"summary","experience","education","skills","projects","certifications","profile","objective"}
+
+HEADER_KEYWORDS = {"SUMMARY","EXPERIENCE","EDUCATION","SKILLS","PROJECTS","CERTIFICATIONS","OBJECTIVE","PROFILE"}
+ACTION_VERBS = {"developed","designed","implemented","led","managed","optimized","improved","architected","built","created","enhanced","reduced","increased","automated","migrated","refactored"}
+MD_BULLET_HEADING_RE = re.compile(r"^- \*([^*]+?)\*+.*$")
+LEADING_STARS_RE = re.compile(r'^\*+')
+TRAILING_STARS_RE = re.compile(r'\*+$')
+BULLET_SIGNAL_RE = re.compile(r'(\d|api|sql|flask|python|cloud)')
+PLACEHOLDER_BRACKET_RES = [
+    re.compile(r'\[(?:[^\]]*quantifiable[^\]]*)\]', re.IGNORECASE),
+    re.compile(r'\[(?:[^\]]*specify[^\]]*)\]', re.IGNORECASE),
+    re.compile(r'\[(?:[^\]]*add another bullet[^\]]*)\]', re.IGNORECASE),
+]
+MULTI_SPACE_RE = re.compile(r'\s{2,}')
+
+WRAPPED_STARS_RE = re.compile(r'^\*(.+)\*$')
+PDF_PLACEHOLDER_RE = re.compile(r'(quantifiable achievement|add another bullet|specify framework|dates of employment)', re.IGNORECASE)
+BRACKETED_RE = re.compile(r'\[[^\]]*\]')
+PDF_CONTACT_TOKENS = ['@', 'gmail', 'linkedin', ' | ', 'github']
+
+CONTACT_TOKENS = ['@','linkedin','github','portfolio','http','www.','gmail','phone','|']
+JOB_TITLE_RE = re.compile(r'(\bmanager\b|\bengineer\b|\bdeveloper\b|\bdesigner\b|\bconsultant\b|\bproject\b)')
+YEAR_RE = re.compile(r'(20\d{2}|19\d{2})')
+DATE_RANGE_RE = re.compile(r'(\b20\d{2}\b|\b19\d{2}\b).*?(Present|20\d{2}|19\d{2})')
+SUMMARY_VERB_RE = re.compile(r'\b(led|managed|built|developed|created|increased|reduced|optimized|designed|launched|implemented)\b')
+TERMINAL_PUNCT_RE = re.compile(r'[.!?]$')
+SENTENCE_START_RE = re.compile(r'([.!?]\s+)([a-z])')
+LEADING_DASH_RE = re.compile(r'^-\s+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _collapse_blank_lines(lines: List[str]) -> List[str]:
+    collapsed = []
+    blank = False
+    for l in lines:
+        if l == "":
+            if not blank:
+                collapsed.append("")
+            blank = True
+        else:
+            collapsed.append(l)
+            blank = False
+    return collapsed
+
+
+#############################
+# AI output normalization
+#############################
+
+def _normalize_ai_text(text: str) -> str:
+    """Normalize AI output to consistent plain text resume format."""
+    if not text:
+        return ""
+    lines = []
+    for raw in text.splitlines():
+        line = raw.strip('\r ').rstrip()
+        if not line:
+            lines.append("")
+            continue
+        # Normalize bullets
+        if AI_BULLET_RE.match(line):
+            body = AI_BULLET_RE.sub("", line).strip()
+            lines.append(f"- {body}")
+            continue
+        # Uppercase section headers heuristically
+        if (len(line) < 40 and 1 <= len(line.split()) <= 5 and
+            any(tok in AI_HEADER_WORDS for tok in line.lower().split())):
+            lines.append("")
+            lines.append(line.upper())
+            lines.append("")
+            continue
+        lines.append(line)
+    # Collapse multiple blank lines
+    return "\n".join(_collapse_blank_lines(lines)).strip()
+
+#############################
+# Post-processing sanitation
+#############################
+
+def _is_placeholder(l: str) -> bool:
+    l_low = l.lower()
+    return ('quantifiable achievement' in l_low or 'specify framework' in l_low or 'add another bullet' in l_low or l_low.startswith('[add ') )
+
+def sanitize_enhanced_content(text: str) -> str:
+    """Clean AI output: remove markdown asterisks, placeholder brackets, fix headings & bullets."""
+    cleaned = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            cleaned.append("")
+            continue
+
+        # Pattern like '- *Summary**' or '- *John Smith**' possibly followed by extra asterisks or parenthetical
+        m = MD_BULLET_HEADING_RE.match(line)
+        if m:
+            candidate = m.group(1).strip()
+            up = candidate.upper()
+            if up in HEADER_KEYWORDS:
+                cleaned.append(up)
+            else:
+                # Probably name line; keep original capitalization
+                cleaned.append(candidate)
+            continue
+
+        # Strip leading '- ' if it appears to be a malformed heading
+        if line.startswith('- '):
+            after = line[2:].strip()
+            # Remove leading/trailing asterisks from after
+            after = LEADING_STARS_RE.sub('', after)
+            after = TRAILING_STARS_RE.sub('', after)
+            upper_candidate = after.upper()
+            if upper_candidate in HEADER_KEYWORDS and len(after.split()) <= 5:
+                cleaned.append(upper_candidate)
+                continue
+            # Placeholder bullet? skip
+            if _is_placeholder(after):
+                continue
+            # Real bullet if starts with verb or contains digit/percentage/tech token
+            first_word = after.split()[0].lower() if after.split() else ''
+            if first_word in ACTION_VERBS or BULLET_SIGNAL_RE.search(after.lower()):
+                cleaned.append(f"- {after}")
+                continue
+            # Otherwise keep as plain line (maybe part of contact block)
+            cleaned.append(after)
+            continue
+
+        # Remove surrounding markdown asterisks
+        line = LEADING_STARS_RE.sub('', line)
+        line = TRAILING_STARS_RE.sub('', line)
+
+        # Remove bracket placeholders containing guidance
+        for pattern in PLACEHOLDER_BRACKET_RES:
+            line = pattern.sub('', line)
+        line = MULTI_SPACE_RE.sub(' ', line).strip()
+        if not line:
+            continue
+        # Header detection (non-bullet)
+        if (len(line) < 40 and line.upper() in HEADER_KEYWORDS):
+            cleaned.append(line.upper())
+            continue
+        cleaned.append(line)
+
+    # Collapse excess blank lines
+    return "\n".join(_collapse_blank_lines(cleaned)).strip()
+
+def clean_lines_for_pdf(source_lines: List[str]) -> List[str]:
+    """Line-level PDF cleaning: remove leftover asterisks, placeholders, malformed bullets."""
+    lines = []
+    for raw in source_lines:
+        l = raw.strip()
+        if not l:
+            lines.append("")
+            continue
+        # Remove '- *Heading**' patterns
+        l = MD_BULLET_HEADING_RE.sub(r'\1', l)
+        # Remove stray leading '*'
+        l = WRAPPED_STARS_RE.sub(r'\1', l)
+        # Strip placeholder bracket content
+        if PDF_PLACEHOLDER_RE.search(l):
+            continue
+        # Drop any remaining bracketed guidance completely
+        if '[' in l and ']' in l:
+            l = BRACKETED_RE.sub('', l).strip()
+        # Collapse multiple spaces
+        l = MULTI_SPACE_RE.sub(' ', l)
+        lines.append(l)
+    # Ensure first non-empty line not prefixed with '-'
+    for i, val in enumerate(lines):
+        if val and val.startswith('- '):
+            # if likely name/contact (contains @ or digit or |) promote to plain line
+            if any(tok in val.lower() for tok in PDF_CONTACT_TOKENS):
+                lines[i] = val[2:].strip()
+            break
+    # Remove trailing/leading empty lines
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+def clean_for_pdf(text: str) -> str:
+    """Final cleaning for PDF rendering: remove leftover asterisks, placeholders, malformed bullets."""
+    return "\n".join(clean_lines_for_pdf(text.splitlines()))
+
+#############################
+# Final formatting utilities
+#############################
+
+def _polish_bullet(text_line: str) -> str:
+    if not text_line.startswith('- '):
+        text_line = '- ' + text_line.lstrip('- ').strip()
+    body = text_line[2:].strip()
+    if body:
+        if body[0].islower():
+            body = body[0].upper() + body[1:]
+        # Avoid double punctuation
+        if len(body) > 12 and not TERMINAL_PUNCT_RE.search(body):
+            body += '.'
+        # Capitalize sentences after period if needed
+        body = SENTENCE_START_RE.sub(lambda m: m.group(1) + m.group(2).upper(), body)
+    return '- ' + body
+
+def _merge_wrapped_lines(lines: List[str]) -> List[str]:
+    """Merge artificially wrapped lines (no terminal punctuation & next line lowercase)."""
+    merged = []
+    i = 0
+    while i < len(lines):
+        cur = lines[i].rstrip()
+        if cur and not cur.startswith('-') and not cur.endswith(('.', '!', '?')):
+            if i + 1 < len(lines):
+                nxt = lines[i+1].strip()
+                if nxt and not nxt.startswith('- ') and not nxt.isupper() and nxt[0].islower():
+                    cur = cur + ' ' + nxt
+                    i += 1
+                    # continue merging chain
+                    while i + 1 < len(lines):
+                        look = lines[i+1].strip()
+                        if look and not look.startswith('- ') and not look.isupper() and look[0].islower() and not cur.endswith(('.', '!', '?')):
+                            cur = cur + ' ' + look
+                            i += 1
+                        else:
+                            break
+        merged.append(cur)
+        i += 1
+    return merged
+
+def final_format_resume(text: str) -> str:
+    lines = _merge_wrapped_lines([l.rstrip() for l in text.splitlines()])
+    name = ''
+    contact_parts = []
+    idx = 0
+    while idx < len(lines) and not lines[idx].strip():
+        idx += 1
+    if idx < len(lines):
+        name = lines[idx].strip()
+        idx += 1
+    while idx < len(lines):
+        l = lines[idx].strip()
+        if not l:
+            idx += 1
+            break
+        if l.isupper() and 1 < len(l.split()) <= 5:
+            break
+        # Heuristic: treat as contact only if it contains contact token AND not obviously a job/company line
+        is_contact = any(tok in l.lower() for tok in CONTACT_TOKENS)
+        job_pattern = JOB_TITLE_RE.search(l.lower())
+        date_pattern = YEAR_RE.search(l)
+        if is_contact and not (job_pattern and date_pattern):
+            contact_parts.append(l)
+            idx += 1
+            continue
+        # If line looks like start of content (job line), stop contact block
+        break
+    contact_line = ' | '.join([WHITESPACE_RE.sub(' ', c) for c in contact_parts])
+    current = None
+    sections: Dict[str, list] = {}
+
+    while idx < len(lines):
+        raw = lines[idx].strip()
+        idx += 1
+        if not raw:
+            continue
+        if raw.isupper() and raw.upper() in CANONICAL_SECTION_ORDER:
+            current = raw.upper()
+            sections.setdefault(current, [])
+            continue
+        if current is None:
+            current = 'SUMMARY'
+            sections.setdefault(current, [])
+        if current in {'EXPERIENCE','PROJECTS'}:
+            if raw.startswith('• '):
+                raw = '- ' + raw[2:].strip()
+            if not raw.startswith('- '):
+                if DATE_RANGE_RE.search(raw) or ' - ' in raw or '–' in raw:
+                    sections[current].append(raw)
+                else:
+                    sections[current].append(_polish_bullet(raw))
+            else:
+                sections[current].append(_polish_bullet(raw))
+        else:
+            if current == 'SUMMARY':
+                if raw.startswith('- '):
+                    sections[current].append(_polish_bullet(raw))
+                else:
+                    if SUMMARY_VERB_RE.search(raw.lower()) and len(raw.split()) > 3:
+                        sections[current].append(_polish_bullet(raw))
+                    else:
+                        sections[current].append(raw)
+            else:
+                if raw.startswith('- '):
+                    sections[current].append(_polish_bullet(raw))
+                else:
+                    sections[current].append(raw)
+    output = []
+    if name:
+        output.append(name)
+    if contact_line:
+        output.append(contact_line)
+    for sec in CANONICAL_SECTION_ORDER:
+        if sec in sections and sections[sec]:
+            output.append('')
+            output.append(sec)
+            entries = sections[sec]
+            # Consolidate SKILLS / CERTIFICATIONS into single line if multiple non-bullets
+            if sec in {'SKILLS','CERTIFICATIONS'}:
+                non_bullets = [e for e in entries if not e.startswith('- ')]
+                if len(non_bullets) > 1:
+                    combined = ', '.join([LEADING_DASH_RE.sub('', n).rstrip('.') for n in non_bullets])
+                    output.append(combined)
+                    continue
+            output.extend(entries)
+    # collapse blanks
+    cleaned = []
+    prev_blank = False
+    for l in output:
+        if not l:
+            if not prev_blank:
+                cleaned.append('')
+            prev_blank = True
+        else:
+            cleaned.append(l.rstrip())
+            prev_blank = False
+    return '\n'.join(cleaned).strip()
+
+def parse_sections(text: str) -> dict:
+    current = 'GENERAL'
+    sections = {current: []}
+    for line in text.splitlines():
+        l = line.strip()
+        if not l:
+            continue
+        if l.isupper() and 2 <= len(l.split()) <= 5:
+            current = l
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(l)
+    return sections
+
+#############################
+# Parsed resume representation
+#############################
+
+@dataclass(frozen=True)
+class ResumeEntry:
+    """One line under a section: a bullet ('- ...') or a plain text line."""
+    text: str
+
+    @property
+    def is_bullet(self) -> bool:
+        return self.text.startswith('- ')
+
+    @property
+    def body(self) -> str:
+        return self.text[2:] if self.is_bullet else self.text
+
+
+@dataclass
+class ResumeSection:
+    title: str
+    entries: List[ResumeEntry] = field(default_factory=list)
+
+
+@dataclass
+class ResumeView:
+    """Name, contact line and sections in canonical order, as a renderer consumes them."""
+    name: str
+    contact: str
+    sections: List[ResumeSection]
+
+    def to_dict(self) -> dict:
+        """The dict shape returned by parse_structured_lines."""
+        return {
+            'name': self.name,
+            'contact': self.contact,
+            'sections': {s.title: [e.text for e in s.entries] for s in self.sections},
+            'order': [s.title for s in self.sections],
+        }
+
+
+def _parse_view(source_lines: List[str]) -> ResumeView:
+    lines = [l.rstrip() for l in source_lines]
+    name = ''
+    contact = ''
+    idx = 0
+    while idx < len(lines) and not lines[idx].strip():
+        idx += 1
+    if idx < len(lines):
+        name = lines[idx].strip(); idx += 1
+    if idx < len(lines) and ('@' in lines[idx] or ' | ' in lines[idx]):
+        contact = lines[idx].strip(); idx += 1
+    sections: Dict[str, List[ResumeEntry]] = {}
+    current = None
+    for i in range(idx, len(lines)):
+        l = lines[i].strip()
+        if not l:
+            continue
+        if l.isupper() and l in CANONICAL_SECTION_ORDER:
+            current = l
+            sections.setdefault(current, [])
+            continue
+        if current is None:
+            current = 'SUMMARY'; sections.setdefault(current, [])
+        sections[current].append(ResumeEntry(l))
+    ordered = [ResumeSection(s, sections[s]) for s in CANONICAL_SECTION_ORDER if s in sections]
+    return ResumeView(name, contact, ordered)
+
+def parse_structured_lines(text: str) -> dict:
+    return _parse_view(text.splitlines()).to_dict()
+
+
+class ResumeDocument:
+    """A resume formatted once and shared by every renderer and the explainer.
+
+    ``source`` is the content handed to the renderers (the enhanced text, or
+    the original text when AI is unavailable); ``text`` is its final render
+    formatting. The DOCX view is parsed from ``text`` and the PDF view from
+    the PDF-cleaned lines, each at most once.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.text = final_format_resume(source)
+        self.lines = self.text.splitlines()
+
+    @cached_property
+    def view(self) -> ResumeView:
+        return _parse_view(self.lines)
+
+    @cached_property
+    def pdf_lines(self) -> List[str]:
+        return clean_lines_for_pdf(self.lines)
+
+    @cached_property
+    def pdf_view(self) -> ResumeView:
+        return _parse_view(self.pdf_lines)
+
+    @cached_property
+    def loose_sections(self) -> dict:
+        """parse_sections() of the source, used by the deterministic explanation."""
+        return parse_sections(self.source)
+
+
+def build_resume_document(content: Union[str, ResumeDocument]) -> ResumeDocument:
+    """Return ``content`` as a ResumeDocument, formatting it if it is plain text."""
+    if isinstance(content, ResumeDocument):
+        return content
+    return ResumeDocument(content)
+
+
+def document_source(content: Optional[Union[str, ResumeDocument]]) -> str:
+    """Plain text behind ``content``, whether it is a string or a document."""
+    if isinstance(content, ResumeDocument):
+        return content.source
+    return content or ''
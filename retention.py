@@ -0,0 +1,194 @@
+"""
+TTL and disk-quota retention for upload and preview directories
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy:
+    """Files in ``directory`` older than ``ttl_seconds`` are removed, then the
+    oldest remaining files until the directory fits in ``max_bytes``.
+
+    Files younger than ``min_age_seconds`` are never removed, so outputs that
+    are still being written or about to be served survive a quota sweep.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int, min_age_seconds: int = 60):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.min_age_seconds = min_age_seconds
+
+
+class RetentionSweeper:
+    """Apply retention policies periodically on a daemon thread.
+
+    Every gunicorn worker runs a sweeper, but a sweep only proceeds while it
+    holds an exclusive, non-blocking ``flock`` on ``lock_path``; the other
+    workers skip that round.
+    """
+
+    def __init__(self, policies: List[RetentionPolicy], interval: int = 300, lock_path: Optional[str] = None):
+        self.policies = policies
+        self.interval = interval
+        self.lock_path = lock_path
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self.sweeps = 0
+        self.skipped = 0
+        self.removed_expired = 0
+        self.removed_over_quota = 0
+        self.bytes_freed = 0
+        self.last_sweep_at = None
+        self.last_sweep_seconds = None
+
+    def start(self):
+        """Start the sweeper thread once per process (safe to call on every request)."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # A forked worker inherits the attribute but not the thread
+            self._pid = pid
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='retention-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Retention sweep failed: {e}")
+
+    def sweep(self, now: Optional[float] = None) -> bool:
+        """Run one sweep over every policy. Returns False if another process holds the lock."""
+        lock_file = self._acquire()
+        if lock_file is False:
+            with self._lock:
+                self.skipped += 1
+            return False
+        try:
+            start = time.time()
+            now = start if now is None else now
+            for policy in self.policies:
+                self._apply(policy, now)
+            with self._lock:
+                self.sweeps += 1
+                self.last_sweep_at = start
+                self.last_sweep_seconds = round(time.time() - start, 4)
+            return True
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+
+    def stats(self) -> dict:
+        directories = {}
+        for policy in self.policies:
+            files, total = _usage(policy.directory)
+            directories[policy.directory] = {
+                'files': files,
+                'bytes': total,
+                'max_bytes': policy.max_bytes,
+                'ttl_seconds': policy.ttl_seconds,
+            }
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'interval_seconds': self.interval,
+                'sweeps': self.sweeps,
+                'skipped': self.skipped,
+                'removed_expired': self.removed_expired,
+                'removed_over_quota': self.removed_over_quota,
+                'bytes_freed': self.bytes_freed,
+                'last_sweep_at': self.last_sweep_at,
+                'last_sweep_seconds': self.last_sweep_seconds,
+                'directories': directories,
+            }
+
+    def _acquire(self):
+        """Return an open locked file, None when locking is unavailable, or False if busy."""
+        if not self.lock_path or fcntl is None:
+            return None
+        try:
+            lock_file = open(self.lock_path, 'a')
+        except OSError as e:
+            logger.warning(f"Retention lock unavailable ({self.lock_path}): {e}")
+            return None
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        return lock_file
+
+    def _apply(self, policy: RetentionPolicy, now: float):
+        try:
+            entries = []
+            for entry in os.scandir(policy.directory):
+                if not entry.is_file(follow_symlinks=False) or entry.name.startswith('.'):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        kept = []
+        for mtime, size, path in entries:
+            if now - mtime > policy.ttl_seconds and self._remove(path, size):
+                total -= size
+                with self._lock:
+                    self.removed_expired += 1
+            else:
+                kept.append((mtime, size, path))
+        # Oldest first until the directory is back under quota
+        for mtime, size, path in kept:
+            if total <= policy.max_bytes:
+                break
+            if now - mtime < policy.min_age_seconds:
+                break
+            if self._remove(path, size):
+                total -= size
+                with self._lock:
+                    self.removed_over_quota += 1
+
+    def _remove(self, path: str, size: int) -> bool:
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        with self._lock:
+            self.bytes_freed += size
+        return True
+
+
+def _usage(directory: str):
+    files = 0
+    total = 0
+    try:
+        for entry in os.scandir(directory):
+            if entry.is_file(follow_symlinks=False):
+                files += 1
+                total += entry.stat().st_size
+    except OSError:
+        pass
+    return files, total
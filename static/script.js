@@ -10,6 +10,147 @@ document.addEventListener('DOMContentLoaded', () => {
         return;
     }
 
+    const statusText = loadingDiv ? loadingDiv.querySelector('p') : null;
+    const defaultStatus = statusText ? statusText.textContent : '';
+    // Give up rather than spin forever if a job or stream is never completed
+    const MAX_JOB_WAIT_MS = 10 * 60 * 1000;
+    const STREAM_IDLE_MS = 2 * 60 * 1000;
+
+    // Poll a queued job until it finishes; resolves with the job result
+    async function pollJob(statusUrl) {
+        const deadline = Date.now() + MAX_JOB_WAIT_MS;
+        while (true) {
+            if (Date.now() > deadline) {
+                if (statusText) statusText.textContent = defaultStatus;
+                throw new Error('Resume generation is taking too long. Please try again.');
+            }
+            await new Promise(resolve => setTimeout(resolve, 1500));
+            const res = await fetch(statusUrl, { cache: 'no-store' });
+            const job = await res.json();
+            if (!res.ok) {
+                throw new Error(job.error || 'Lost track of the resume job');
+            }
+            if (job.status === 'finished') {
+                if (statusText) statusText.textContent = defaultStatus;
+                return job.result;
+            }
+            if (job.status === 'failed') {
+                if (statusText) statusText.textContent = defaultStatus;
+                throw new Error(job.error || 'Resume generation failed');
+            }
+            if (statusText) {
+                statusText.textContent = job.status === 'queued'
+                    ? '⏳ Waiting for a free slot...'
+                    : defaultStatus;
+            }
+        }
+    }
+
+    // Submit through the background job queue and poll for the result
+    async function submitJob(formData) {
+        const response = await fetch('/generate_resume/async', {
+            method: 'POST',
+            body: formData,
+        });
+
+        console.log('Response status:', response.status);
+
+        const submitted = await response.json();
+        console.log('Job submitted:', submitted);
+
+        if (!response.ok) {
+            throw new Error(submitted.error || 'Server error occurred');
+        }
+
+        return pollJob(submitted.status_url);
+    }
+
+    // reader.read() that rejects when the server sends nothing for STREAM_IDLE_MS
+    async function readWithTimeout(reader) {
+        let timer;
+        const idle = new Promise((_, reject) => {
+            timer = setTimeout(() => reject(new Error('The server stopped responding. Please try again.')), STREAM_IDLE_MS);
+        });
+        try {
+            return await Promise.race([reader.read(), idle]);
+        } finally {
+            clearTimeout(timer);
+        }
+    }
+
+    // Stream the enhanced text as it is generated (Server-Sent Events over fetch).
+    // Rejects with error.fallback = true when the caller should use the job queue.
+    async function streamResume(formData) {
+        const unavailable = (message) => Object.assign(new Error(message), { fallback: true });
+        if (!window.ReadableStream || !window.TextDecoder) {
+            throw unavailable('Streaming not supported by this browser');
+        }
+
+        let response;
+        try {
+            response = await fetch('/generate_resume/stream', { method: 'POST', body: formData });
+        } catch (networkError) {
+            throw unavailable(networkError.message);
+        }
+        if (response.status === 400 || response.status === 429 || response.status === 503) {
+            const body = await response.json();
+            const retry = body.retry_after ? ` (retry in ${body.retry_after}s)` : '';
+            throw new Error((body.error || 'Invalid request') + retry);
+        }
+        if (!response.ok || !response.body) {
+            throw unavailable(`Stream request failed (${response.status})`);
+        }
+
+        let preview = loadingDiv.querySelector('pre.stream-preview');
+        if (!preview) {
+            preview = document.createElement('pre');
+            preview.className = 'stream-preview';
+            preview.style.cssText = 'text-align: left; white-space: pre-wrap; max-height: 320px; overflow-y: auto; background: #f8f9fa; border: 1px solid #e9ecef; border-radius: 6px; padding: 12px; font-size: 13px;';
+            loadingDiv.appendChild(preview);
+        }
+        preview.textContent = '';
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        try {
+            while (true) {
+                const { value, done } = await readWithTimeout(reader);
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const raw = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+                    let event = 'message';
+                    let payload = '';
+                    raw.split('\n').forEach(line => {
+                        if (line.startsWith('event:')) event = line.slice(6).trim();
+                        else if (line.startsWith('data:')) payload += line.slice(5).trim();
+                    });
+                    const data = payload ? JSON.parse(payload) : {};
+                    if (event === 'status' && statusText) {
+                        statusText.textContent = data.stage === 'rendering' ? '📄 Building your documents...' : defaultStatus;
+                    } else if (event === 'delta') {
+                        preview.textContent += data.text;
+                        preview.scrollTop = preview.scrollHeight;
+                    } else if (event === 'formatted') {
+                        preview.textContent = data.text;
+                    } else if (event === 'error') {
+                        throw new Error(data.error || 'Resume generation failed');
+                    } else if (event === 'result') {
+                        return data;
+                    }
+                }
+            }
+        } finally {
+            if (statusText) statusText.textContent = defaultStatus;
+            preview.remove();
+            reader.cancel().catch(() => {});
+        }
+        throw new Error('Connection closed before the resume was ready');
+    }
+
     form.addEventListener('submit', async (e) => {
         e.preventDefault();
 
@@ -44,20 +185,16 @@ document.addEventListener('DOMContentLoaded', () => {
             formData.append('format', format);
 
             console.log('Submitting form data...');
-            
-            const response = await fetch('/generate_resume', {
-                method: 'POST',
-                body: formData,
-            });
 
-            console.log('Response status:', response.status);
-            
-            const data = await response.json();
-            console.log('Response data:', data);
-
-            if (!response.ok) {
-                throw new Error(data.error || 'Server error occurred');
+            let data;
+            try {
+                data = await streamResume(formData);
+            } catch (streamError) {
+                if (!streamError.fallback) throw streamError;
+                console.log('Streaming unavailable, queueing job:', streamError.message);
+                data = await submitJob(formData);
             }
+            console.log('Response data:', data);
 
             if (!data.success) {
                 throw new Error(data.error || 'Resume generation failed');
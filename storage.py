@@ -0,0 +1,165 @@
+"""
+Where generated artifacts live: the local previews directory or an S3-compatible bucket
+"""
+
+import importlib.util
+import logging
+import mimetypes
+import os
+import shutil
+import threading
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('local', 's3')
+MISSING_CODES = ('404', 'NoSuchKey', 'NotFound')
+
+
+def _content_type(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+class LocalStorage:
+    """Artifacts stay in the directory they are rendered into.
+
+    Only correct for a single instance (or a shared volume); files are
+    served by the app itself or its front proxy.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def publish(self, local_path: str):
+        """Make a rendered file available under its base name."""
+        target = self.path(os.path.basename(local_path))
+        if os.path.abspath(local_path) != os.path.abspath(target):
+            tmp = f"{target}.{os.getpid()}.tmp"
+            shutil.copyfile(local_path, tmp)
+            os.replace(tmp, target)
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self.path(name))
+
+    def open(self, name: str) -> BinaryIO:
+        return open(self.path(name), 'rb')
+
+    def presigned_url(self, name: str, as_attachment: bool = False) -> Optional[str]:
+        """None: local files are served directly, not through a redirect."""
+        return None
+
+    def stats(self) -> dict:
+        return {'backend': 'local', 'directory': self.directory}
+
+
+class S3Storage:
+    """Artifacts in an S3-compatible bucket (AWS S3, MinIO, R2, ...).
+
+    Uploads stream from the rendered file (multipart for large ones) and
+    downloads are presigned GET URLs, so any instance can serve any artifact
+    without proxying its bytes. The local copy is only a cache pruned by the
+    retention sweeper; expire objects with a bucket lifecycle rule.
+    Requires ``boto3`` unless a client is passed in.
+    """
+
+    def __init__(self, bucket: str, prefix: str = '', client=None, endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None, url_expiry: int = 3600, cache_control: Optional[str] = None):
+        if not bucket:
+            raise ValueError("S3 artifact storage needs a bucket name")
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.url_expiry = url_expiry
+        self.cache_control = cache_control
+        self._client = client
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.upload_errors = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import boto3
+                    self._client = boto3.client('s3', endpoint_url=self.endpoint_url, region_name=self.region)
+        return self._client
+
+    def key(self, name: str) -> str:
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def publish(self, local_path: str):
+        name = os.path.basename(local_path)
+        extra = {'ContentType': _content_type(name)}
+        if self.cache_control:
+            extra['CacheControl'] = self.cache_control
+        try:
+            self.client.upload_file(local_path, self.bucket, self.key(name), ExtraArgs=extra)
+        except Exception:
+            with self._lock:
+                self.upload_errors += 1
+            raise
+        with self._lock:
+            self.uploads += 1
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(name))
+        except Exception as e:
+            if _error_code(e) in MISSING_CODES:
+                return False
+            raise
+        return True
+
+    def open(self, name: str) -> BinaryIO:
+        """Streaming body of the object; FileNotFoundError if it is missing."""
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.key(name))['Body']
+        except Exception as e:
+            if _error_code(e) in MISSING_CODES:
+                raise FileNotFoundError(name) from e
+            raise
+
+    def presigned_url(self, name: str, as_attachment: bool = False) -> Optional[str]:
+        params = {'Bucket': self.bucket, 'Key': self.key(name)}
+        if as_attachment:
+            params['ResponseContentDisposition'] = f'attachment; filename="{name}"'
+        return self.client.generate_presigned_url('get_object', Params=params, ExpiresIn=self.url_expiry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'backend': 's3',
+                'bucket': self.bucket,
+                'prefix': self.prefix,
+                'endpoint_url': self.endpoint_url,
+                'uploads': self.uploads,
+                'upload_errors': self.upload_errors,
+            }
+
+
+def _error_code(exc: Exception) -> Optional[str]:
+    # botocore's ClientError carries the S3 error code in .response
+    response = getattr(exc, 'response', None) or {}
+    return str(response.get('Error', {}).get('Code')) if response else None
+
+
+def build_storage(backend: str, directory: str, **s3_options):
+    """Artifact storage for ``backend`` ('local' or 's3')."""
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown ARTIFACT_STORAGE {backend!r}; expected one of {', '.join(BACKENDS)}")
+    if backend == 'local':
+        return LocalStorage(directory)
+    storage = S3Storage(**s3_options)
+    # boto3 is optional and imported on first use; fail at startup, not on
+    # the first upload, when it is missing
+    if storage._client is None and importlib.util.find_spec('boto3') is None:
+        raise ImportError("ARTIFACT_STORAGE=s3 needs boto3: pip install boto3")
+    logger.info(f"Storing artifacts in s3://{storage.bucket}/{storage.prefix}")
+    return storage
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import time
+
+from analytics_store import AnalyticsStore
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_increments_are_buffered_until_flush(tmp_path):
+    store = AnalyticsStore(str(tmp_path / 'analytics.db'))
+    for _ in range(3):
+        store.incr('page_views')
+    store.incr('resumes_generated')
+    assert store.stats()['pending_increments'] == 4
+    assert AnalyticsStore(str(tmp_path / 'analytics.db')).totals() == {}
+    # This process still sees its own unflushed increments
+    assert store.totals() == {'page_views': 3, 'resumes_generated': 1}
+    store.flush()
+    assert store.stats()['pending_increments'] == 0
+    assert AnalyticsStore(str(tmp_path / 'analytics.db')).totals() == {'page_views': 3, 'resumes_generated': 1}
+
+
+def test_totals_and_daily_rollups_span_processes(tmp_path):
+    path = str(tmp_path / 'analytics.db')
+    worker = ("import sys\nfrom analytics_store import AnalyticsStore\n"
+              "s = AnalyticsStore(sys.argv[1])\n"
+              "[s.incr('resumes_generated') for _ in range(5)]\n"
+              "s.flush()\n")
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', worker, path], cwd=REPO_ROOT, check=True)
+    store = AnalyticsStore(path)
+    with store._lock:
+        store._pending[('2020-01-01', 'resumes_generated')] += 7
+    store.flush()
+    assert store.totals() == {'resumes_generated': 17}
+    daily = store.daily(days=7)
+    assert len(daily) == 1 and daily[0]['resumes_generated'] == 10
+    assert store.daily(days=3, today='2020-01-02') == [{'date': '2020-01-01', 'resumes_generated': 7}]
+
+
+def test_flusher_wakes_at_threshold(tmp_path):
+    store = AnalyticsStore(str(tmp_path / 'analytics.db'), flush_interval=60, flush_threshold=5)
+    store.start()
+    for _ in range(5):
+        store.incr('page_views')
+    deadline = time.time() + 5
+    while store.stats()['flushes'] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.stats()['flushes'] == 1
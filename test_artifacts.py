@@ -0,0 +1,53 @@
+import os
+
+import app
+
+BODY = b'%PDF-1.4 ' + bytes(range(256)) * 8
+
+
+def write_artifact(directory, name='abc_enhanced_resume.pdf'):
+    with open(os.path.join(directory, name), 'wb') as f:
+        f.write(BODY)
+    return name
+
+
+def test_etag_304_and_immutable_caching(previews):
+    name = write_artifact(previews)
+    client = app.app.test_client()
+    resp = client.get(f'/preview/{name}')
+    assert resp.status_code == 200 and resp.data == BODY
+    etag = resp.headers['ETag']
+    assert not etag.startswith('W/')
+    cache_control = resp.headers['Cache-Control']
+    assert 'immutable' in cache_control and 'private' in cache_control and 'public' not in cache_control
+    assert f'max-age={app.ARTIFACT_MAX_AGE}' in cache_control
+    again = client.get(f'/download/{name}', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b''
+
+
+def test_byte_ranges(previews):
+    name = write_artifact(previews)
+    client = app.app.test_client()
+    resp = client.get(f'/preview/{name}', headers={'Range': 'bytes=10-19'})
+    assert resp.status_code == 206 and resp.data == BODY[10:20]
+    assert resp.headers['Content-Range'] == f'bytes 10-19/{len(BODY)}'
+    assert client.get(f'/preview/{name}', headers={'Range': f'bytes={len(BODY) + 5}-'}).status_code == 416
+    assert client.get('/preview/..').status_code == 404
+    assert client.get('/download/missing.pdf').status_code == 404
+
+
+def test_proxy_offload_modes(previews, monkeypatch):
+    name = write_artifact(previews)
+    client = app.app.test_client()
+    monkeypatch.setattr(app, 'ARTIFACT_SENDFILE', 'x-accel')
+    resp = client.get(f'/download/{name}')
+    assert resp.status_code == 200 and resp.data == b''
+    assert resp.headers['X-Accel-Redirect'] == f'/_artifacts/{name}'
+    assert resp.headers['Content-Type'] == 'application/pdf'
+    assert resp.headers['Content-Disposition'] == f'attachment; filename="{name}"'
+    assert client.get(f'/download/{name}', headers={'If-None-Match': resp.headers['ETag']}).status_code == 304
+
+    monkeypatch.setattr(app, 'ARTIFACT_SENDFILE', 'x-sendfile')
+    resp = client.get(f'/preview/{name}')
+    assert resp.headers['X-Sendfile'] == os.path.abspath(os.path.join(previews, name))
+    assert 'Content-Disposition' not in resp.headers and 'immutable' in resp.headers['Cache-Control']
@@ -0,0 +1,66 @@
+import io
+import json
+import threading
+import time
+import zipfile
+
+import app
+from caches import SQLiteCache
+from model_backends import FakeModel
+
+
+def test_batch_extracts_once_and_fans_out(previews, upload_copies, monkeypatch, tmp_path, sample_pdf):
+    monkeypatch.setattr(app, 'model', FakeModel(latency_ms=0))
+    monkeypatch.setattr(app, 'ai_response_cache', SQLiteCache(str(tmp_path / 'ai.db')))
+    extractions = []
+    real_extract = app.extract_resume_text
+    monkeypatch.setattr(app, 'extract_resume_text', lambda p: extractions.append(p) or real_extract(p))
+    fetched = []
+    lock = threading.Lock()
+
+    def fake_fetch(url):
+        with lock:
+            fetched.append(url)
+        time.sleep(0.05)
+        return f'Posting at {url}: Python, PostgreSQL, AWS.'
+    monkeypatch.setattr(app, 'fetch_job_content', fake_fetch)
+
+    jobs = ['https://jobs.example.com/a', 'Backend engineer, Python and Go', 'https://jobs.example.com/b']
+    with open(sample_pdf, 'rb') as f:
+        resp = app.app.test_client().post('/generate_resume/batch', data={
+            'resume_file': (f, 'resume.pdf'),
+            'job_descriptions': json.dumps(jobs),
+            'format': 'docx',
+        }, content_type='multipart/form-data')
+    assert resp.status_code == 202
+    job_id = resp.get_json()['job_id']
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        record = app.job_queue.get(job_id)
+        if record['status'] in ('finished', 'failed'):
+            break
+        time.sleep(0.05)
+    assert record['status'] == 'finished', record
+    manifest = record['result']
+    assert len(extractions) == 1
+    assert sorted(fetched) == ['https://jobs.example.com/a', 'https://jobs.example.com/b']
+    assert manifest['count'] == manifest['succeeded'] == 3
+    assert [item['index'] for item in manifest['items']] == [0, 1, 2]
+    assert manifest['items'][0]['job_url'] == 'https://jobs.example.com/a'
+    assert upload_copies() == []
+
+    zip_resp = app.app.test_client().get(manifest['zip_url'])
+    names = zipfile.ZipFile(io.BytesIO(zip_resp.data)).namelist()
+    assert names == ['01_jobs-example-com-a.pdf', '01_jobs-example-com-a.docx',
+                     '02_backend-engineer-python-and-go.pdf', '02_backend-engineer-python-and-go.docx',
+                     '03_jobs-example-com-b.pdf', '03_jobs-example-com-b.docx']
+
+
+def test_batch_rejects_bad_job_lists(previews, sample_pdf):
+    client = app.app.test_client()
+    for jobs in ('[1, 2]', '[]', json.dumps(['x'] * (app.BATCH_MAX_JOBS + 1))):
+        with open(sample_pdf, 'rb') as f:
+            resp = client.post('/generate_resume/batch', data={'resume_file': (f, 'resume.pdf'), 'job_descriptions': jobs},
+                               content_type='multipart/form-data')
+        assert resp.status_code == 400
@@ -0,0 +1,94 @@
+import hashlib
+import os
+
+from caches import ContentCache, LRUCache, SQLiteCache
+
+
+def digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', '1')
+    cache.set('b', '2')
+    assert cache.get('a') == '1'
+    cache.set('c', '3')
+    assert cache.get('b') is None
+    assert cache.get('a') == '1'
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 1
+
+
+def test_lru_respects_byte_limit():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set('a', 'x' * 6)
+    cache.set('b', 'y' * 6)
+    assert cache.get('a') is None
+    assert cache.get('b') == 'y' * 6
+
+
+def test_content_cache_survives_new_process(tmp_path):
+    key = digest('resume')
+    ContentCache(str(tmp_path)).set(key, 'John Smith')
+    fresh = ContentCache(str(tmp_path))
+    assert fresh.get(key) == 'John Smith'
+    assert fresh.get(key) == 'John Smith'
+    stats = fresh.stats()
+    assert stats['disk_hits'] == 1
+    assert stats['memory']['hits'] == 1
+
+
+def test_content_cache_disk_quota(tmp_path):
+    cache = ContentCache(str(tmp_path), max_entries=1, max_disk_bytes=25)
+    keys = [digest(str(i)) for i in range(3)]
+    for k in keys:
+        cache.set(k, 'z' * 10)
+    assert len(os.listdir(tmp_path)) == 2
+    assert cache.stats()['disk_evictions'] == 1
+
+
+def test_content_cache_tracks_disk_usage_without_rescanning(tmp_path):
+    cache = ContentCache(str(tmp_path), max_disk_bytes=10 ** 6)
+    for i in range(150):
+        cache.set(digest(str(i)), 'z' * 10)
+    cache.set(digest('0'), 'z' * 20)  # replacing an entry counts only the difference
+    stats = cache.stats()
+    assert stats['disk_bytes'] == 150 * 10 + 10
+    # The first write and one periodic rescan, not one scan per write
+    assert stats['disk_scans'] == 2
+
+
+def test_content_cache_rejects_non_digest_keys(tmp_path):
+    cache = ContentCache(str(tmp_path))
+    cache.set('../escape', 'nope')
+    assert cache.get('../escape') is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_sqlite_cache_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'ai.db')
+    SQLiteCache(path).set('k', 'enhanced text')
+    other = SQLiteCache(path)
+    assert other.get('k') == 'enhanced text'
+    assert other.get('missing') is None
+    assert other.stats()['hits'] == 1 and other.stats()['misses'] == 1
+
+
+def test_sqlite_cache_ttl_expiry(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'ai.db'), ttl=60)
+    cache.set('fresh', 'a')
+    cache.set('stale', 'b', ttl=-1)
+    assert cache.get('fresh') == 'a'
+    assert cache.get('stale') is None
+
+
+def test_sqlite_cache_evicts_oldest_beyond_limit(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'ai.db'), max_entries=2)
+    for i in range(4):
+        cache.set(f'k{i}', str(i))
+    cache.evict()
+    assert cache.get('k0') is None and cache.get('k1') is None
+    assert cache.get('k3') == '3'
+    assert cache.stats()['entries'] == 2
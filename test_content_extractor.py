@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+import content_extractor
+from content_extractor import extract_main_text, register_site_selectors, SITE_SELECTORS
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'fixtures')
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+@pytest.fixture(params=['lxml', 'soup'])
+def parser_mode(request, monkeypatch):
+    if request.param == 'soup':
+        monkeypatch.setattr(content_extractor, 'lxml', None)
+        monkeypatch.setattr(content_extractor, 'HTML_PARSER', 'html.parser')
+    return request.param
+
+
+def test_generic_page_picks_description_not_navigation(parser_mode):
+    text = extract_main_text(load('generic_posting.html'), 'https://careers.initech.example/jobs/3')
+    assert text.startswith('Initech is looking for a Backend Developer')
+    assert 'Mentor junior engineers' in text
+    assert 'Category 12' not in text
+    assert 'Copyright' not in text
+
+
+def test_job_card_rail_does_not_outscore_description(parser_mode):
+    cards = ''.join(
+        f'<div class="card"><div><a href="/j/{i}">Engineer {i}</a></div>'
+        f'<div class="snippet">Join a growing team building reliable services.</div></div>'
+        for i in range(300)
+    )
+    html = load('generic_posting.html').replace('</body>', f'<div class="rail">{cards}</div></body>')
+    text = extract_main_text(html, 'https://board.example/view/1')
+    assert 'Backend Developer' in text
+    assert 'growing team' not in text
+
+
+def test_site_selector_registry(parser_mode):
+    text = extract_main_text(load('greenhouse_posting.html'), 'https://boards.greenhouse.io/acme/jobs/1')
+    assert text.startswith('Acme builds hiring software')
+    assert 'Privacy' not in text
+
+
+def test_register_rejects_complex_selectors(monkeypatch):
+    monkeypatch.setattr(content_extractor, 'SITE_SELECTORS', dict(SITE_SELECTORS))
+    register_site_selectors('example.org', 'div.job-description')
+    with pytest.raises(ValueError):
+        register_site_selectors('example.org', 'div > p')
+
+
+def test_empty_and_short_pages():
+    assert extract_main_text('', 'https://x.example') == ''
+    assert extract_main_text('<html><body><p>Short page</p></body></html>') == 'Short page'
@@ -0,0 +1,56 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import app
+from caches import SQLiteCache
+
+POSTING = '<html><body><div id="content">' + ' '.join(['Python Flask engineer'] * 30) + '</div></body></html>'
+
+
+class PostingHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        PostingHandler.hits.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = POSTING.encode()
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def posting_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'job_content_cache', SQLiteCache(str(tmp_path / 'jobs.db')))
+    PostingHandler.hits = []
+    server = HTTPServer(('127.0.0.1', 0), PostingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/jobs/1'
+    server.shutdown()
+
+
+def test_fresh_entry_skips_network(posting_url, monkeypatch):
+    first = app.fetch_job_content(posting_url)
+    assert 'Python Flask engineer' in first
+    monkeypatch.setattr(app, 'extract_job_text', lambda html, url: pytest.fail('reparsed'))
+    assert app.fetch_job_content(posting_url) == first
+    assert len(PostingHandler.hits) == 1
+
+
+def test_stale_entry_revalidates_with_etag(posting_url, monkeypatch):
+    first = app.fetch_job_content(posting_url)
+    monkeypatch.setattr(app, 'JOB_FETCH_FRESH_SECONDS', 0)
+    monkeypatch.setattr(app, 'extract_job_text', lambda html, url: pytest.fail('reparsed'))
+    assert app.fetch_job_content(posting_url) == first
+    assert PostingHandler.hits == [None, '"v1"']
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from job_queue import JobQueue, QueueFull
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        record = queue.get(job_id)
+        if record and record['status'] in ('finished', 'failed'):
+            return record
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_result_is_persisted(tmp_path):
+    queue = JobQueue(str(tmp_path), max_workers=1, max_pending=4)
+    job_id = queue.submit(lambda a, b: {'sum': a + b}, 2, 3)
+    record = wait_for(queue, job_id)
+    assert record['status'] == 'finished'
+    assert record['result'] == {'sum': 5}
+    assert record['queue_wait_seconds'] >= 0
+    # A second queue on the same directory (another worker) sees the job too
+    assert JobQueue(str(tmp_path)).get(job_id)['status'] == 'finished'
+
+
+def test_failed_job_records_error(tmp_path):
+    queue = JobQueue(str(tmp_path), max_workers=1, max_pending=4)
+
+    def boom():
+        raise ValueError('bad pdf')
+
+    record = wait_for(queue, queue.submit(boom))
+    assert record['status'] == 'failed'
+    assert 'bad pdf' in record['error']
+    assert queue.stats()['failed'] == 1
+
+
+def test_queue_rejects_when_full(tmp_path):
+    queue = JobQueue(str(tmp_path), max_workers=1, max_pending=1)
+    release = threading.Event()
+    first = queue.submit(release.wait)
+    deadline = time.time() + 5
+    while queue.get(first)['status'] != 'running' and time.time() < deadline:
+        time.sleep(0.01)
+    queue.submit(release.wait)
+    with pytest.raises(QueueFull) as exc:
+        queue.submit(release.wait)
+    assert exc.value.retry_after >= 1
+    assert queue.stats()['queue_depth'] == 1
+    release.set()
+
+
+def test_unknown_or_malformed_job_id(tmp_path):
+    queue = JobQueue(str(tmp_path))
+    assert queue.get('0' * 32) is None
+    assert queue.get('../etc/passwd') is None
+
+
+def test_job_abandoned_by_dead_worker_is_failed(tmp_path):
+    import json
+    import subprocess
+    import sys
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    queue = JobQueue(str(tmp_path), stale_after=60)
+    old = time.time() - 120
+    for job_id, status in (('a' * 32, 'queued'), ('b' * 32, 'running')):
+        with open(tmp_path / f'{job_id}.json', 'w') as f:
+            json.dump({'job_id': job_id, 'status': status, 'created_at': old, 'started_at': old,
+                       'owner_pid': dead.pid}, f)
+        record = queue.get(job_id)
+        assert record['status'] == 'failed' and 'restarted' in record['error']
+        assert JobQueue(str(tmp_path)).get(job_id)['status'] == 'failed'
+
+
+def test_live_jobs_are_not_failed(tmp_path):
+    queue = JobQueue(str(tmp_path), max_workers=1, max_pending=4, stale_after=0)
+    release = threading.Event()
+    job_id = queue.submit(release.wait)
+    # Another worker sees an old unfinished record, but its owner is alive
+    assert JobQueue(str(tmp_path), stale_after=0).get(job_id)['status'] in ('queued', 'running')
+    assert queue.get(job_id)['status'] in ('queued', 'running')
+    release.set()
+    assert wait_for(queue, job_id)['status'] == 'finished'
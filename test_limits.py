@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+import pytest
+
+import app
+from limits import ConcurrencyLimiter, Overloaded, TokenBucketLimiter
+from model_backends import FakeModel
+
+
+def hold_slots(limiter, count):
+    """Occupy ``count`` slots until the returned event is set."""
+    release = threading.Event()
+    entered = threading.Barrier(count + 1, timeout=5)
+
+    def holder():
+        with limiter.slot():
+            entered.wait()
+            release.wait()
+
+    for _ in range(count):
+        threading.Thread(target=holder, daemon=True).start()
+    entered.wait()
+    return release
+
+
+def test_waiter_is_admitted_when_a_slot_frees():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=1, wait_timeout=5)
+    release = hold_slots(limiter, 1)
+    threading.Timer(0.05, release.set).start()
+    with limiter.slot():
+        assert limiter.stats()['active'] == 1
+    assert limiter.stats()['admitted'] == 2
+
+
+def test_rejects_beyond_wait_queue_and_times_out():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=0, wait_timeout=0.05)
+    release = hold_slots(limiter, 1)
+    try:
+        with pytest.raises(Overloaded) as exc:
+            limiter.check()
+        assert exc.value.retry_after >= 1
+        with pytest.raises(Overloaded):
+            with limiter.slot():
+                pass
+        limiter.max_waiting = 1
+        start = time.monotonic()
+        with pytest.raises(Overloaded):
+            with limiter.slot():
+                pass
+        assert time.monotonic() - start >= 0.05
+        assert limiter.stats()['rejected'] == 2 and limiter.stats()['timed_out'] == 1
+    finally:
+        release.set()
+
+
+def test_saturated_gemini_returns_fast_503(previews, monkeypatch, sample_pdf):
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=0)
+    monkeypatch.setattr(app, 'gemini_limiter', limiter)
+    monkeypatch.setattr(app, 'model', FakeModel(latency_ms=0))
+    release = hold_slots(limiter, 1)
+    try:
+        with open(sample_pdf, 'rb') as f:
+            resp = app.app.test_client().post('/generate_resume', data={
+                'resume_file': (f, 'resume.pdf'),
+                'job_description': 'Python developer',
+            }, content_type='multipart/form-data')
+        assert resp.status_code == 503
+        assert int(resp.headers['Retry-After']) >= 1
+    finally:
+        release.set()
+
+
+def test_explanation_falls_back_when_overloaded(monkeypatch):
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=0)
+    monkeypatch.setattr(app, 'gemini_limiter', limiter)
+    monkeypatch.setattr(app, 'model', FakeModel(latency_ms=0))
+    release = hold_slots(limiter, 1)
+    try:
+        explanation = app._generate_explanation('ORIGINAL', 'SKILLS\nPython', 'Python developer overload-test')
+    finally:
+        release.set()
+    assert explanation == app.build_deterministic_explanation('ORIGINAL', 'SKILLS\nPython', 'Python developer overload-test')
+
+
+@pytest.mark.parametrize('shared', [False, True])
+def test_token_bucket_allows_burst_then_refills(tmp_path, shared):
+    path = str(tmp_path / 'buckets.db') if shared else None
+    limiter = TokenBucketLimiter(rate=0.5, burst=2, path=path)
+    assert limiter.acquire('1.2.3.4', now=100.0) is None
+    assert limiter.acquire('1.2.3.4', now=100.0) is None
+    assert limiter.acquire('1.2.3.4', now=100.0) == 2
+    assert limiter.acquire('5.6.7.8', now=100.0) is None
+    assert limiter.acquire('1.2.3.4', now=102.0) is None
+    if shared:
+        # A second worker sees the same, now empty, bucket
+        assert TokenBucketLimiter(rate=0.5, burst=2, path=path).acquire('1.2.3.4', now=102.0) == 2
+
+
+@pytest.mark.parametrize('shared', [False, True])
+def test_charge_puts_bucket_in_debt(tmp_path, shared):
+    limiter = TokenBucketLimiter(rate=1.0, burst=3, path=str(tmp_path / 'buckets.db') if shared else None)
+    assert limiter.acquire('1.2.3.4', now=100.0) is None
+    limiter.charge('1.2.3.4', 9, now=100.0)  # a 10-job batch from a full bucket
+    assert limiter.acquire('1.2.3.4', now=100.0) == 8
+    assert limiter.acquire('1.2.3.4', now=107.5) == 1
+    assert limiter.acquire('1.2.3.4', now=108.0) is None
+
+
+def test_rate_limited_client_is_rejected_before_upload_is_read(previews, upload_copies, monkeypatch, sample_pdf):
+    monkeypatch.setattr(app, 'rate_limiter', TokenBucketLimiter(rate=0.01, burst=1))
+    client = app.app.test_client()
+    headers = {'X-Forwarded-For': '203.0.113.9'}
+    assert client.post('/generate_resume', data={}, headers=headers).status_code == 400
+    with open(sample_pdf, 'rb') as f:
+        resp = client.post('/generate_resume', data={'resume_file': (f, 'resume.pdf'), 'job_description': 'x'},
+                           headers=headers, content_type='multipart/form-data')
+    assert resp.status_code == 429 and int(resp.headers['Retry-After']) >= 1
+    assert os.listdir(previews) == [] and upload_copies() == []
+    # Other clients keep their own bucket
+    assert client.post('/generate_resume', data={}, headers={'X-Forwarded-For': '198.51.100.1'}).status_code == 400
+
+
+def test_batch_is_charged_per_job(previews, monkeypatch, sample_pdf):
+    monkeypatch.setattr(app, 'rate_limiter', TokenBucketLimiter(rate=0.01, burst=3))
+    monkeypatch.setattr(app, 'job_queue', type('Queue', (), {'submit': lambda self, *a: 'job-1'})())
+    client = app.app.test_client()
+    headers = {'X-Forwarded-For': '203.0.113.20'}
+    with open(sample_pdf, 'rb') as f:
+        resp = client.post('/generate_resume/batch', data={
+            'resume_file': (f, 'resume.pdf'),
+            'job_descriptions': ['Python developer', 'Go developer', 'Data engineer'],
+        }, headers=headers, content_type='multipart/form-data')
+    assert resp.status_code == 202
+    assert client.post('/generate_resume', data={}, headers=headers).status_code == 429
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import app
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_metrics_endpoint_reports_stages_and_fallbacks(previews, sample_pdf):
+    app.process_resume_with_ai(sample_pdf, 'Python developer', 'docx')
+    body = app.app.test_client().get('/metrics').get_data(as_text=True)
+    assert 'resume_stage_duration_seconds_bucket{le="0.005",stage="render_pdf"}' in body
+    assert 'resume_stage_duration_seconds_count{stage="render_docx"}' in body
+    assert 'resume_fallbacks_total{reason="ai_disabled"}' in body
+
+
+def test_samples_from_every_worker_are_aggregated(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    worker = ("import metrics\n"
+              "with metrics.observe_stage('render_pdf'): pass\n"
+              "metrics.record_fallback('copy_original')\n")
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', worker], cwd=REPO_ROOT, env=env, check=True)
+    scrape = subprocess.run([sys.executable, '-c', "import metrics; print(metrics.render_metrics()[0].decode())"],
+                            cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True).stdout
+    assert 'resume_stage_duration_seconds_count{stage="render_pdf"} 2.0' in scrape
+    assert 'resume_fallbacks_total{reason="copy_original"} 2.0' in scrape
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import app
+from model_backends import FakeModel, FakeModelError, LazyGeminiModel, load_model
+
+
+def test_fake_model_echoes_resume_from_prompt():
+    fake = FakeModel(latency_ms=0)
+    prompt, _ = app.build_enhance_prompt('JANE DOE\nSKILLS\nPython', 'Backend role')
+    assert fake.generate_content(prompt).text == 'JANE DOE\nSKILLS\nPython'
+    chunks = [c.text for c in fake.generate_content(prompt, stream=True)]
+    assert len(chunks) > 1 and ''.join(chunks) == 'JANE DOE\nSKILLS\nPython'
+
+
+def test_fake_model_canned_outputs_and_errors():
+    fake = FakeModel(latency_ms=0, outputs={'enhance': 'CANNED'}, error_rate=0.5, seed=7)
+    outcomes = []
+    for _ in range(200):
+        try:
+            outcomes.append(fake.generate_content('ORIGINAL RESUME (trimmed):\nx\n---').text)
+        except FakeModelError:
+            outcomes.append(None)
+    assert set(outcomes) == {'CANNED', None}
+    assert 60 < fake.errors < 140 and fake.calls == 200
+
+
+def test_load_model_backends():
+    assert load_model('none', 'gemini-1.5-flash') is None
+    assert load_model('gemini', 'gemini-1.5-flash', api_key=None) is None
+    assert isinstance(load_model('fake', 'gemini-1.5-flash'), FakeModel)
+    lazy = load_model('gemini', 'gemini-1.5-flash', api_key='test-key')
+    assert isinstance(lazy, LazyGeminiModel) and lazy._model is None
+    with pytest.raises(ValueError):
+        load_model('openai', 'gpt')
+
+
+def test_pipeline_runs_end_to_end_on_fake_model(previews, monkeypatch, tmp_path, sample_pdf):
+    from caches import SQLiteCache
+    monkeypatch.setattr(app, 'model', FakeModel(latency_ms=0))
+    monkeypatch.setattr(app, 'ai_response_cache', SQLiteCache(str(tmp_path / 'ai.db')))
+    path, explanation, extra = app.process_resume_with_ai(sample_pdf, 'Python developer', 'pdf')
+    assert path.endswith('_enhanced_resume.pdf')
+    assert explanation.startswith('• **SUMMARY:**')
+
+
+def test_single_call_mode_makes_one_model_call(previews, monkeypatch, tmp_path, sample_pdf):
+    from caches import SQLiteCache
+    fake = FakeModel(latency_ms=0)
+    monkeypatch.setattr(app, 'model', fake)
+    monkeypatch.setattr(app, 'AI_SINGLE_CALL', True)
+    monkeypatch.setattr(app, 'ai_response_cache', SQLiteCache(str(tmp_path / 'ai.db')))
+    path, explanation, extra = app.process_resume_with_ai(sample_pdf, 'Python developer', 'pdf')
+    assert path.endswith('_enhanced_resume.pdf')
+    assert explanation.startswith('• **SUMMARY:**')
+    assert fake.calls == 1
+
+
+def test_single_call_malformed_explanation_falls_back(previews, monkeypatch, tmp_path, sample_pdf):
+    from caches import SQLiteCache
+    combined = json.dumps({'resume': 'JANE DOE\nSKILLS\n- Python', 'explanation': 'ok'})
+    fake = FakeModel(latency_ms=0, outputs={'combined': combined})
+    monkeypatch.setattr(app, 'model', fake)
+    monkeypatch.setattr(app, 'AI_SINGLE_CALL', True)
+    monkeypatch.setattr(app, 'ai_response_cache', SQLiteCache(str(tmp_path / 'ai.db')))
+    _, explanation, _ = app.process_resume_with_ai(sample_pdf, 'Python developer', 'pdf')
+    assert explanation == app.build_deterministic_explanation(
+        app.extract_resume_text(sample_pdf), app.finish_enhanced_text('JANE DOE\nSKILLS\n- Python'), 'Python developer')
+    assert fake.calls == 1
+    # The resume part was usable, so the response is still cached
+    assert app.ai_response_cache.get(app.build_combined_prompt(app.extract_resume_text(sample_pdf), 'Python developer')[1]) == combined
+
+
+def test_parse_combined_response():
+    bullets = ['**SUMMARY:** Reframed the summary around "APIs" for the role.'] * 4
+    raw = '```json\n' + json.dumps({'resume': 'X', 'explanation': bullets}) + '\n```'
+    resume, explanation = app.parse_combined_response(raw)
+    assert resume == 'X' and explanation.count('• **SUMMARY:**') == 4
+    assert app.parse_combined_response('{"resume": "X", "explanation": [1, 2]}') == ('X', None)
+    with pytest.raises(ValueError):
+        app.parse_combined_response('not json')
+    with pytest.raises(ValueError):
+        app.parse_combined_response('{"explanation": []}')
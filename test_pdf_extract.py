@@ -0,0 +1,77 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+import pdf_extract
+from pdf_extract import BACKENDS, PdfExtractor
+
+
+def make_pdf(pages) -> bytes:
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=letter)
+    for text in pages:
+        if text:
+            c.drawString(72, 720, text)
+        c.showPage()
+    c.save()
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize('backend', ['pdfium', 'pdfplumber'])
+def test_backends_extract_sample(backend, sample_pdf):
+    text = PdfExtractor(backend=backend, workers=1).extract(sample_pdf)
+    assert text.startswith('John Smith\n') and 'EXPERIENCE' in text and '\r' not in text
+
+
+def test_empty_page_does_not_crash():
+    data = make_pdf(['Page one text', None, 'Page three text'])
+    text = PdfExtractor(backend='pdfplumber', workers=1).extract(io.BytesIO(data))
+    assert text == 'Page one text\n\nPage three text\n'
+
+
+def test_falls_back_when_fast_backend_finds_no_text(monkeypatch, sample_pdf):
+    monkeypatch.setattr(BACKENDS['pdfium'], 'page_text', lambda doc, index: '')
+    extractor = PdfExtractor(workers=1)
+    assert 'John Smith' in extractor.extract(sample_pdf)
+    stats = extractor.stats()
+    assert stats['extracted'] == {'pdfium': 0, 'pdfplumber': 1} and stats['fallbacks'] == 1
+
+
+def test_page_cap_and_cache_tag():
+    data = make_pdf(['first', 'second', 'third'])
+    extractor = PdfExtractor(max_pages=2, workers=1)
+    assert extractor.extract(io.BytesIO(data)) == 'first\nsecond\n'
+    assert extractor.stats()['truncated_documents'] == 1
+    assert extractor.cache_tag != PdfExtractor(max_pages=3, workers=1).cache_tag
+
+
+def test_deadline_stops_remaining_pages():
+    backend = BACKENDS['pdfium']
+    doc = backend.open(make_pdf(['a', 'b']))
+    try:
+        assert pdf_extract._read_pages(backend, doc, 0, 2, time.time() - 1) == ([None, None], True)
+    finally:
+        backend.close(doc)
+
+
+def test_parallel_pages_match_sequential():
+    data = make_pdf([f'page {i}' for i in range(5)])
+    sequential = PdfExtractor(backend='pdfplumber', workers=1).extract(io.BytesIO(data))
+    pooled = PdfExtractor(backend='pdfplumber', workers=2, parallel_min_pages=2)
+    try:
+        assert pooled.extract(io.BytesIO(data)) == sequential
+        assert pooled.stats()['parallel_documents'] == 1
+    finally:
+        pooled._discard_pool(pooled._get_pool())
+
+
+def test_pdfium_from_many_threads(sample_pdf):
+    extractor = PdfExtractor(backend='pdfium', workers=1)
+    expected = extractor.extract(sample_pdf)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: extractor.extract(sample_pdf), range(32)))
+    assert results == [expected] * 32
@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+
+import app
+from caches import SQLiteCache
+
+
+def test_pdf_request_defers_docx_until_download(previews, monkeypatch, sample_pdf):
+    path, explanation, extra = app.process_resume_with_ai(sample_pdf, 'Python developer', 'pdf')
+    assert path.endswith('_enhanced_resume.pdf') and os.path.exists(path)
+    docx_path = extra['docx']
+    assert not os.path.exists(docx_path)
+
+    calls = []
+    real_docx = app.create_docx_resume
+    monkeypatch.setattr(app, 'create_docx_resume', lambda content, out: calls.append(out) or real_docx(content, out))
+    client = app.app.test_client()
+    for _ in range(2):
+        resp = client.get(f'/download/{os.path.basename(docx_path)}')
+        assert resp.status_code == 200 and resp.data[:2] == b'PK'
+    assert len(calls) == 1 and os.path.exists(docx_path)
+
+
+def test_deferred_docx_failure_does_not_affect_pdf(previews, monkeypatch, sample_pdf):
+    def broken_docx(content, path):
+        raise RuntimeError('docx exploded')
+    monkeypatch.setattr(app, 'create_docx_resume', broken_docx)
+    path, explanation, extra = app.process_resume_with_ai(sample_pdf, 'Python developer', 'pdf')
+    assert path.endswith('_enhanced_resume.pdf') and os.path.exists(path)
+    resp = app.app.test_client().get(f'/download/{os.path.basename(extra["docx"])}')
+    assert resp.status_code == 500
+    assert not [name for name in os.listdir(previews) if name.endswith('.tmp')]
+
+
+def test_docx_failure_falls_back_for_docx_format(previews, monkeypatch, sample_pdf):
+    def broken_docx(content, path):
+        raise RuntimeError('docx exploded')
+    monkeypatch.setattr(app, 'create_docx_resume', broken_docx)
+    path, explanation, extra = app.process_resume_with_ai(sample_pdf, 'Python developer', 'docx')
+    assert 'Original resume returned' in explanation
+    assert extra == {}
+
+
+def test_renders_overlap(previews, monkeypatch, sample_pdf):
+    # Both renderers must be in flight at the same time for this to finish
+    barrier = threading.Barrier(2, timeout=5)
+    real_pdf, real_docx = app.create_pdf_resume, app.create_docx_resume
+
+    def pdf(content, path):
+        barrier.wait()
+        real_pdf(content, path)
+
+    def docx(content, path):
+        barrier.wait()
+        real_docx(content, path)
+
+    monkeypatch.setattr(app, 'create_pdf_resume', pdf)
+    monkeypatch.setattr(app, 'create_docx_resume', docx)
+    path, _, extra = app.process_resume_with_ai(sample_pdf, 'Python developer', 'docx')
+    assert path.endswith('.pdf') and os.path.exists(extra['docx'])
+
+
+class StreamingModel:
+    """Stands in for the Gemini model: streams the rewrite in chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def generate_content(self, prompt, stream=False):
+        if stream:
+            return iter(type('Chunk', (), {'text': c})() for c in self.chunks)
+        return type('Response', (), {'text': 'Tailored the summary to the role.'})()
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_stream_emits_deltas_then_result(previews, upload_copies, monkeypatch, tmp_path, sample_pdf):
+    chunks = ['JANE DOE\njane@example.com\n', 'SUMMARY\nBackend engineer.\n', 'SKILLS\nPython, SQL\n']
+    monkeypatch.setattr(app, 'model', StreamingModel(chunks))
+    monkeypatch.setattr(app, 'ai_response_cache', SQLiteCache(str(tmp_path / 'ai.db')))
+    client = app.app.test_client()
+    with open(sample_pdf, 'rb') as f:
+        resp = client.post('/generate_resume/stream', data={
+            'resume_file': (f, 'resume.pdf'),
+            'job_description': 'Python developer',
+            'format': 'pdf',
+        }, content_type='multipart/form-data')
+    assert resp.mimetype == 'text/event-stream'
+    events = parse_sse(resp.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[0] == 'status' and names[-1] == 'result'
+    assert ''.join(data['text'] for name, data in events if name == 'delta') == ''.join(chunks)
+    formatted = next(data['text'] for name, data in events if name == 'formatted')
+    assert formatted.startswith('JANE DOE')
+    result = events[-1][1]
+    assert result['success'] and result['preview_url'].endswith('_enhanced_resume.pdf')
+    assert result['explanation']
+    assert upload_copies() == []
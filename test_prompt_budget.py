@@ -0,0 +1,76 @@
+from prompt_budget import compress_job_description, compress_resume
+
+RESUME = """JANE DOE
+jane@example.com | Seattle, WA
+SUMMARY
+Backend engineer with nine years of experience.
+EXPERIENCE
+Senior Engineer, Acme  2019 - 2024
+- Built payment APIs serving 2M users.
+- Built payment APIs serving 2M users.
+- Cut p99 latency 35% by redesigning caching.
+EDUCATION
+B.S. Computer Science, UW
+SKILLS
+Python, Go, SQL, AWS
+HOBBIES
+""" + "\n".join(f"- Long hobby line number {i} about weekend hiking trips." for i in range(40))
+
+JOB = ("Acme is hiring a Senior Backend Engineer. You will design payment APIs in Python. "
+       "You will design payment APIs in Python. Experience with PostgreSQL and AWS is required. "
+       "Benefits include medical, dental and vision coverage. We offer 401(k) matching and paid time off. "
+       "Acme is an equal opportunity employer and considers applicants without regard to race or veteran status. "
+       "Apply now!")
+
+
+def test_resume_keeps_whole_priority_sections_within_budget():
+    result = compress_resume(RESUME, budget=110)
+    lines = result.text.split('\n')
+    assert result.tokens <= 110 < result.original_tokens
+    assert lines[0] == 'JANE DOE'
+    for section in ('SUMMARY', 'EXPERIENCE', 'EDUCATION', 'SKILLS'):
+        assert section in lines
+    assert lines.count('- Built payment APIs serving 2M users.') == 1
+    # The low-priority section only gets the room left over, cut between lines
+    hobbies = lines[lines.index('HOBBIES') + 1:]
+    assert 0 < len(hobbies) < 40 and hobbies[-1].endswith('weekend hiking trips.')
+
+
+def test_resume_under_budget_is_only_deduplicated():
+    result = compress_resume(RESUME, budget=10_000)
+    assert 'HOBBIES' in result.text and result.text.endswith('weekend hiking trips.')
+    assert result.text.count('Built payment APIs') == 1 and result.saved_tokens > 0
+
+
+def test_job_description_drops_boilerplate_and_repeats():
+    result = compress_job_description(JOB, budget=500)
+    assert result.text.split('\n') == [
+        'Acme is hiring a Senior Backend Engineer.',
+        'You will design payment APIs in Python.',
+        'Experience with PostgreSQL and AWS is required.',
+    ]
+    assert result.saved_tokens > result.tokens
+
+
+def test_job_description_budget_cuts_at_sentence_boundaries():
+    result = compress_job_description(JOB, budget=12)
+    assert result.text == 'Acme is hiring a Senior Backend Engineer.'
+
+
+def test_resume_keeps_repeated_employer_and_title_lines_in_place():
+    text = ("JANE DOE\nEXPERIENCE\nACME CORP\nSOFTWARE ENGINEER\n- Built billing system\n"
+            "GLOBEX INC\nSOFTWARE ENGINEER\n- Led migration to AWS\nEDUCATION\nB.S. Computer Science")
+    assert compress_resume(text, budget=10_000).text == text
+
+
+def test_job_description_boilerplate_matches_whole_words_only():
+    text = ('You will design infrastructure for payments. You will design interfaces for merchants. '
+            'Build APIs in Go. Cookie-cutter solutions are not our thing. We follow user research closely. '
+            'Sign in to apply. We use cookies. Benefits include 401(k) matching.')
+    assert compress_job_description(text, 500).text.split('\n') == [
+        'You will design infrastructure for payments.',
+        'You will design interfaces for merchants.',
+        'Build APIs in Go.',
+        'Cookie-cutter solutions are not our thing.',
+        'We follow user research closely.',
+    ]
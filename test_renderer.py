@@ -0,0 +1,29 @@
+import io
+
+from docx import Document
+
+import renderer
+from resume_format import ResumeDocument
+
+RESUME = "JANE DOE\njane@example.com | 555-0100\nSUMMARY\nBackend engineer.\nSKILLS\n- Python\n- PostgreSQL"
+
+
+def test_pdf_uses_builtin_font_for_latin_text():
+    data = renderer.render_pdf(ResumeDocument(RESUME))
+    assert data.startswith(b'%PDF') and b'Helvetica' in data and b'DejaVuSans' not in data
+
+
+def test_pdf_embeds_unicode_font_when_needed():
+    data = renderer.render_pdf(ResumeDocument(RESUME.replace('JANE DOE', 'ЖАННА ДОУ')))
+    assert b'DejaVuSans' in data
+    assert renderer.register_fonts() == renderer.FONT_NAME
+
+
+def test_docx_renders_are_independent():
+    first = Document(io.BytesIO(renderer.render_docx(ResumeDocument(RESUME))))
+    second = Document(io.BytesIO(renderer.render_docx(ResumeDocument(RESUME.replace('Python', 'Go')))))
+    assert [p.text for p in first.paragraphs].count('Python') == 1
+    assert 'Python' not in [p.text for p in second.paragraphs]
+    assert [p.style.name for p in first.paragraphs if p.text == 'Python'] == ['List Bullet']
+    assert first.styles['Normal'].font.name == 'Arial'
+    assert not renderer.docx_template().element.body.findall('.//{*}p')
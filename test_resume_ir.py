@@ -0,0 +1,74 @@
+"""
+Golden tests: the parse-once resume document must reproduce the output of the
+original multi-pass text pipeline (recorded in golden/resume_pipeline.json).
+"""
+
+import json
+import os
+
+import pytest
+from docx import Document
+
+import app
+from resume_format import ResumeDocument, build_resume_document
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'resume_pipeline.json')
+
+with open(GOLDEN, encoding='utf-8') as f:
+    CASES = json.load(f)
+
+
+@pytest.fixture(params=CASES, ids=[c['id'] for c in CASES])
+def case(request):
+    return request.param
+
+
+def test_text_passes(case):
+    expected = case['expected']
+    normalized = app._normalize_ai_text(case['raw'])
+    sanitized = app.sanitize_enhanced_content(normalized)
+    assert normalized == expected['normalized']
+    assert sanitized == expected['sanitized']
+    assert app.final_format_resume(sanitized) == expected['formatted']
+
+
+def test_document_views_match_renderer_input(case):
+    expected = case['expected']
+    doc = ResumeDocument(expected['formatted'])
+    assert doc.source == expected['formatted']
+    assert doc.pdf_view.to_dict() == expected['pdf_view']
+    assert doc.view.to_dict() == expected['docx_view']
+
+    original = build_resume_document(case['original'])
+    assert original.pdf_view.to_dict() == expected['raw_pdf_view']
+    assert original.view.to_dict() == expected['raw_docx_view']
+
+
+def test_legacy_helpers_still_agree(case):
+    expected = case['expected']
+    formatted_twice = app.final_format_resume(expected['formatted'])
+    assert app.parse_structured_lines(app.clean_for_pdf(formatted_twice)) == expected['pdf_view']
+    assert app.parse_structured_lines(formatted_twice) == expected['docx_view']
+
+
+def test_explanation_from_document(case):
+    expected = case['expected']
+    doc = ResumeDocument(expected['formatted'])
+    assert app.build_deterministic_explanation(case['original'], doc, case['job']) == expected['explanation']
+    assert app.build_deterministic_explanation(case['original'], expected['formatted'], case['job']) == expected['explanation']
+
+
+def test_docx_paragraphs(case, tmp_path):
+    path = str(tmp_path / 'out.docx')
+    app.create_docx_resume(ResumeDocument(case['expected']['formatted']), path)
+    paragraphs = [[p.text, p.style.name] for p in Document(path).paragraphs]
+    assert paragraphs == case['expected']['docx_paragraphs']
+
+
+def test_pdf_renders_from_document(case, tmp_path):
+    doc = ResumeDocument(case['expected']['formatted'])
+    if not doc.lines:
+        pytest.skip('nothing to render')
+    path = str(tmp_path / 'out.pdf')
+    app.create_pdf_resume(doc, path)
+    assert os.path.getsize(path) > 0
@@ -0,0 +1,52 @@
+import os
+import time
+
+from retention import RetentionPolicy, RetentionSweeper
+
+
+def make_file(directory, name, size, age):
+    path = directory / name
+    path.write_bytes(b'x' * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_expired_files_are_removed(tmp_path):
+    old = make_file(tmp_path, 'old.pdf', 10, age=7200)
+    fresh = make_file(tmp_path, 'fresh.pdf', 10, age=10)
+    sweeper = RetentionSweeper([RetentionPolicy(str(tmp_path), ttl_seconds=3600, max_bytes=10 ** 6)])
+    assert sweeper.sweep()
+    assert not old.exists() and fresh.exists()
+    assert sweeper.stats()['removed_expired'] == 1
+
+
+def test_quota_evicts_oldest_first_but_spares_young_files(tmp_path):
+    oldest = make_file(tmp_path, 'a.pdf', 100, age=900)
+    older = make_file(tmp_path, 'b.pdf', 100, age=600)
+    newer = make_file(tmp_path, 'c.pdf', 100, age=300)
+    young = make_file(tmp_path, 'd.pdf', 100, age=1)
+    sweeper = RetentionSweeper([RetentionPolicy(str(tmp_path), ttl_seconds=3600, max_bytes=150)])
+    sweeper.sweep()
+    assert not oldest.exists() and not older.exists() and not newer.exists()
+    assert young.exists()
+    stats = sweeper.stats()
+    assert stats['removed_over_quota'] == 3
+    assert stats['directories'][str(tmp_path)]['bytes'] == 100
+
+
+def test_sweep_skipped_while_another_worker_holds_the_lock(tmp_path):
+    data = tmp_path / 'data'
+    data.mkdir()
+    old = make_file(data, 'old.pdf', 10, age=7200)
+    lock_path = str(tmp_path / 'retention.lock')
+    policy = RetentionPolicy(str(data), ttl_seconds=60, max_bytes=10 ** 6)
+    holder = RetentionSweeper([policy], lock_path=lock_path)
+    other = RetentionSweeper([policy], lock_path=lock_path)
+    lock_file = holder._acquire()
+    try:
+        assert other.sweep() is False
+        assert old.exists() and other.stats()['skipped'] == 1
+    finally:
+        lock_file.close()
+    assert other.sweep() and not old.exists()
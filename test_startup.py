@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+import app
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+HEAVY = ('renderer', 'content_extractor', 'reportlab', 'docx', 'bs4', 'requests', 'pdfplumber', 'pypdfium2',
+         'google.generativeai')
+
+PROBE = f"""
+import json, sys
+sys.path.insert(0, {REPO_ROOT!r})
+import app
+heavy = {HEAVY!r}
+loaded = [m for m in heavy if m in sys.modules]
+app.warm_up(connect=False)
+print(json.dumps({{'at_import': loaded, 'after_warm_up': [m for m in heavy if m in sys.modules],
+                   'model': type(app.model).__name__}}))
+"""
+
+
+def test_import_defers_heavy_modules_until_warm_up(tmp_path):
+    env = dict(os.environ, MODEL_BACKEND='gemini', GOOGLE_API_KEY='test-key')
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=tmp_path, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    assert result['at_import'] == []
+    assert result['model'] == 'LazyGeminiModel'
+    warmed = {'renderer', 'content_extractor', 'reportlab', 'docx', 'bs4', 'requests', 'pypdfium2'}
+    assert warmed <= set(result['after_warm_up'])
+
+
+def test_warm_up_is_reported(monkeypatch):
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', 'secret')
+    app.warm_up()
+    stats = app.app.test_client().get('/admin/stats', headers={'X-Admin-Token': 'secret'}).get_json()
+    assert stats['startup']['warm_up_pid'] == os.getpid()
+    assert stats['startup']['warm_up_seconds'] >= 0
+
+
+def test_admin_stats_needs_token_header(monkeypatch):
+    client = app.app.test_client()
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', None)
+    assert client.get('/admin/stats').status_code == 401
+    monkeypatch.setattr(app, 'ADMIN_TOKEN', 'secret')
+    assert client.get('/admin/stats?token=secret').status_code == 401
+    assert client.get('/admin/stats', headers={'X-Admin-Token': 'wrong'}).status_code == 401
+    assert client.get('/admin/stats', headers={'X-Admin-Token': 'secret'}).status_code == 200
@@ -0,0 +1,121 @@
+import io
+import os
+import threading
+
+import pytest
+
+import app
+from storage import LocalStorage, S3Storage, build_storage
+
+
+class MissingKey(Exception):
+    def __init__(self, code='NoSuchKey'):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}}
+
+
+class FakeS3Client:
+    """In-memory stand-in for an S3-compatible endpoint such as MinIO."""
+
+    def __init__(self):
+        self.objects = {}
+        self.lock = threading.Lock()
+
+    def upload_file(self, filename, bucket, key, ExtraArgs=None):
+        with open(filename, 'rb') as f:
+            body = f.read()
+        with self.lock:
+            self.objects[(bucket, key)] = (body, dict(ExtraArgs or {}))
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise MissingKey('404')
+        return {'ContentLength': len(self.objects[(Bucket, Key)][0])}
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise MissingKey()
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)][0])}
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        query = f"expires={ExpiresIn}"
+        if 'ResponseContentDisposition' in Params:
+            query += '&attachment=1'
+        return f"https://minio.test/{Params['Bucket']}/{Params['Key']}?{query}"
+
+    def names(self):
+        return sorted(os.path.basename(key) for _, key in self.objects)
+
+
+@pytest.fixture
+def s3(previews, monkeypatch):
+    client = FakeS3Client()
+    monkeypatch.setattr(app, 'artifact_storage', S3Storage('artifacts', prefix='previews', client=client))
+    return client
+
+
+def test_s3_storage_roundtrip(tmp_path):
+    client = FakeS3Client()
+    storage = S3Storage('artifacts', prefix='/previews/', client=client, cache_control='private, max-age=60')
+    path = tmp_path / 'x_enhanced_resume.pdf'
+    path.write_bytes(b'%PDF-1.4 test')
+    assert not storage.exists(path.name)
+    storage.publish(str(path))
+    body, extra = client.objects[('artifacts', 'previews/x_enhanced_resume.pdf')]
+    assert body == b'%PDF-1.4 test'
+    assert extra == {'ContentType': 'application/pdf', 'CacheControl': 'private, max-age=60'}
+    assert storage.exists(path.name)
+    with storage.open(path.name) as f:
+        assert f.read() == body
+    with pytest.raises(FileNotFoundError):
+        storage.open('missing.pdf')
+    assert storage.presigned_url(path.name).endswith('previews/x_enhanced_resume.pdf?expires=3600')
+    assert 'attachment=1' in storage.presigned_url(path.name, as_attachment=True)
+    assert storage.stats()['uploads'] == 1
+
+
+def test_s3_errors_other_than_missing_propagate():
+    class Broken(FakeS3Client):
+        def head_object(self, Bucket, Key):
+            raise MissingKey('AccessDenied')
+    with pytest.raises(MissingKey):
+        S3Storage('artifacts', client=Broken()).exists('a.pdf')
+
+
+def test_build_storage(tmp_path):
+    assert isinstance(build_storage('local', str(tmp_path)), LocalStorage)
+    assert isinstance(build_storage('S3', str(tmp_path), bucket='b', client=FakeS3Client()), S3Storage)
+    with pytest.raises(ValueError):
+        build_storage('ftp', str(tmp_path))
+    with pytest.raises(ValueError):
+        build_storage('s3', str(tmp_path), bucket='')
+
+
+def test_build_storage_requires_boto3(tmp_path, monkeypatch):
+    import importlib.util
+    monkeypatch.setattr(importlib.util, 'find_spec', lambda name: None)
+    with pytest.raises(ImportError, match='boto3'):
+        build_storage('s3', str(tmp_path), bucket='b')
+
+
+def test_pipeline_publishes_and_preview_redirects(s3, sample_pdf):
+    path, explanation, extra = app.process_resume_with_ai(sample_pdf, 'Python developer', 'pdf')
+    name = os.path.basename(path)
+    assert s3.names() == sorted([name, os.path.basename(app._docx_source_path(extra['docx']))])
+    resp = app.app.test_client().get(f'/preview/{name}')
+    assert resp.status_code == 302
+    assert resp.headers['Location'] == f'https://minio.test/artifacts/previews/{name}?expires=3600'
+    assert 'immutable' not in resp.headers['Cache-Control']
+
+
+def test_docx_renders_on_another_instance(s3, previews, sample_pdf):
+    path, explanation, extra = app.process_resume_with_ai(sample_pdf, 'Python developer', 'pdf')
+    docx_name = os.path.basename(extra['docx'])
+    # Simulate an instance that never saw this job: nothing on its local disk
+    for name in os.listdir(previews):
+        os.remove(os.path.join(previews, name))
+    resp = app.app.test_client().get(f'/download/{docx_name}')
+    assert resp.status_code == 302 and 'attachment=1' in resp.headers['Location']
+    body, extra_args = s3.objects[('artifacts', f'previews/{docx_name}')]
+    assert body[:2] == b'PK'
+    assert extra_args['ContentType'].endswith('wordprocessingml.document')
@@ -0,0 +1,37 @@
+import hashlib
+import io
+import os
+
+import app
+from caches import ContentCache
+from upload_buffer import UploadBuffer
+
+
+def test_upload_buffer_hashes_and_spills_past_limit():
+    data = os.urandom(4096)
+    small = UploadBuffer(io.BytesIO(data), max_memory=1 << 20)
+    assert small.digest == hashlib.sha256(data).hexdigest() and small.size == 4096
+    assert not small.spilled and small.open().read() == data
+    large = UploadBuffer(io.BytesIO(data), max_memory=1024)
+    assert large.spilled and large.open().read() == data
+
+
+def test_generate_resume_never_writes_the_upload(previews, upload_copies, sample_pdf):
+    with open(sample_pdf, 'rb') as f:
+        resp = app.app.test_client().post('/generate_resume', data={
+            'resume_file': (f, 'resume.pdf'), 'job_description': 'Python developer', 'format': 'pdf',
+        }, content_type='multipart/form-data')
+    assert resp.status_code == 200 and resp.get_json()['success']
+    assert upload_copies() == []
+
+
+def test_copy_original_fallback_persists_upload_bytes(previews, monkeypatch, sample_pdf):
+    monkeypatch.setattr(app, 'extract_text_from_pdf', lambda source: '')
+    with open(sample_pdf, 'rb') as f:
+        original = f.read()
+    upload = UploadBuffer(io.BytesIO(original), max_memory=1 << 20)
+    monkeypatch.setattr(app, 'pdf_text_cache', ContentCache(str(previews / 'text-cache')))
+    path, explanation, extra = app.process_resume_with_ai(upload, 'Python developer', 'pdf')
+    assert explanation.startswith('Error occurred') and extra == {}
+    with open(path, 'rb') as f:
+        assert f.read() == original
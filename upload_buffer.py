@@ -0,0 +1,65 @@
+"""
+Uploaded files held in memory instead of being written to uploads/
+"""
+
+import hashlib
+import shutil
+import tempfile
+from typing import BinaryIO
+
+from flask import Request
+
+COPY_CHUNK = 1024 * 1024
+
+
+class UploadBuffer:
+    """An upload copied into a SpooledTemporaryFile and hashed on the way in.
+
+    Up to ``max_memory`` bytes stay in memory; only larger files spill to an
+    anonymous temp file. The buffer outlives the request, so queued jobs can
+    read it after the response has been sent. It is meant for one reader at
+    a time: ``open()`` rewinds and hands out the same underlying file.
+    """
+
+    def __init__(self, stream: BinaryIO, max_memory: int):
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        h = hashlib.sha256()
+        size = 0
+        for chunk in iter(lambda: stream.read(COPY_CHUNK), b''):
+            h.update(chunk)
+            self._file.write(chunk)
+            size += len(chunk)
+        self.digest = h.hexdigest()
+        self.size = size
+
+    @property
+    def spilled(self) -> bool:
+        """True if the upload was too large to keep in memory."""
+        return bool(getattr(self._file, '_rolled', False))
+
+    def open(self) -> BinaryIO:
+        """The upload as a file-like object, positioned at the start."""
+        self._file.seek(0)
+        return self._file
+
+    def save(self, path: str):
+        """Write the upload to ``path`` (only needed when the original file itself is returned)."""
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(self.open(), out, COPY_CHUNK)
+
+    def close(self):
+        self._file.close()
+
+
+def spooled_request_class(max_memory: int):
+    """A Request class whose multipart file parts are spooled in memory.
+
+    Werkzeug otherwise writes any request over 500KB to a temp file while
+    parsing, before the view ever sees it.
+    """
+
+    class SpooledRequest(Request):
+        def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+            return tempfile.SpooledTemporaryFile(max_size=max_memory)
+
+    return SpooledRequest